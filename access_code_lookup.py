@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Access-Code Lookup for Toiral Estimate
+Validates a login code without downloading every access code
+
+getAccessCodeByCode in accessCodeService.ts (and the backend suite's
+validation test) reads the whole access-codes collection and scans it, so each
+login costs a download proportional to every invitation ever sent. Two
+lookups replace it:
+
+  query   ?orderBy="code"&equalTo="<code>" on access-codes, which needs
+          ".indexOn": ["code"] in the rules (falls back to a scan without it)
+  index   a maintained access-code-index/<code> → id node, written in the
+          same multi-path PATCH as the code itself, then one record read
+
+Either way only the matching record is transferred, and used / expiresAt are
+checked on that single result. The benchmark compares all three strategies
+against the emulator at 1k, 100k and 1M codes.
+"""
+
+import argparse
+import random
+import string
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+from rtdb_client import BaseRTDBClient, RTDBClient
+from rtdb_emulator import RTDBEmulator
+from rtdb_query import QueryResult, query_equal, scan_equal, INDEXED, SCAN
+
+ACCESS_CODES_PATH = "access-codes"
+CODE_INDEX_PATH = "access-code-index"
+INDEX_NODE = "index-node"
+STRATEGIES = (INDEXED, INDEX_NODE, SCAN)
+CODE_CHARS = string.ascii_uppercase + string.digits
+BENCHMARK_SIZES = (1_000, 100_000, 1_000_000)
+BENCHMARK_TIMEOUT = 600.0
+
+
+def is_redeemable(record: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+    """Unused and not yet expired, as getAccessCodeByCode requires"""
+    if record.get("used"):
+        return False
+    try:
+        expires_at = datetime.fromisoformat(str(record.get("expiresAt", "")).replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.astimezone()
+    return expires_at > (now or datetime.now(timezone.utc))
+
+
+def code_writes(access_code_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Multi-path PATCH body (at the root) storing a code together with its index entry"""
+    return {
+        f"{ACCESS_CODES_PATH}/{access_code_id}": record,
+        f"{CODE_INDEX_PATH}/{record['code']}": access_code_id
+    }
+
+
+def code_deletes(access_code_id: str, code: str) -> Dict[str, Any]:
+    """Multi-path PATCH body removing a code and its index entry"""
+    return {f"{ACCESS_CODES_PATH}/{access_code_id}": None, f"{CODE_INDEX_PATH}/{code}": None}
+
+
+def find_by_index_node(db: BaseRTDBClient, code: str) -> QueryResult:
+    """Resolve `code` through access-code-index, then read that one record"""
+    start = time.perf_counter()
+    response = db.get(f"{CODE_INDEX_PATH}/{code}")
+    body_bytes, requests_made, records = len(response.content), 1, {}
+    access_code_id = response.json() if response.status_code == 200 else None
+    if isinstance(access_code_id, str):
+        response = db.get(f"{ACCESS_CODES_PATH}/{access_code_id}")
+        body_bytes += len(response.content)
+        requests_made += 1
+        record = response.json() if response.status_code == 200 else None
+        # A stale entry (code deleted or reissued) must not authenticate anyone
+        if isinstance(record, dict) and record.get("code") == code:
+            records[access_code_id] = record
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return QueryResult(INDEX_NODE, records, response.status_code, body_bytes, elapsed_ms, requests_made)
+
+
+def find_access_code(db: BaseRTDBClient, code: str, strategy: str = INDEXED) -> QueryResult:
+    """Records whose code is `code`, fetched with `strategy`"""
+    if strategy == INDEX_NODE:
+        return find_by_index_node(db, code)
+    if strategy == SCAN:
+        return scan_equal(db, ACCESS_CODES_PATH, "code", code)
+    return query_equal(db, ACCESS_CODES_PATH, "code", code)
+
+
+def validate_access_code(db: BaseRTDBClient, code: str, strategy: str = INDEXED,
+                         now: Optional[datetime] = None) -> Tuple[Optional[str], Optional[Dict[str, Any]], QueryResult]:
+    """(id, record, cost) of the redeemable access code `code`, or (None, None, cost)"""
+    result = find_access_code(db, code, strategy)
+    for access_code_id, record in sorted(result.records.items()):
+        if is_redeemable(record, now):
+            return access_code_id, record, result
+    return None, None, result
+
+
+def synthetic_access_codes(count: int, seed: int = 0) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """(access-codes, access-code-index) trees of `count` codes; a fifth are used or expired"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    codes: Dict[str, Any] = {}
+    index: Dict[str, str] = {}
+    for number in range(count):
+        code = "".join(rng.choices(CODE_CHARS, k=8))
+        while code in index:
+            code = "".join(rng.choices(CODE_CHARS, k=8))
+        access_code_id = f"ac{number:07d}"
+        created = now - timedelta(days=rng.uniform(0, 30))
+        codes[access_code_id] = {
+            "id": access_code_id,
+            "code": code,
+            "email": f"user{number}@example.com",
+            "userName": f"User {number}",
+            "role": "user",
+            "createdAt": created.isoformat(),
+            "createdBy": "admin",
+            "used": rng.random() < 0.1,
+            "expiresAt": (created + timedelta(days=7 if rng.random() < 0.9 else -1)).isoformat()
+        }
+        index[code] = access_code_id
+    return codes, index
+
+
+def run_benchmark(sizes: Tuple[int, ...] = BENCHMARK_SIZES, lookups: int = 20,
+                  seed: int = 0) -> List[Dict[str, Any]]:
+    """Time each lookup strategy against an emulator holding each number of codes"""
+    rows = []
+    for size in sizes:
+        codes, index = synthetic_access_codes(size, seed)
+        rng = random.Random(seed)
+        targets = [codes[f"ac{rng.randrange(size):07d}"]["code"] for _ in range(lookups)]
+        with RTDBEmulator(data={ACCESS_CODES_PATH: codes, CODE_INDEX_PATH: index},
+                          indexes={ACCESS_CODES_PATH: ["code"]}) as emulator:
+            del codes, index
+            # Serializing a million-code collection takes the emulator well over the default timeout
+            db = RTDBClient(emulator.base_url, timeout=BENCHMARK_TIMEOUT)
+            for strategy in STRATEGIES:
+                # A full scan moves the whole collection; a couple of samples are enough
+                count = lookups if strategy != SCAN else max(1, min(lookups, 100_000 // size))
+                if strategy != SCAN:
+                    # Warm-up: the emulator builds its value index on the first query
+                    find_access_code(db, targets[0], strategy)
+                results = [find_access_code(db, code, strategy) for code in targets[:count]]
+                rows.append({
+                    "codes": size,
+                    "strategy": strategy,
+                    "lookups": count,
+                    "found": sum(1 for result in results if result.records),
+                    "mean_ms": round(sum(result.elapsed_ms for result in results) / count, 3),
+                    "bytes_per_lookup": sum(result.bytes_transferred for result in results) // count,
+                    "requests_per_lookup": sum(result.requests for result in results) / count
+                })
+            db.close()
+    return rows
+
+
+def main():
+    """Benchmark access-code lookup strategies"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate access-code lookup benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES),
+                        help="Collection sizes to benchmark")
+    parser.add_argument("--lookups", type=int, default=20, help="Lookups timed per strategy")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic codes")
+    args = parser.parse_args()
+
+    print(f"{'codes':>10}  {'strategy':<11}{'lookups':>8}{'found':>7}{'mean ms':>11}"
+          f"{'bytes/lookup':>15}{'requests':>10}")
+    for row in run_benchmark(tuple(args.sizes), args.lookups, args.seed):
+        print(f"{row['codes']:>10,}  {row['strategy']:<11}{row['lookups']:>8}{row['found']:>7}"
+              f"{row['mean_ms']:>11.2f}{row['bytes_per_lookup']:>15,}{row['requests_per_lookup']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
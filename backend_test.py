@@ -14,27 +14,45 @@ This test suite verifies:
 """
 
 import requests
-import json
-import time
 import random
 import string
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import os
 import sys
+import threading
+import argparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from rtdb_client import RTDBClient, DEFAULT_BASE_URL, DEFAULT_POOL_SIZE
+from rtdb_stats import StatisticsCollector
+from access_code_lookup import INDEXED, INDEX_NODE, code_writes, validate_access_code
+from latency_histogram import elapsed_in_test_ms, print_latency_table
+from rtdb_emulator import add_emulator_arguments, database_url
+from rtdb_cassette import (ReplayRTDBClient, add_cassette_arguments, start_recording,
+                           print_cassette_summary)
+from cleanup_journal import CleanupJournal, sweep_journals, print_sweep_summary
+from suite_scheduler import SuiteScheduler, RateLimiter, depends, add_scheduler_arguments, DEFAULT_MAX_WORKERS
+from results_store import add_store_arguments, save_results
+from perf_gate import add_gate_arguments, gate_results
 
 class FirebaseTestSuite:
-    def __init__(self):
+    def __init__(self, db: Optional[RTDBClient] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_limiter: Optional[RateLimiter] = None, full_stats: bool = False):
         """Initialize Firebase test suite with configuration"""
-        self.base_url = "https://toiral-estimate-default-rtdb.asia-southeast1.firebasedatabase.app"
+        self.db = db or RTDBClient(DEFAULT_BASE_URL)
+        self.base_url = self.db.base_url
+        self.journal = CleanupJournal("firebase_backend", self.base_url)
         self.auth_token = None
         self.test_results = []
+        self._log_lock = threading.Lock()
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.full_stats = full_stats
         self.test_data = {}
         
         # Test configuration
@@ -53,16 +71,19 @@ class FirebaseTestSuite:
             "status": status,
             "details": details,
             "error": error,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now().isoformat(),
+            "duration_ms": elapsed_in_test_ms()
         }
-        self.test_results.append(result)
-        
         status_emoji = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
-        print(f"{status_emoji} {test_name}: {status}")
-        if details:
-            print(f"   📝 {details}")
-        if error:
-            print(f"   🚨 {error}")
+        
+        # Tests run concurrently; keep each entry's lines together
+        with self._log_lock:
+            self.test_results.append(result)
+            print(f"{status_emoji} {test_name}: {status}")
+            if details:
+                print(f"   📝 {details}")
+            if error:
+                print(f"   🚨 {error}")
 
     def generate_test_id(self) -> str:
         """Generate unique test ID"""
@@ -71,8 +92,8 @@ class FirebaseTestSuite:
     def test_firebase_connectivity(self) -> bool:
         """Test basic Firebase Realtime Database connectivity"""
         try:
-            # Test basic read access
-            response = requests.get(f"{self.base_url}/.json", timeout=10)
+            # Test basic read access (shallow, so only the top-level keys are sent)
+            response = self.db.get("", params={"shallow": "true"})
             
             if response.status_code == 200:
                 self.log_test("Firebase Connectivity", "PASS", 
@@ -87,6 +108,7 @@ class FirebaseTestSuite:
             self.log_test("Firebase Connectivity", "FAIL", error=str(e))
             return False
 
+    @depends(produces=("test_user_id",))
     def test_user_creation_workflow(self) -> bool:
         """Test user creation via access codes"""
         try:
@@ -102,10 +124,10 @@ class FirebaseTestSuite:
             }
             
             # Test user creation
-            response = requests.put(
-                f"{self.base_url}/users/{user_id}.json",
-                json=test_user,
-                timeout=10
+            self.journal.record(f"users/{user_id}")
+            response = self.db.put(
+                f"users/{user_id}",
+                test_user
             )
             
             if response.status_code == 200:
@@ -114,7 +136,7 @@ class FirebaseTestSuite:
                             f"User created successfully with ID: {user_id}")
                 
                 # Verify user can be retrieved
-                get_response = requests.get(f"{self.base_url}/users/{user_id}.json", timeout=10)
+                get_response = self.db.get(f"users/{user_id}")
                 if get_response.status_code == 200 and get_response.json():
                     self.log_test("User Retrieval", "PASS", 
                                 f"User data retrieved successfully")
@@ -132,6 +154,7 @@ class FirebaseTestSuite:
             self.log_test("User Creation Workflow", "FAIL", error=str(e))
             return False
 
+    @depends(produces=("test_service_id",))
     def test_service_package_operations(self) -> bool:
         """Test service package CRUD operations"""
         try:
@@ -161,10 +184,10 @@ class FirebaseTestSuite:
             }
             
             # Test service creation
-            response = requests.put(
-                f"{self.base_url}/services/{service_id}.json",
-                json=test_service,
-                timeout=10
+            self.journal.record(f"services/{service_id}")
+            response = self.db.put(
+                f"services/{service_id}",
+                test_service
             )
             
             if response.status_code == 200:
@@ -173,7 +196,7 @@ class FirebaseTestSuite:
                             f"Service package created with ID: {service_id}")
                 
                 # Test service retrieval
-                get_response = requests.get(f"{self.base_url}/services.json", timeout=10)
+                get_response = self.db.get("services", params={"shallow": "true"})
                 if get_response.status_code == 200:
                     services = get_response.json() or {}
                     if service_id in services:
@@ -197,6 +220,7 @@ class FirebaseTestSuite:
             self.log_test("Service Package Operations", "FAIL", error=str(e))
             return False
 
+    @depends(produces=("test_quotation_id",), consumes=("test_user_id", "test_service_id"))
     def test_quotation_creation_and_storage(self) -> bool:
         """Test quotation creation, storage, and retrieval"""
         try:
@@ -236,10 +260,10 @@ class FirebaseTestSuite:
             }
             
             # Test quotation creation
-            response = requests.put(
-                f"{self.base_url}/quotations/{quotation_id}.json",
-                json=test_quotation,
-                timeout=10
+            self.journal.record(f"quotations/{quotation_id}")
+            response = self.db.put(
+                f"quotations/{quotation_id}",
+                test_quotation
             )
             
             if response.status_code == 200:
@@ -248,7 +272,7 @@ class FirebaseTestSuite:
                             f"Quotation created with ID: {quotation_id}, Total: ${test_quotation['totalPrice']}")
                 
                 # Test quotation retrieval
-                get_response = requests.get(f"{self.base_url}/quotations/{quotation_id}.json", timeout=10)
+                get_response = self.db.get(f"quotations/{quotation_id}")
                 if get_response.status_code == 200 and get_response.json():
                     retrieved_quotation = get_response.json()
                     
@@ -280,6 +304,7 @@ class FirebaseTestSuite:
             self.log_test("Quotation Creation and Storage", "FAIL", error=str(e))
             return False
 
+    @depends(produces=("test_access_code", "test_access_code_id"))
     def test_access_code_generation_and_validation(self) -> bool:
         """Test access code generation and validation system"""
         try:
@@ -300,12 +325,9 @@ class FirebaseTestSuite:
                 "expiresAt": expiration_date.isoformat()
             }
             
-            # Test access code creation
-            response = requests.put(
-                f"{self.base_url}/access-codes/{access_code_id}.json",
-                json=test_access_code,
-                timeout=10
-            )
+            # Test access code creation, together with its code → id index entry
+            self.journal.record_many(list(code_writes(access_code_id, test_access_code)))
+            response = self.db.patch("", code_writes(access_code_id, test_access_code))
             
             if response.status_code == 200:
                 self.test_data['test_access_code'] = access_code
@@ -313,44 +335,36 @@ class FirebaseTestSuite:
                 self.log_test("Access Code Generation", "PASS", 
                             f"Access code generated: {access_code}")
                 
-                # Test access code validation
-                get_response = requests.get(f"{self.base_url}/access-codes.json", timeout=10)
-                if get_response.status_code == 200:
-                    access_codes = get_response.json() or {}
-                    
-                    # Find the access code
-                    found_code = None
-                    for code_id, code_data in access_codes.items():
-                        if code_data.get('code') == access_code and not code_data.get('used'):
-                            found_code = code_data
-                            break
-                    
-                    if found_code:
-                        self.log_test("Access Code Validation", "PASS", 
-                                    f"Access code validated successfully")
-                        
-                        # Test marking as used
-                        mark_used_response = requests.patch(
-                            f"{self.base_url}/access-codes/{access_code_id}.json",
-                            json={"used": True, "usedAt": datetime.now().isoformat()},
-                            timeout=10
-                        )
-                        
-                        if mark_used_response.status_code == 200:
-                            self.log_test("Access Code Usage Tracking", "PASS", 
-                                        "Access code marked as used successfully")
-                            return True
-                        else:
-                            self.log_test("Access Code Usage Tracking", "FAIL", 
-                                        f"Could not mark access code as used")
-                            return False
-                    else:
+                # Test access code validation through both the orderBy index and the
+                # access-code-index node written above, each followed by used / expiresAt checks
+                costs = []
+                for strategy in (INDEXED, INDEX_NODE):
+                    found_id, found_code, lookup = validate_access_code(self.db, access_code, strategy)
+                    if lookup.status_code != 200:
                         self.log_test("Access Code Validation", "FAIL", 
-                                    "Generated access code not found or already used")
+                                    f"HTTP {lookup.status_code} ({strategy} lookup)")
                         return False
+                    if not found_code or found_id != access_code_id:
+                        self.log_test("Access Code Validation", "FAIL", 
+                                    f"Generated access code not found or already used ({strategy} lookup)")
+                        return False
+                    costs.append(f"{strategy} lookup, {lookup.bytes_transferred} bytes")
+                self.log_test("Access Code Validation", "PASS", 
+                            f"Access code validated successfully ({'; '.join(costs)})")
+                
+                # Test marking as used
+                mark_used_response = self.db.patch(
+                    f"access-codes/{access_code_id}",
+                    {"used": True, "usedAt": datetime.now().isoformat()}
+                )
+                
+                if mark_used_response.status_code == 200:
+                    self.log_test("Access Code Usage Tracking", "PASS", 
+                                "Access code marked as used successfully")
+                    return True
                 else:
-                    self.log_test("Access Code Validation", "FAIL", 
-                                f"HTTP {get_response.status_code}")
+                    self.log_test("Access Code Usage Tracking", "FAIL", 
+                                f"Could not mark access code as used")
                     return False
             else:
                 self.log_test("Access Code Generation", "FAIL", 
@@ -361,6 +375,7 @@ class FirebaseTestSuite:
             self.log_test("Access Code Generation and Validation", "FAIL", error=str(e))
             return False
 
+    @depends(consumes=("test_access_code",))
     def test_email_service_integration(self) -> bool:
         """Test EmailJS integration (configuration validation)"""
         try:
@@ -407,6 +422,7 @@ class FirebaseTestSuite:
             self.log_test("Email Service Integration", "FAIL", error=str(e))
             return False
 
+    @depends(consumes=("test_user_id", "test_service_id", "test_quotation_id", "test_access_code"))
     def test_data_flow_consistency(self) -> bool:
         """Test complete workflow: Admin creates service → Client selects service → Quotation generated"""
         try:
@@ -434,10 +450,7 @@ class FirebaseTestSuite:
             # Step 4: Data consistency check
             try:
                 # Verify all data exists and is linked correctly
-                quotation_response = requests.get(
-                    f"{self.base_url}/quotations/{self.test_data.get('test_quotation_id')}.json", 
-                    timeout=10
-                )
+                quotation_response = self.db.get(f"quotations/{self.test_data.get('test_quotation_id')}")
                 
                 if quotation_response.status_code == 200:
                     quotation = quotation_response.json()
@@ -482,33 +495,14 @@ class FirebaseTestSuite:
     def test_firebase_monitoring_and_statistics(self) -> bool:
         """Test Firebase monitoring and statistics collection"""
         try:
-            # Test database statistics collection
+            # Count records with shallow reads and estimate sizes by sampling
             collections_to_check = ['users', 'quotations', 'services', 'access-codes', 'analytics']
-            statistics = {}
-            
-            for collection in collections_to_check:
-                try:
-                    response = requests.get(f"{self.base_url}/{collection}.json", timeout=10)
-                    if response.status_code == 200:
-                        data = response.json() or {}
-                        count = len(data) if isinstance(data, dict) else 0
-                        statistics[collection] = count
-                    else:
-                        statistics[collection] = 0
-                except Exception:
-                    statistics[collection] = 0
-            
-            # Calculate total data size (approximate)
-            total_response = requests.get(f"{self.base_url}/.json", timeout=10)
-            if total_response.status_code == 200:
-                data_size_bytes = len(total_response.content)
-                data_size_mb = round(data_size_bytes / (1024 * 1024), 2)
-                statistics['data_size_mb'] = data_size_mb
-            else:
-                statistics['data_size_mb'] = 0
+            collector = StatisticsCollector(self.db)
+            statistics = collector.collect(collections_to_check, full=self.full_stats)
             
             self.log_test("Firebase Monitoring", "PASS", 
-                        f"Statistics collected: {statistics}")
+                        f"Statistics collected: {statistics} "
+                        f"({statistics['bytes_transferred']} bytes in {statistics['requests']} requests)")
             
             # Test analytics data structure
             today = datetime.now().strftime('%Y-%m-%d')
@@ -520,10 +514,9 @@ class FirebaseTestSuite:
                 }
             }
             
-            analytics_response = requests.put(
-                f"{self.base_url}/analytics/{today}.json",
-                json=analytics_data,
-                timeout=10
+            analytics_response = self.db.put(
+                f"analytics/{today}",
+                analytics_data
             )
             
             if analytics_response.status_code == 200:
@@ -539,6 +532,7 @@ class FirebaseTestSuite:
             self.log_test("Firebase Monitoring and Statistics", "FAIL", error=str(e))
             return False
 
+    @depends(consumes=("test_user_id",))
     def test_final_quotation_pricing_issue(self) -> bool:
         """Test the specific issue: Final Quotation Pricing Display ($0 total)"""
         try:
@@ -581,10 +575,11 @@ class FirebaseTestSuite:
                 "updatedAt": datetime.now().isoformat()
             }
             
-            response = requests.put(
-                f"{self.base_url}/quotations/{quotation_id}.json",
-                json=valid_quotation,
-                timeout=10
+            self.journal.record(f"quotations/{quotation_id}")
+            
+            response = self.db.put(
+                f"quotations/{quotation_id}",
+                valid_quotation
             )
             
             if response.status_code == 200:
@@ -620,10 +615,11 @@ class FirebaseTestSuite:
                     "updatedAt": datetime.now().isoformat()
                 }
                 
-                invalid_response = requests.put(
-                    f"{self.base_url}/quotations/{invalid_quotation_id}.json",
-                    json=invalid_quotation,
-                    timeout=10
+                self.journal.record(f"quotations/{invalid_quotation_id}")
+                
+                invalid_response = self.db.put(
+                    f"quotations/{invalid_quotation_id}",
+                    invalid_quotation
                 )
                 
                 if invalid_response.status_code == 200:
@@ -647,37 +643,21 @@ class FirebaseTestSuite:
             self.log_test("Final Quotation Pricing Issue", "FAIL", error=str(e))
             return False
 
+    @depends(run_last=True)
     def cleanup_test_data(self) -> bool:
-        """Clean up test data from Firebase"""
+        """Clean up all journaled test data with a single multi-path delete"""
         try:
-            cleanup_results = []
-            
-            # Clean up test user
-            if 'test_user_id' in self.test_data:
-                response = requests.delete(f"{self.base_url}/users/{self.test_data['test_user_id']}.json", timeout=10)
-                cleanup_results.append(f"User: {response.status_code == 200}")
-            
-            # Clean up test service
-            if 'test_service_id' in self.test_data:
-                response = requests.delete(f"{self.base_url}/services/{self.test_data['test_service_id']}.json", timeout=10)
-                cleanup_results.append(f"Service: {response.status_code == 200}")
-            
-            # Clean up test quotation
-            if 'test_quotation_id' in self.test_data:
-                response = requests.delete(f"{self.base_url}/quotations/{self.test_data['test_quotation_id']}.json", timeout=10)
-                cleanup_results.append(f"Quotation: {response.status_code == 200}")
-            
-            # Clean up test access code
-            if 'test_access_code_id' in self.test_data:
-                response = requests.delete(f"{self.base_url}/access-codes/{self.test_data['test_access_code_id']}.json", timeout=10)
-                cleanup_results.append(f"Access Code: {response.status_code == 200}")
-            
-            success_count = sum(1 for result in cleanup_results if "True" in result)
-            total_count = len(cleanup_results)
+            paths = self.journal.paths()
+            responses = self.journal.cleanup(self.db)
             
-            self.log_test("Test Data Cleanup", "PASS", 
-                        f"Cleaned up {success_count}/{total_count} test records")
-            return True
+            if all(response.status_code == 200 for response in responses):
+                self.log_test("Test Data Cleanup", "PASS", 
+                            f"Cleaned up {len(paths)} test records in {len(responses)} request(s)")
+                return True
+            else:
+                self.log_test("Test Data Cleanup", "FAIL", 
+                            f"Bulk delete failed; run --sweep-journal to retry from {self.journal.path}")
+                return False
             
         except Exception as e:
             self.log_test("Test Data Cleanup", "FAIL", error=str(e))
@@ -701,17 +681,16 @@ class FirebaseTestSuite:
             self.cleanup_test_data
         ]
         
-        passed_tests = 0
         total_tests = len(test_functions)
         
-        for test_func in test_functions:
-            try:
-                result = test_func()
-                if result:
-                    passed_tests += 1
-                time.sleep(1)  # Brief pause between tests
-            except Exception as e:
-                self.log_test(test_func.__name__, "FAIL", error=str(e))
+        # Run every test as soon as the test_data it consumes is available
+        scheduler = SuiteScheduler(self.test_data, max_workers=self.max_workers,
+                                  rate_limiter=self.rate_limiter)
+        results = scheduler.run(
+            test_functions,
+            on_error=lambda test_func, e: self.log_test(test_func.__name__, "FAIL", error=str(e))
+        )
+        passed_tests = sum(1 for result in results if result)
         
         # Generate summary
         success_rate = (passed_tests / total_tests) * 100
@@ -721,6 +700,14 @@ class FirebaseTestSuite:
         print("=" * 60)
         print(f"📊 Tests Passed: {passed_tests}/{total_tests} ({success_rate:.1f}%)")
         
+        http_latency = self.db.latency_summary()
+        if http_latency["calls"]:
+            print(f"🌐 HTTP Calls: {http_latency['calls']} "
+                  f"(avg {http_latency['avg_ms']:.1f} ms, max {http_latency['max_ms']:.1f} ms, "
+                  f"pool size {self.db.pool_size})")
+        latency = self.db.latency.summary()
+        print_latency_table(latency)
+        
         # Categorize results
         passed = [r for r in self.test_results if r['status'] == 'PASS']
         failed = [r for r in self.test_results if r['status'] == 'FAIL']
@@ -746,6 +733,8 @@ class FirebaseTestSuite:
             "failed_tests": len(failed),
             "partial_tests": len(partial),
             "success_rate": success_rate,
+            "http_latency": http_latency,
+            "latency": latency,
             "test_results": self.test_results
         }
 
@@ -756,23 +745,53 @@ def main():
     print("🎯 Focus: Client Quotation Management System Backend Verification")
     print("=" * 80)
     
+    parser = argparse.ArgumentParser(description="Toiral Estimate Firebase backend tests")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help="Maximum keep-alive connections to the database")
+    parser.add_argument("--full-stats", action="store_true",
+                        help="Stream full subtrees for exact sizes instead of sampling")
+    parser.add_argument("--sweep-journal", action="store_true",
+                        help="Delete data left behind by crashed runs and exit")
+    add_emulator_arguments(parser)
+    add_cassette_arguments(parser)
+    add_scheduler_arguments(parser)
+    add_store_arguments(parser)
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.sweep_journal:
+        summary = sweep_journals()
+        print_sweep_summary(summary)
+        sys.exit(1 if summary["failed"] else 0)
+    
     # Initialize and run tests
-    test_suite = FirebaseTestSuite()
+    if args.replay:
+        db, emulator = ReplayRTDBClient(args.replay, args.replay_latency, pool_size=args.pool_size), None
+    else:
+        base_url, emulator = database_url(args, DEFAULT_BASE_URL)
+        db = RTDBClient(base_url, pool_size=args.pool_size)
+        if args.record:
+            start_recording(db, args.record)
+    if (args.record or args.replay) and args.max_workers > 1:
+        print("⚠️  Running tests one at a time so generated IDs match the cassette")
+        args.max_workers = 1
+    test_suite = FirebaseTestSuite(db, max_workers=args.max_workers,
+                                  rate_limiter=RateLimiter(args.rate, burst=args.max_workers),
+                                  full_stats=args.full_stats)
     results = test_suite.run_all_tests()
+    print_cassette_summary(db)
+    if db.cassette is not None:
+        db.cassette.close()
+    db.close()
+    if emulator:
+        emulator.stop()
     
-    # Save results to file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    results_file = f"/app/firebase_test_results_{timestamp}.json"
-    
-    try:
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        print(f"\n💾 Test results saved to: {results_file}")
-    except Exception as e:
-        print(f"\n⚠️  Could not save results file: {e}")
+    # Append results to the store and check latencies against the baseline
+    run_id = save_results(args, "firebase_test", results)
+    latency_ok = gate_results(args, "firebase_test", results, run_id)
     
     # Exit with appropriate code
-    if results['success_rate'] >= 80:
+    if results['success_rate'] >= 80 and latency_ok:
         print("\n🎉 BACKEND TESTING SUCCESSFUL!")
         sys.exit(0)
     else:
@@ -13,21 +13,34 @@ This test suite verifies:
 """
 
 import requests
-import json
 import time
 import random
 import string
+import sys
+import threading
+import argparse
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-import os
-import sys
+from suite_scheduler import SuiteScheduler, RateLimiter, add_scheduler_arguments, DEFAULT_MAX_WORKERS
+from source_index import SourceIndex, shared_index
+from results_store import add_store_arguments, save_results
+from check_cache import CheckCache, source_check, add_check_cache_arguments
+from source_watch import add_watch_arguments, watch_suite
 
 class ToiralBackendTestSuite:
-    def __init__(self):
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 sources: Optional[SourceIndex] = None,
+                 check_cache: Optional[CheckCache] = None):
         """Initialize Firebase test suite with configuration"""
         self.app_url = "http://localhost:3000"
         self.firebase_url = "https://toiral-estimate-default-rtdb.asia-southeast1.firebasedatabase.app"
         self.test_results = []
+        self._log_lock = threading.Lock()
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.sources = sources or shared_index()
+        self.check_cache = check_cache
         self.test_data = {}
         
         print("🔥 TOIRAL ESTIMATE - FIREBASE BACKEND TESTING SUITE")
@@ -44,14 +57,22 @@ class ToiralBackendTestSuite:
             "error": error,
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(result)
-        
         status_emoji = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
-        print(f"{status_emoji} {test_name}: {status}")
-        if details:
-            print(f"   📝 {details}")
-        if error:
-            print(f"   🚨 {error}")
+        
+        # Tests run concurrently; keep each entry's lines together
+        with self._log_lock:
+            self.test_results.append(result)
+            if self.check_cache:
+                self.check_cache.record(result)
+            print(f"{status_emoji} {test_name}: {status}")
+            if details:
+                print(f"   📝 {details}")
+            if error:
+                print(f"   🚨 {error}")
+
+    def _replay(self, entry: Dict[str, Any]):
+        """Log a stored entry of a check whose sources did not change"""
+        self.log_test(entry["test"], entry["status"], entry["details"], entry["error"])
 
     def generate_test_id(self) -> str:
         """Generate unique test ID"""
@@ -84,8 +105,8 @@ class ToiralBackendTestSuite:
     def test_firebase_connectivity(self) -> bool:
         """Test basic Firebase Realtime Database connectivity"""
         try:
-            # Test basic read access
-            response = requests.get(f"{self.firebase_url}/.json", timeout=10)
+            # Test basic read access (shallow, so only the top-level keys are sent)
+            response = requests.get(f"{self.firebase_url}/.json", params={"shallow": "true"}, timeout=10)
             
             if response.status_code == 200:
                 self.log_test("Firebase Connectivity", "PASS", 
@@ -100,18 +121,18 @@ class ToiralBackendTestSuite:
             self.log_test("Firebase Connectivity", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_firebase_service_files(self) -> bool:
         """Test Firebase service file structure and functions"""
         try:
             firebase_service_path = "/app/src/services/firebaseService.ts"
             
-            if not os.path.exists(firebase_service_path):
+            if not self.sources.exists(firebase_service_path):
                 self.log_test("Firebase Service Files", "FAIL", 
                             "firebaseService.ts not found")
                 return False
             
-            with open(firebase_service_path, 'r') as f:
-                service_content = f.read()
+            service_symbols = self.sources.symbols(firebase_service_path)
             
             # Check for essential functions
             required_functions = [
@@ -125,7 +146,7 @@ class ToiralBackendTestSuite:
             
             missing_functions = []
             for func in required_functions:
-                if f"export const {func}" not in service_content:
+                if not service_symbols.exports_value(func):
                     missing_functions.append(func)
             
             if not missing_functions:
@@ -137,7 +158,7 @@ class ToiralBackendTestSuite:
                 missing_interfaces = []
                 
                 for interface in required_interfaces:
-                    if f"interface {interface}" not in service_content:
+                    if interface not in service_symbols.interfaces:
                         missing_interfaces.append(interface)
                 
                 if not missing_interfaces:
@@ -157,18 +178,19 @@ class ToiralBackendTestSuite:
             self.log_test("Firebase Service Files", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_access_code_service(self) -> bool:
         """Test access code generation and validation service"""
         try:
             access_code_service_path = "/app/src/services/accessCodeService.ts"
             
-            if not os.path.exists(access_code_service_path):
+            if not self.sources.exists(access_code_service_path):
                 self.log_test("Access Code Service", "FAIL", 
                             "accessCodeService.ts not found")
                 return False
             
-            with open(access_code_service_path, 'r') as f:
-                service_content = f.read()
+            service_content = self.sources.text(access_code_service_path)
+            service_symbols = self.sources.symbols(access_code_service_path)
             
             # Check for essential access code functions
             required_functions = [
@@ -180,7 +202,7 @@ class ToiralBackendTestSuite:
             
             missing_functions = []
             for func in required_functions:
-                if f"export const {func}" not in service_content:
+                if not service_symbols.exports_value(func):
                     missing_functions.append(func)
             
             if not missing_functions:
@@ -188,7 +210,7 @@ class ToiralBackendTestSuite:
                             f"All {len(required_functions)} functions found")
                 
                 # Check for proper access code structure
-                if "interface AccessCode" in service_content:
+                if "AccessCode" in service_symbols.interfaces:
                     self.log_test("Access Code Interface", "PASS", 
                                 "AccessCode interface defined")
                     
@@ -214,21 +236,22 @@ class ToiralBackendTestSuite:
             self.log_test("Access Code Service", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_email_service_integration(self) -> bool:
         """Test EmailJS integration and invitation system"""
         try:
             email_service_path = "/app/src/services/emailService.ts"
             
-            if not os.path.exists(email_service_path):
+            if not self.sources.exists(email_service_path):
                 self.log_test("Email Service Integration", "FAIL", 
                             "emailService.ts not found")
                 return False
             
-            with open(email_service_path, 'r') as f:
-                service_content = f.read()
+            service_content = self.sources.text(email_service_path)
+            service_symbols = self.sources.symbols(email_service_path)
             
             # Check for EmailJS import
-            if "from '@emailjs/browser'" in service_content:
+            if "@emailjs/browser" in service_symbols.imports:
                 self.log_test("EmailJS Import", "PASS", 
                             "EmailJS library imported correctly")
             else:
@@ -237,13 +260,14 @@ class ToiralBackendTestSuite:
                 return False
             
             # Check for invitation email function
-            if "sendInvitationEmail" in service_content:
+            if service_symbols.exports_value("sendInvitationEmail"):
                 self.log_test("Invitation Email Function", "PASS", 
                             "sendInvitationEmail function found")
                 
                 # Check for proper EmailJS configuration usage
                 emailjs_vars = ["EMAILJS_SERVICE_ID", "EMAILJS_TEMPLATE_ID", "EMAILJS_USER_ID"]
-                config_found = all(var in service_content for var in emailjs_vars)
+                config_matches = self.sources.match(email_service_path, emailjs_vars)
+                config_found = config_matches.all()
                 
                 if config_found:
                     self.log_test("EmailJS Configuration Usage", "PASS", 
@@ -260,7 +284,7 @@ class ToiralBackendTestSuite:
                         return False
                 else:
                     self.log_test("EmailJS Configuration Usage", "FAIL", 
-                                "EmailJS environment variables not used properly")
+                                f"EmailJS environment variables not used properly: {config_matches.describe()}")
                     return False
             else:
                 self.log_test("Invitation Email Function", "FAIL", 
@@ -271,21 +295,22 @@ class ToiralBackendTestSuite:
             self.log_test("Email Service Integration", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_authentication_context(self) -> bool:
         """Test authentication context and access code login"""
         try:
             auth_context_path = "/app/src/contexts/AuthContext.tsx"
             
-            if not os.path.exists(auth_context_path):
+            if not self.sources.exists(auth_context_path):
                 self.log_test("Authentication Context", "FAIL", 
                             "AuthContext.tsx not found")
                 return False
             
-            with open(auth_context_path, 'r') as f:
-                auth_content = f.read()
+            auth_content = self.sources.text(auth_context_path)
+            auth_symbols = self.sources.symbols(auth_context_path)
             
             # Check for access code login function
-            if "loginWithAccessCode" in auth_content:
+            if "loginWithAccessCode" in auth_symbols.declarations:
                 self.log_test("Access Code Login Function", "PASS", 
                             "loginWithAccessCode function found")
                 
@@ -325,25 +350,26 @@ class ToiralBackendTestSuite:
             self.log_test("Authentication Context", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_final_quotation_pricing_logic(self) -> bool:
         """Test Final Quotation Page pricing calculation logic"""
         try:
             final_quotation_path = "/app/src/pages/FinalQuotationPage.tsx"
             
-            if not os.path.exists(final_quotation_path):
+            if not self.sources.exists(final_quotation_path):
                 self.log_test("Final Quotation Page", "FAIL", 
                             "FinalQuotationPage.tsx not found")
                 return False
             
-            with open(final_quotation_path, 'r') as f:
-                page_content = f.read()
+            page_content = self.sources.text(final_quotation_path)
+            page_symbols = self.sources.symbols(final_quotation_path)
             
             # Check for pricing calculation functions
             pricing_functions = ["calculateSubtotal", "calculateTotal"]
             missing_functions = []
             
             for func in pricing_functions:
-                if f"const {func}" not in page_content:
+                if func not in page_symbols.declarations:
                     missing_functions.append(func)
             
             if not missing_functions:
@@ -405,18 +431,18 @@ class ToiralBackendTestSuite:
             self.log_test("Final Quotation Pricing Logic", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_admin_invitation_system(self) -> bool:
         """Test admin invitation modal and system"""
         try:
             invite_modal_path = "/app/src/components/admin/InviteUserModal.tsx"
             
-            if not os.path.exists(invite_modal_path):
+            if not self.sources.exists(invite_modal_path):
                 self.log_test("Admin Invitation Modal", "FAIL", 
                             "InviteUserModal.tsx not found")
                 return False
             
-            with open(invite_modal_path, 'r') as f:
-                modal_content = f.read()
+            modal_content = self.sources.text(invite_modal_path)
             
             # Check for access code creation
             if "createAccessCode" in modal_content:
@@ -468,6 +494,7 @@ class ToiralBackendTestSuite:
             self.log_test("Admin Invitation System", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_data_flow_architecture(self) -> bool:
         """Test complete workflow: Admin creates service → Client selects service → Quotation generated"""
         try:
@@ -477,14 +504,13 @@ class ToiralBackendTestSuite:
             
             # Check which services page is being used
             app_tsx_path = "/app/src/App.tsx"
-            with open(app_tsx_path, 'r') as f:
-                app_content = f.read()
+            app_content = self.sources.text(app_tsx_path)
             
             if "ServicesPageNew" in app_content:
                 services_path = services_page_new_path
                 self.log_test("Services Page Implementation", "PASS", 
                             "Using ServicesPageNew with Firebase integration")
-            elif os.path.exists(services_page_old_path):
+            elif self.sources.exists(services_page_old_path):
                 services_path = services_page_old_path
                 self.log_test("Services Page Implementation", "WARN", 
                             "Using old ServicesPage - may have hardcoded data")
@@ -494,8 +520,7 @@ class ToiralBackendTestSuite:
                 return False
             
             # Check services page for Firebase integration
-            with open(services_path, 'r') as f:
-                services_content = f.read()
+            services_content = self.sources.text(services_path)
             
             if "getAllServices" in services_content:
                 self.log_test("Service Data Loading", "PASS", 
@@ -503,9 +528,8 @@ class ToiralBackendTestSuite:
                 
                 # Check AddOns Modal
                 addons_modal_path = "/app/src/components/AddOnsModal.tsx"
-                if os.path.exists(addons_modal_path):
-                    with open(addons_modal_path, 'r') as f:
-                        addons_content = f.read()
+                if self.sources.exists(addons_modal_path):
+                    addons_content = self.sources.text(addons_modal_path)
                     
                     if "servicePackage" in addons_content and "addOns" in addons_content:
                         self.log_test("Add-ons Data Flow", "PASS", 
@@ -518,8 +542,7 @@ class ToiralBackendTestSuite:
                             
                             # Check Final Quotation Page Firebase integration
                             final_quotation_path = "/app/src/pages/FinalQuotationPage.tsx"
-                            with open(final_quotation_path, 'r') as f:
-                                final_content = f.read()
+                            final_content = self.sources.text(final_quotation_path)
                             
                             if "createQuotation" in final_content:
                                 self.log_test("Quotation Firebase Integration", "PASS", 
@@ -579,17 +602,20 @@ class ToiralBackendTestSuite:
             self.test_data_flow_architecture
         ]
         
-        passed_tests = 0
+        if self.check_cache:
+            # Static checks whose sources are unchanged replay their stored entries
+            test_functions = [self.check_cache.wrap(func, self._replay) for func in test_functions]
+        
         total_tests = len(test_functions)
         
-        for test_func in test_functions:
-            try:
-                result = test_func()
-                if result:
-                    passed_tests += 1
-                time.sleep(0.5)  # Brief pause between tests
-            except Exception as e:
-                self.log_test(test_func.__name__, "FAIL", error=str(e))
+        # Run every test as soon as the test_data it consumes is available
+        scheduler = SuiteScheduler(self.test_data, max_workers=self.max_workers,
+                                  rate_limiter=self.rate_limiter)
+        results = scheduler.run(
+            test_functions,
+            on_error=lambda test_func, e: self.log_test(test_func.__name__, "FAIL", error=str(e))
+        )
+        passed_tests = sum(1 for result in results if result)
         
         # Generate summary
         success_rate = (passed_tests / total_tests) * 100
@@ -629,19 +655,30 @@ class ToiralBackendTestSuite:
 
 def main():
     """Main function to run Firebase backend tests"""
-    test_suite = ToiralBackendTestSuite()
-    results = test_suite.run_all_tests()
+    parser = argparse.ArgumentParser(description="Toiral Estimate Firebase backend tests")
+    add_scheduler_arguments(parser)
+    add_store_arguments(parser)
+    add_check_cache_arguments(parser)
+    add_watch_arguments(parser)
+    args = parser.parse_args()
     
-    # Save results to file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    results_file = f"/app/backend_test_results_{timestamp}.json"
+    if args.watch:
+        # Stored verdicts are only shared with later runs when --incremental is given too
+        return watch_suite(ToiralBackendTestSuite(), "backend_test",
+                           args.check_cache if args.incremental else ":memory:", args.poll_interval)
+    
+    check_cache = (CheckCache("backend_test", shared_index(), args.check_cache)
+                   if args.incremental else None)
+    test_suite = ToiralBackendTestSuite(max_workers=args.max_workers,
+                                       rate_limiter=RateLimiter(args.rate, burst=args.max_workers),
+                                       check_cache=check_cache)
+    results = test_suite.run_all_tests()
+    if check_cache:
+        print(f"\n{check_cache.summary()}")
+        check_cache.close()
     
-    try:
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        print(f"\n💾 Test results saved to: {results_file}")
-    except Exception as e:
-        print(f"\n⚠️  Could not save results file: {e}")
+    # Append results to the store
+    save_results(args, "backend_test", results)
     
     # Exit with appropriate code
     if results['success_rate'] >= 80:
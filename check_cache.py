@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Incremental Check Cache for Toiral Estimate Static-Analysis Suites
+Replays a static test's stored verdict while nothing it read has changed
+
+phase5_comprehensive_test.py and the other static suites re-read and re-check
+every component on each run, even when nothing under src/ changed. With
+--incremental, every test marked @source_check runs inside
+SourceIndex.track(), and its verdict and log entries are stored with:
+
+  fingerprint    SHA-256 of the test's compiled body (bytecode, names and
+                 constants, so its inline pattern lists) and of the checker
+                 modules (source_index, ts_symbols, pattern_matcher)
+  dependencies   every file it looked up, at (mtime, size, SHA-256), or as
+                 missing if it did not exist
+  patterns       the pattern lists it matched
+
+On the next run a test whose fingerprint matches and whose dependencies all
+still stat the same (or, if touched, still hash the same) replays its log
+entries without running; a change to one file re-runs exactly the tests that
+read it. Tests that reach the network, the clock or files outside the index
+are not marked and always run.
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+from source_index import SourceIndex, SourceAccess
+
+DEFAULT_CHECK_CACHE_PATH = "/app/check_cache.db"
+CHECKER_MODULES = ("source_index", "ts_symbols", "pattern_matcher")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    suite        TEXT NOT NULL,
+    test         TEXT NOT NULL,
+    fingerprint  TEXT NOT NULL,
+    dependencies TEXT NOT NULL,
+    patterns     TEXT NOT NULL,
+    result       INTEGER NOT NULL,
+    entries      TEXT NOT NULL,
+    checked_at   TEXT NOT NULL,
+    PRIMARY KEY (suite, test)
+);
+"""
+
+
+def source_check(func: Callable) -> Callable:
+    """Mark a test whose verdict depends only on the files it reads through the SourceIndex"""
+    func.source_check = True
+    return func
+
+
+def add_check_cache_arguments(parser: argparse.ArgumentParser):
+    """Register the shared --incremental and --check-cache options on a suite's parser"""
+    parser.add_argument("--incremental", action="store_true",
+                        help="Replay stored verdicts of static checks whose sources did not change")
+    parser.add_argument("--check-cache", default=DEFAULT_CHECK_CACHE_PATH,
+                        help="SQLite file holding the stored check verdicts")
+
+
+_checker_hash: Optional[str] = None
+
+
+def _code_digest(code, digest):
+    """Feed a code object's bytecode, names and constants (not its line numbers) to `digest`"""
+    digest.update(code.co_code)
+    digest.update(repr((code.co_names, code.co_varnames)).encode())
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _code_digest(const, digest)
+        elif isinstance(const, frozenset):
+            # Set literals iterate in hash order, which changes between processes
+            digest.update(repr(sorted(map(repr, const))).encode())
+        else:
+            digest.update(repr(const).encode())
+
+
+def fingerprint(func: Callable) -> str:
+    """SHA-256 of a test's compiled body (its inline pattern lists included) and of the checker modules"""
+    global _checker_hash
+    if _checker_hash is None:
+        digest = hashlib.sha256()
+        for name in CHECKER_MODULES:
+            module = sys.modules.get(name)
+            if module is not None and getattr(module, "__file__", None):
+                with open(module.__file__, "rb") as f:
+                    digest.update(f.read())
+        _checker_hash = digest.hexdigest()
+    digest = hashlib.sha256(_checker_hash.encode())
+    _code_digest(getattr(func, "__func__", func).__code__, digest)
+    return digest.hexdigest()
+
+
+class CheckCache:
+    def __init__(self, suite: str, sources: SourceIndex, path: str = DEFAULT_CHECK_CACHE_PATH):
+        """Stored verdicts of `suite`'s source checks, loaded from the SQLite file at `path`"""
+        self.suite = suite
+        self.sources = sources
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._rows = {test: {"fingerprint": stored_fingerprint, "dependencies": json.loads(dependencies),
+                             "patterns": json.loads(patterns), "result": bool(result), "entries": json.loads(entries)}
+                      for test, stored_fingerprint, dependencies, patterns, result, entries in self.conn.execute(
+                          "SELECT test, fingerprint, dependencies, patterns, result, entries FROM checks"
+                          " WHERE suite = ?", (suite,))}
+        self.stats = {"cached": 0, "checked": 0, "uncached": 0}
+
+    def close(self):
+        """Close the underlying connection"""
+        self.conn.close()
+
+    def __enter__(self) -> "CheckCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, entry: Dict[str, Any]):
+        """Keep a log_test() entry of the source check running on this thread"""
+        entries = getattr(self._local, "entries", None)
+        if entries is not None:
+            entries.append({key: entry.get(key, "") for key in ("test", "status", "details", "error")})
+
+    def _unchanged(self, dependencies: Dict[str, Optional[List[Any]]]) -> Optional[bool]:
+        """True if no dependency changed, None if only their mtimes did, False otherwise"""
+        touched = False
+        for path, stored in dependencies.items():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                if stored is None:
+                    continue
+                return False
+            if stored is None:
+                return False
+            if [stat.st_mtime_ns, stat.st_size] == stored[:2]:
+                continue
+            source = self.sources.get(path)
+            if source is None or source.sha256 != stored[2]:
+                return False
+            touched = True
+        return None if touched else True
+
+    def lookup(self, func: Callable) -> Optional[Dict[str, Any]]:
+        """Stored {"result", "entries"} for `func` if still valid, else None"""
+        row = self._rows.get(func.__name__)
+        if row is None or row["fingerprint"] != fingerprint(func):
+            return None
+        unchanged = self._unchanged(row["dependencies"])
+        if unchanged is False:
+            return None
+        if unchanged is None:
+            # Touched but identical: refresh the stored stats so the next lookup needs no hashing
+            with self.sources.track() as access:
+                for path in row["dependencies"]:
+                    self.sources.get(path)
+            access.patterns = row["patterns"]
+            self._store(func, access, row["result"], row["entries"])
+        return row
+
+    def _store(self, func: Callable, access: SourceAccess, result: bool, entries: List[Dict[str, Any]]):
+        row = {"fingerprint": fingerprint(func),
+               "dependencies": {path: list(stat) if stat else None for path, stat in access.files.items()},
+               "patterns": [list(patterns) for patterns in access.patterns], "result": result, "entries": entries}
+        with self._lock:
+            self._rows[func.__name__] = row
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checks (suite, test, fingerprint, dependencies, patterns, result,"
+                    " entries, checked_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.suite, func.__name__, row["fingerprint"], json.dumps(row["dependencies"], sort_keys=True),
+                     json.dumps(row["patterns"]), int(result), json.dumps(entries),
+                     datetime.now().isoformat(timespec="seconds")))
+
+    def verdict(self, name: str) -> Optional[Dict[str, Any]]:
+        """Stored result, entries, dependencies and patterns of test `name`, if any"""
+        return self._rows.get(name)
+
+    def dependents(self, paths: Iterable[str]) -> List[str]:
+        """Tests with a stored verdict that looked up any of `paths`"""
+        paths = set(paths)
+        return [name for name, row in self._rows.items() if paths & row["dependencies"].keys()]
+
+    def wrap(self, func: Callable, replay: Callable[[Dict[str, Any]], None]) -> Callable:
+        """`func` replaying its stored entries through `replay` when valid, else running and storing them"""
+        if not getattr(func, "source_check", False):
+            with self._lock:
+                self.stats["uncached"] += 1
+            return func
+
+        @functools.wraps(func)
+        def run() -> bool:
+            cached = self.lookup(func)
+            if cached is not None:
+                with self._lock:
+                    self.stats["cached"] += 1
+                for entry in cached["entries"]:
+                    replay(entry)
+                return cached["result"]
+            self._local.entries = []
+            try:
+                with self.sources.track() as access:
+                    result = bool(func())
+                # A test that raised is reported by the scheduler and not stored
+                self._store(func, access, result, self._local.entries)
+            finally:
+                self._local.entries = None
+            with self._lock:
+                self.stats["checked"] += 1
+            return result
+
+        return run
+
+    def summary(self) -> str:
+        """One-line account of how many tests were replayed, re-checked and not cacheable"""
+        return (f"♻️  Incremental: {self.stats['cached']} cached verdict(s), {self.stats['checked']} re-checked, "
+                f"{self.stats['uncached']} always run")
+
+
+def main():
+    """List or clear stored check verdicts"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate incremental check cache")
+    parser.add_argument("--db", default=DEFAULT_CHECK_CACHE_PATH, help="SQLite check cache")
+    parser.add_argument("--suite", help="Only this suite's checks")
+    parser.add_argument("--clear", action="store_true", help="Forget the stored verdicts")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    conn.executescript(SCHEMA)
+    where, params = ("WHERE suite = ?", (args.suite,)) if args.suite else ("", ())
+    if args.clear:
+        with conn:
+            deleted = conn.execute(f"DELETE FROM checks {where}", params).rowcount
+        print(f"🧹 Cleared {deleted} stored verdict(s)")
+        return
+    rows = conn.execute(f"SELECT suite, test, result, dependencies, patterns, checked_at FROM checks {where}"
+                        " ORDER BY suite, test", params).fetchall()
+    if not rows:
+        print("📭 No stored verdicts")
+        return
+    for suite, test, result, dependencies, patterns, checked_at in rows:
+        print(f"{'✅' if result else '❌'} {suite}.{test}  ({len(json.loads(dependencies))} file(s), "
+              f"{sum(len(p) for p in json.loads(patterns))} pattern(s), checked {checked_at})")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Crash-Safe Cleanup Journal for Toiral Estimate Backend Test Suites
+Append-only record of every database path a test run creates
+
+Each path is appended (and fsync'd) to a local NDJSON journal before the write
+that creates it is sent, so a run that dies half-way still leaves a complete
+list of what it may have created. Cleanup deletes everything in the journal
+with multi-path PATCH requests of nulls, and sweep_journals() replays leftover
+journals from crashed runs in bulk.
+"""
+
+import json
+import os
+import socket
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Tuple
+
+import requests
+
+from rtdb_client import BaseRTDBClient, RTDBClient, DEFAULT_MAX_BATCH_BYTES
+
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cleanup-journal")
+
+
+def collapse_paths(paths: List[str]) -> List[str]:
+    """Drop paths whose ancestor is also being deleted (RTDB rejects overlapping updates)"""
+    unique = set(p.strip("/") for p in paths if p.strip("/"))
+    kept = []
+    for path in sorted(unique):
+        parts = path.split("/")
+        if any("/".join(parts[:i]) in unique for i in range(1, len(parts))):
+            continue
+        kept.append(path)
+    return kept
+
+
+def delete_paths(db: BaseRTDBClient, paths: List[str],
+                 max_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> List[Any]:
+    """Delete many paths with as few multi-path PATCH requests as possible"""
+    batch = db.batch("", max_bytes=max_bytes)
+    for path in collapse_paths(paths):
+        batch.delete(path)
+    return batch.commit()
+
+
+class CleanupJournal:
+    def __init__(self, suite: str, base_url: str, journal_dir: str = DEFAULT_JOURNAL_DIR):
+        """Journal for one suite run; the file is created on the first record"""
+        self.suite = suite
+        self.base_url = base_url
+        self.journal_dir = journal_dir
+        self.path = os.path.join(
+            journal_dir, f"{suite}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl"
+        )
+        self._paths: List[str] = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._append({
+            "suite": self.suite,
+            "base_url": self.base_url,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "started": datetime.now().isoformat()
+        })
+
+    def _append(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, path: str):
+        """Durably note a path before it is written"""
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._append({"path": path.strip("/")})
+            self._paths.append(path.strip("/"))
+
+    def record_many(self, paths: List[str]):
+        """Durably note several paths with a single fsync"""
+        with self._lock:
+            if self._file is None:
+                self._open()
+            lines = [json.dumps({"path": path.strip("/")}) + "\n" for path in paths]
+            self._file.write("".join(lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._paths.extend(path.strip("/") for path in paths)
+
+    def paths(self) -> List[str]:
+        """Paths recorded so far, in recording order"""
+        with self._lock:
+            return list(self._paths)
+
+    def cleanup(self, db: BaseRTDBClient, max_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> List[Any]:
+        """Delete every journaled path; the journal is removed only if all deletes succeed"""
+        responses = delete_paths(db, self.paths(), max_bytes)
+        if all(response.status_code == 200 for response in responses):
+            self.discard()
+        return responses
+
+    def discard(self):
+        """Close and remove the journal file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                os.remove(self.path)
+            self._paths = []
+
+
+def read_journal(journal_file: str) -> Tuple[Dict[str, Any], List[str]]:
+    """Return (header, paths) from a journal, ignoring a torn final line"""
+    header: Dict[str, Any] = {}
+    paths: List[str] = []
+    with open(journal_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "path" in entry:
+                paths.append(entry["path"])
+            else:
+                header = entry
+    return header, paths
+
+
+def _owner_alive(header: Dict[str, Any]) -> bool:
+    """True if the run that wrote the journal is still running on this host"""
+    if header.get("host") != socket.gethostname() or not header.get("pid"):
+        return False
+    try:
+        os.kill(header["pid"], 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return header["pid"] != os.getpid()
+
+
+def sweep_journals(journal_dir: str = DEFAULT_JOURNAL_DIR,
+                   max_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> Dict[str, Any]:
+    """Delete everything recorded by leftover journals, grouped per database"""
+    summary = {"journals": 0, "paths": 0, "requests": 0, "failed": [], "skipped": []}
+    if not os.path.isdir(journal_dir):
+        return summary
+
+    by_database: Dict[str, List[Tuple[str, List[str]]]] = {}
+    for name in sorted(os.listdir(journal_dir)):
+        if not name.endswith(".jsonl"):
+            continue
+        journal_file = os.path.join(journal_dir, name)
+        header, paths = read_journal(journal_file)
+        if _owner_alive(header):
+            summary["skipped"].append(journal_file)
+            continue
+        base_url = header.get("base_url")
+        if not base_url:
+            summary["failed"].append(journal_file)
+            continue
+        by_database.setdefault(base_url, []).append((journal_file, paths))
+
+    for base_url, journals in by_database.items():
+        db = RTDBClient(base_url)
+        try:
+            all_paths = [path for _, paths in journals for path in paths]
+            try:
+                responses = delete_paths(db, all_paths, max_bytes)
+            except requests.exceptions.RequestException:
+                # e.g. an emulator that exited together with its crashed run
+                summary["failed"].extend(journal_file for journal_file, _ in journals)
+                continue
+            summary["requests"] += len(responses)
+            if all(response.status_code == 200 for response in responses):
+                for journal_file, paths in journals:
+                    os.remove(journal_file)
+                    summary["journals"] += 1
+                    summary["paths"] += len(paths)
+            else:
+                summary["failed"].extend(journal_file for journal_file, _ in journals)
+        finally:
+            db.close()
+    return summary
+
+
+def print_sweep_summary(summary: Dict[str, Any]):
+    """Print the result of a journal sweep"""
+    print(f"🧹 Swept {summary['journals']} journal(s): {summary['paths']} paths deleted "
+          f"in {summary['requests']} request(s)")
+    for journal_file in summary["skipped"]:
+        print(f"   ⏭️  Skipped journal of a running suite: {journal_file}")
+    for journal_file in summary["failed"]:
+        print(f"   🚨 Could not sweep: {journal_file}")
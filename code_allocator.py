@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Collision-Free Code Allocator for Toiral Estimate
+Hands out batches of unique client codes and access codes
+
+generate_client_code draws "CLI" + 3 digits + 2 letters (608,400 codes) and
+generate_access_code 8 characters from A-Z0-9, and neither looks at what is
+already issued. CodeAllocator knows every issued code:
+
+  * a Bloom filter answers "certainly free" for most candidates in O(k)
+  * a sorted array of code ordinals (8 bytes per code) settles the rest with
+    bisect, and enumerates the free ordinals when the space is crowded
+
+It is seeded by streaming the collections that hold existing codes. Random
+candidates are drawn while the space is sparse; once a batch would leave it
+more than half full, the batch instead samples distinct ranks among the free
+ordinals and maps them to codes in one merge pass over the sorted array, so a
+crowded space costs no retries at all. With --reserve every code is claimed
+through a conditional write (if-match: null_etag) on its index node, so two
+allocators racing for the same code cannot both win; the loser sees 412 and
+draws again. stats() reports how full the space is and the retry rate to
+expect at that fill.
+"""
+
+import argparse
+import bisect
+import hashlib
+import heapq
+import math
+import random
+import string
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Set
+
+from rtdb_client import BaseRTDBClient, RTDBClient, DEFAULT_BASE_URL
+from rtdb_emulator import NULL_ETAG, add_emulator_arguments, database_url
+from rtdb_stream import stream_members
+
+DEFAULT_ERROR_RATE = 0.01
+DENSE_FILL = 0.5
+MAX_RESERVE_ROUNDS = 20
+
+
+class CodeSpace:
+    def __init__(self, name: str, prefix: str, alphabets: Sequence[str], index_path: str,
+                 sources: Sequence[tuple]):
+        """Codes of the form prefix + one character from each alphabet"""
+        self.name = name
+        self.prefix = prefix
+        self.alphabets = list(alphabets)
+        self.index_path = index_path
+        self.sources = list(sources)
+        self.size = math.prod(len(alphabet) for alphabet in self.alphabets)
+        self._positions = [{char: position for position, char in enumerate(alphabet)}
+                           for alphabet in self.alphabets]
+
+    def encode(self, ordinal: int) -> str:
+        """Code with the given ordinal (0 <= ordinal < size)"""
+        chars = []
+        for alphabet in reversed(self.alphabets):
+            ordinal, position = divmod(ordinal, len(alphabet))
+            chars.append(alphabet[position])
+        return self.prefix + "".join(reversed(chars))
+
+    def ordinal(self, code: str) -> Optional[int]:
+        """Ordinal of `code`, or None if it is not in this space"""
+        if not code.startswith(self.prefix) or len(code) != len(self.prefix) + len(self.alphabets):
+            return None
+        value = 0
+        for char, alphabet, positions in zip(code[len(self.prefix):], self.alphabets, self._positions):
+            position = positions.get(char)
+            if position is None:
+                return None
+            value = value * len(alphabet) + position
+        return value
+
+
+DIGITS_100_999 = ["123456789", string.digits, string.digits]
+CLIENT_CODES = CodeSpace("client", "CLI", DIGITS_100_999 + [string.ascii_uppercase] * 2,
+                         "workflow/client-code-index", [("workflow/clients", "clientCode")])
+ACCESS_CODES = CodeSpace("access", "", [string.ascii_uppercase + string.digits] * 8,
+                         "access-code-index", [("access-codes", "code"), ("workflow/clients", "accessCode")])
+CODE_SPACES = {space.name: space for space in (CLIENT_CODES, ACCESS_CODES)}
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        """Bloom filter sized for `capacity` items at `error_rate` false positives"""
+        self.capacity = max(1, capacity)
+        self.bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: int) -> Iterable[int]:
+        digest = hashlib.blake2b(value.to_bytes(8, "little"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.bits for i in range(self.hashes))
+
+    def add(self, value: int):
+        """Insert an integer"""
+        for position in self._positions(value):
+            self._array[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: int) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+
+class CodeAllocator:
+    def __init__(self, space: CodeSpace, expected: int = 0, seed: Optional[int] = None,
+                 error_rate: float = DEFAULT_ERROR_RATE):
+        """Allocator for `space`, with its filter sized for about `expected` issued codes"""
+        self.space = space
+        self.rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        self.error_rate = error_rate
+        self.taken = array("Q")
+        self._recent: Set[int] = set()
+        self.bloom = BloomFilter(max(expected, 1024), error_rate)
+        self.retries = 0
+        self.allocated = 0
+        self.conflicts = 0
+
+    def __len__(self) -> int:
+        return len(self.taken) + len(self._recent)
+
+    def __contains__(self, code: str) -> bool:
+        ordinal = self.space.ordinal(code)
+        return ordinal is not None and self._is_taken(ordinal)
+
+    def _is_taken(self, ordinal: int) -> bool:
+        if ordinal not in self.bloom:
+            return False
+        if ordinal in self._recent:
+            return True
+        position = bisect.bisect_left(self.taken, ordinal)
+        return position < len(self.taken) and self.taken[position] == ordinal
+
+    def _compact(self):
+        """Merge recently taken ordinals into the sorted array"""
+        if self._recent:
+            self.taken = array("Q", heapq.merge(self.taken, sorted(self._recent)))
+            self._recent = set()
+
+    def _grow_filter(self):
+        """Rebuild the Bloom filter once it holds more codes than it was sized for"""
+        self._compact()
+        self.bloom = BloomFilter(len(self.taken) * 2, self.error_rate)
+        for ordinal in self.taken:
+            self.bloom.add(ordinal)
+
+    def mark_taken(self, codes: Iterable[str]) -> int:
+        """Record existing codes; returns how many belonged to this space"""
+        added = 0
+        for code in codes:
+            ordinal = self.space.ordinal(code) if isinstance(code, str) else None
+            if ordinal is None or self._is_taken(ordinal):
+                continue
+            self._recent.add(ordinal)
+            self.bloom.add(ordinal)
+            added += 1
+            if self.bloom.count > self.bloom.capacity:
+                self._grow_filter()
+        self._compact()
+        return added
+
+    def seed_from_database(self, db: BaseRTDBClient) -> int:
+        """Stream the space's source collections and its index node, marking every code found"""
+        found = 0
+        for path, field in self.space.sources + [(self.space.index_path, None)]:
+            params = {"shallow": "true"} if field is None else None
+            response = db.get(path, params=params, stream=True)
+            if response.status_code != 200:
+                response.close()
+                raise RuntimeError(f"HTTP {response.status_code} reading '{path}'")
+            members = stream_members(response)
+            found += self.mark_taken(key if field is None else record.get(field)
+                                     for key, record in members if field is None or isinstance(record, dict))
+        return found
+
+    def _draw(self) -> int:
+        """A uniformly random free ordinal, by rejection"""
+        while True:
+            ordinal = self.rng.randrange(self.space.size)
+            if not self._is_taken(ordinal):
+                return ordinal
+            self.retries += 1
+
+    def _draw_dense(self, count: int) -> List[int]:
+        """`count` distinct free ordinals sampled by rank among the free ones, in random order"""
+        self._compact()
+        ranks = sorted(self.rng.sample(range(self.space.size - len(self.taken)), count))
+        ordinals, position = [], 0
+        for rank in ranks:
+            # taken[i] - i free ordinals lie below taken[i]; skip taken codes at or below the target
+            while position < len(self.taken) and self.taken[position] - position <= rank:
+                position += 1
+            ordinals.append(rank + position)
+        self.rng.shuffle(ordinals)
+        return ordinals
+
+    def allocate(self, count: int) -> List[str]:
+        """`count` codes unique among themselves and every code seen so far"""
+        if len(self) + count > self.space.size:
+            raise RuntimeError(f"Only {self.space.size - len(self):,} {self.space.name} codes are left "
+                               f"of {self.space.size:,}; cannot allocate {count:,}")
+        dense = (len(self) + count) / self.space.size > DENSE_FILL
+        ordinals = self._draw_dense(count) if dense else None
+        codes = []
+        for n in range(count):
+            ordinal = ordinals[n] if dense else self._draw()
+            self._recent.add(ordinal)
+            self.bloom.add(ordinal)
+            if self.bloom.count > self.bloom.capacity:
+                self._grow_filter()
+            codes.append(self.space.encode(ordinal))
+        self._compact()
+        self.allocated += count
+        return codes
+
+    def reserve(self, db: BaseRTDBClient, owners: Sequence[str]) -> Dict[str, str]:
+        """Allocate a code per owner id and claim each one on the index node; returns code → owner"""
+        reserved: Dict[str, str] = {}
+        pending = list(owners)
+        with ThreadPoolExecutor(max_workers=max(1, getattr(db, "pool_size", 1))) as pool:
+            for _ in range(MAX_RESERVE_ROUNDS):
+                if not pending:
+                    return reserved
+                codes = self.allocate(len(pending))
+                # Write only where nothing exists yet; a 412 means another writer got there first
+                responses = list(pool.map(
+                    lambda pair: db.put(f"{self.space.index_path}/{pair[0]}", pair[1],
+                                        headers={"if-match": NULL_ETAG}),
+                    zip(codes, pending)))
+                retry = []
+                for code, owner, response in zip(codes, pending, responses):
+                    if response.status_code == 200:
+                        reserved[code] = owner
+                    elif response.status_code == 412:
+                        self.conflicts += 1
+                        retry.append(owner)
+                    else:
+                        raise RuntimeError(f"HTTP {response.status_code} reserving {self.space.name} code {code}")
+                pending = retry
+        raise RuntimeError(f"Could not reserve {len(pending)} {self.space.name} code(s) "
+                           f"after {MAX_RESERVE_ROUNDS} rounds")
+
+    def stats(self) -> Dict[str, Any]:
+        """How full the space is and the retries a random draw should expect"""
+        fill = len(self) / self.space.size
+        return {
+            "space": self.space.name,
+            "size": self.space.size,
+            "taken": len(self),
+            "fill": round(fill, 6),
+            # A random draw hits a taken code with probability `fill`: fill / (1 - fill) retries per code
+            "expected_retries_per_code": round(fill / (1 - fill), 6) if fill < 1 else None,
+            "observed_retries_per_code": round(self.retries / self.allocated, 6) if self.allocated else 0.0,
+            "reservation_conflicts": self.conflicts,
+            "bloom_bits": self.bloom.bits,
+            "bloom_false_positive_rate": round(self.bloom.false_positive_rate(), 6),
+            "sorted_set_bytes": self.taken.itemsize * len(self.taken)
+        }
+
+
+def print_allocator_stats(stats: Dict[str, Any]):
+    """Print the fill and retry figures from CodeAllocator.stats()"""
+    expected = stats["expected_retries_per_code"]
+    print(f"📈 {stats['space']} codes: {stats['taken']:,} of {stats['size']:,} taken ({stats['fill']:.2%} full)")
+    print(f"🎲 Expected retries per code: {expected:.4f}" if expected is not None else "🎲 Space is full")
+    print(f"🔁 Observed retries per code: {stats['observed_retries_per_code']:.4f}, "
+          f"reservation conflicts: {stats['reservation_conflicts']}")
+    print(f"🧮 Bloom filter {stats['bloom_bits'] // 8:,} bytes "
+          f"(~{stats['bloom_false_positive_rate']:.2%} false positives), "
+          f"sorted set {stats['sorted_set_bytes']:,} bytes")
+
+
+def main():
+    """Allocate (and optionally reserve) a batch of unique codes"""
+    print("🔑 TOIRAL ESTIMATE - CODE ALLOCATOR")
+    print("=" * 80)
+
+    parser = argparse.ArgumentParser(description="Allocate collision-free client or access codes")
+    parser.add_argument("--space", choices=sorted(CODE_SPACES), default="client", help="Which codes to allocate")
+    parser.add_argument("--count", type=int, default=100, help="Codes to allocate")
+    parser.add_argument("--prefill", type=int, default=0,
+                        help="Mark this many random codes as taken first (simulates a crowded space)")
+    parser.add_argument("--from-database", action="store_true",
+                        help="Seed the allocator from the codes already stored in the database")
+    parser.add_argument("--reserve", action="store_true",
+                        help="Claim each code on its index node with a conditional write")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the random draws")
+    parser.add_argument("--show", type=int, default=10, help="Allocated codes to print")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    space = CODE_SPACES[args.space]
+    allocator = CodeAllocator(space, expected=args.prefill + args.count, seed=args.seed)
+    if args.prefill:
+        # Not the allocator's own seed, or the prefill would replay its draws
+        rng = random.Random(None if args.seed is None else f"prefill:{args.seed}")
+        ordinals = rng.sample(range(space.size), min(args.prefill, space.size))
+        allocator.mark_taken(space.encode(ordinal) for ordinal in ordinals)
+        print(f"🧱 Pre-filled {len(allocator):,} taken codes")
+
+    db, emulator = None, None
+    if args.from_database or args.reserve:
+        base_url, emulator = database_url(args, DEFAULT_BASE_URL)
+        db = RTDBClient(base_url)
+    if args.from_database:
+        print(f"📥 Seeded {allocator.seed_from_database(db):,} existing codes from the database")
+
+    start = time.perf_counter()
+    if args.reserve:
+        codes = list(allocator.reserve(db, [f"reserved-{n}" for n in range(args.count)]))
+    else:
+        codes = allocator.allocate(args.count)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {'Reserved' if args.reserve else 'Allocated'} {len(codes):,} codes in {elapsed:.3f}s")
+    for code in codes[:args.show]:
+        print(f"   {code}")
+    print_allocator_stats(allocator.stats())
+
+    if db:
+        db.close()
+    if emulator:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
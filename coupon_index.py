@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Indexed Coupon Validation for Toiral Estimate
+Answers "is this code valid for this order right now" without scanning coupons
+
+getCouponByCode in workflowService.ts downloads workflow/coupons and scans it
+for every lookup. CouponIndex keeps the coupons in memory with two indexes:
+
+  by_code   hash index from normalized code to the ids of active coupons
+  expiry    (validUntil, id) pairs kept sorted with bisect
+
+validate() applies the AddOnsSelectionModal rules (unknown or inactive code,
+expired, below minOrderAmount, usage limit reached) with one dictionary lookup.
+The expiry index lets expired coupons be pruned, or listed before they lapse,
+by slicing a prefix instead of scanning. refresh() keeps the index current by
+reading only the collection's keys (?shallow=true) and fetching just the added
+records plus any ids the caller knows have changed.
+"""
+
+import argparse
+import bisect
+import random
+import string
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from rtdb_client import BaseRTDBClient
+from rtdb_stream import stream_members
+
+COUPONS_PATH = "workflow/coupons"
+NO_EXPIRY = float("inf")
+DEFAULT_BENCHMARK_COUPONS = 100_000
+DEFAULT_BENCHMARK_LOOKUPS = 1_000_000
+
+
+def normalize_code(code: str) -> str:
+    """Coupon code as the app looks it up (trimmed, upper case)"""
+    return code.strip().upper()
+
+
+def expiry_timestamp(valid_until: Optional[str]) -> float:
+    """validUntil as a POSIX timestamp; naive times are local, as datetime.now() writes them"""
+    if not valid_until:
+        return NO_EXPIRY
+    try:
+        moment = datetime.fromisoformat(valid_until.replace("Z", "+00:00"))
+    except ValueError:
+        return NO_EXPIRY
+    return moment.timestamp()
+
+
+class CouponCheck:
+    def __init__(self, code: str, valid: bool, reason: str, coupon: Optional[Dict[str, Any]] = None):
+        """Outcome of validating one coupon code against an order"""
+        self.code = code
+        self.valid = valid
+        self.reason = reason
+        self.coupon = coupon
+
+    def __bool__(self) -> bool:
+        return self.valid
+
+    def __repr__(self) -> str:
+        return f"CouponCheck({self.code!r}, valid={self.valid}, reason={self.reason!r})"
+
+
+class CouponIndex:
+    def __init__(self):
+        """Empty coupon index; fill it with load() or refresh()"""
+        self.coupons: Dict[str, Dict[str, Any]] = {}
+        self.by_code: Dict[str, List[str]] = {}
+        self.expiry: List[Tuple[float, str]] = []
+        self._expires_at: Dict[str, float] = {}
+        self.bytes_transferred = 0
+        self.requests = 0
+
+    def __len__(self) -> int:
+        return len(self.coupons)
+
+    def _unindex(self, coupon_id: str):
+        coupon = self.coupons.pop(coupon_id, None)
+        if coupon is None:
+            return
+        code = normalize_code(str(coupon.get("code", "")))
+        ids = self.by_code.get(code)
+        if ids and coupon_id in ids:
+            ids.remove(coupon_id)
+            if not ids:
+                del self.by_code[code]
+        expires_at = self._expires_at.pop(coupon_id, None)
+        if expires_at is not None:
+            position = bisect.bisect_left(self.expiry, (expires_at, coupon_id))
+            if position < len(self.expiry) and self.expiry[position] == (expires_at, coupon_id):
+                del self.expiry[position]
+
+    def apply(self, coupon_id: str, coupon: Optional[Dict[str, Any]]):
+        """Insert, replace or (with None) remove one coupon record"""
+        self._unindex(coupon_id)
+        if not isinstance(coupon, dict):
+            return
+        self.coupons[coupon_id] = coupon
+        if coupon.get("isActive") and coupon.get("code"):
+            self.by_code.setdefault(normalize_code(str(coupon["code"])), []).append(coupon_id)
+        expires_at = expiry_timestamp(coupon.get("validUntil"))
+        if expires_at != NO_EXPIRY:
+            self._expires_at[coupon_id] = expires_at
+            bisect.insort(self.expiry, (expires_at, coupon_id))
+
+    def load(self, members: Iterable[Tuple[str, Any]]):
+        """Rebuild the index from (id, coupon) members, e.g. a streamed collection"""
+        self.coupons, self.by_code, self.expiry, self._expires_at = {}, {}, [], {}
+        for coupon_id, coupon in members:
+            if not isinstance(coupon, dict):
+                continue
+            self.coupons[coupon_id] = coupon
+            if coupon.get("isActive") and coupon.get("code"):
+                self.by_code.setdefault(normalize_code(str(coupon["code"])), []).append(coupon_id)
+            expires_at = expiry_timestamp(coupon.get("validUntil"))
+            if expires_at != NO_EXPIRY:
+                self._expires_at[coupon_id] = expires_at
+                self.expiry.append((expires_at, coupon_id))
+        self.expiry.sort()
+
+    def fetch(self, db: BaseRTDBClient):
+        """Load every coupon with one streamed read"""
+        response = db.get(COUPONS_PATH, stream=True)
+        self.requests += 1
+        if response.status_code != 200:
+            response.close()
+            raise RuntimeError(f"HTTP {response.status_code} reading '{COUPONS_PATH}'")
+        members = stream_members(response)
+        self.load(members)
+        self.bytes_transferred += members.bytes_read
+
+    def fetch_ids(self, db: BaseRTDBClient, coupon_ids: Iterable[str]):
+        """Load just the coupons `coupon_ids`, read concurrently, without touching the rest of the collection"""
+        coupon_ids = list(coupon_ids)
+        responses = db.get_many([f"{COUPONS_PATH}/{coupon_id}" for coupon_id in coupon_ids])
+        self.requests += len(coupon_ids)
+        for coupon_id, response in zip(coupon_ids, responses):
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code} reading '{COUPONS_PATH}/{coupon_id}'")
+            self.bytes_transferred += len(response.content)
+            self.apply(coupon_id, response.json())
+
+    def refresh(self, db: BaseRTDBClient, changed: Iterable[str] = ()) -> Dict[str, int]:
+        """Bring the index up to date, downloading only added coupons and the `changed` ids"""
+        response = db.get(COUPONS_PATH, params={"shallow": "true"}, stream=True)
+        self.requests += 1
+        if response.status_code != 200:
+            response.close()
+            raise RuntimeError(f"HTTP {response.status_code} reading '{COUPONS_PATH}'")
+        members = stream_members(response)
+        current = {coupon_id for coupon_id, _ in members}
+        self.bytes_transferred += members.bytes_read
+
+        removed = [coupon_id for coupon_id in self.coupons if coupon_id not in current]
+        for coupon_id in removed:
+            self._unindex(coupon_id)
+        to_fetch = sorted((current - self.coupons.keys()) | (set(changed) & current))
+        if to_fetch:
+            responses = db.get_many([f"{COUPONS_PATH}/{coupon_id}" for coupon_id in to_fetch])
+            self.requests += len(to_fetch)
+            for coupon_id, fetched in zip(to_fetch, responses):
+                if fetched.status_code == 200:
+                    self.bytes_transferred += len(fetched.content)
+                    self.apply(coupon_id, fetched.json())
+        return {"fetched": len(to_fetch), "removed": len(removed), "total": len(self.coupons)}
+
+    def lookup(self, code: str) -> Optional[Dict[str, Any]]:
+        """Active coupon with `code`, as getCouponByCode returns it"""
+        ids = self.by_code.get(normalize_code(code))
+        return self.coupons[ids[0]] if ids else None
+
+    def validate(self, code: str, order_amount: float, now: Optional[float] = None) -> CouponCheck:
+        """Check `code` against an order subtotal at `now` (default: the current time)"""
+        ids = self.by_code.get(normalize_code(code))
+        if not ids:
+            return CouponCheck(code, False, "Invalid coupon code")
+        coupon = self.coupons[ids[0]]
+        now = time.time() if now is None else now
+        if self._expires_at.get(ids[0], NO_EXPIRY) < now:
+            return CouponCheck(code, False, "Coupon has expired", coupon)
+        min_order = coupon.get("minOrderAmount")
+        if min_order and order_amount < min_order:
+            return CouponCheck(code, False, f"Minimum order amount is ${min_order}", coupon)
+        usage_limit, used = coupon.get("usageLimit"), coupon.get("usedCount")
+        if usage_limit and used and used >= usage_limit:
+            return CouponCheck(code, False, "Coupon usage limit reached", coupon)
+        return CouponCheck(code, True, "Coupon applied", coupon)
+
+    def expiring_before(self, moment: float) -> List[str]:
+        """Ids of coupons whose validUntil is earlier than `moment`, soonest first"""
+        return [coupon_id for _, coupon_id in self.expiry[:bisect.bisect_left(self.expiry, (moment, ""))]]
+
+    def prune_expired(self, now: Optional[float] = None) -> int:
+        """Drop coupons that expired before `now` from the index"""
+        expired = self.expiring_before(time.time() if now is None else now)
+        for coupon_id in expired:
+            self._unindex(coupon_id)
+        return len(expired)
+
+
+def synthetic_coupons(count: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """`count` random coupons, a quarter inactive and a tenth already expired"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).timestamp()
+    coupons = {}
+    for index in range(count):
+        discount_type = rng.choice(("percentage", "fixed"))
+        valid_for_days = rng.uniform(-30, 300) if rng.random() < 0.1 else rng.uniform(1, 300)
+        coupons[f"coupon{index:06d}"] = {
+            "id": f"coupon{index:06d}",
+            "code": "".join(rng.choices(string.ascii_uppercase + string.digits, k=8)),
+            "discount": rng.randint(5, 30) if discount_type == "percentage" else rng.randint(10, 200),
+            "discountType": discount_type,
+            "description": "synthetic coupon",
+            "validUntil": datetime.fromtimestamp(now + valid_for_days * 86400, timezone.utc).isoformat(),
+            "minOrderAmount": rng.choice((0, 100, 200, 300, 500)),
+            "usageLimit": rng.choice((0, 25, 50, 100)),
+            "usedCount": rng.randint(0, 100),
+            "isActive": rng.random() < 0.75
+        }
+    return coupons
+
+
+def run_benchmark(count: int = DEFAULT_BENCHMARK_COUPONS, lookups: int = DEFAULT_BENCHMARK_LOOKUPS,
+                  seed: int = 0) -> Dict[str, Any]:
+    """Compare indexed validation with the getCouponByCode scan over `count` coupons"""
+    rng = random.Random(seed)
+    coupons = synthetic_coupons(count, seed)
+    codes = [coupon["code"] for coupon in coupons.values()]
+    queries = [rng.choice(codes) if rng.random() < 0.9 else "NOSUCHCODE" for _ in range(lookups)]
+    amounts = [rng.choice((50, 150, 250, 1200)) for _ in range(lookups)]
+
+    index = CouponIndex()
+    start = time.perf_counter()
+    index.load(coupons.items())
+    build_s = time.perf_counter() - start
+
+    now = time.time()
+    start = time.perf_counter()
+    valid = sum(1 for code, amount in zip(queries, amounts) if index.validate(code, amount, now))
+    indexed_s = time.perf_counter() - start
+
+    # The scan is timed on a sample; it is linear in the collection per lookup
+    scan_lookups = min(lookups, 200)
+    values = list(coupons.values())
+    start = time.perf_counter()
+    for code in queries[:scan_lookups]:
+        next((coupon for coupon in values if coupon["code"] == code and coupon["isActive"]), None)
+    scan_per_lookup_s = (time.perf_counter() - start) / scan_lookups
+
+    changed = rng.sample(list(coupons), max(1, count // 100))
+    start = time.perf_counter()
+    for coupon_id in changed:
+        index.apply(coupon_id, dict(coupons[coupon_id], usedCount=coupons[coupon_id]["usedCount"] + 1))
+    incremental_s = time.perf_counter() - start
+
+    return {
+        "coupons": count,
+        "build_s": round(build_s, 4),
+        "lookups": lookups,
+        "valid": valid,
+        "indexed_us_per_lookup": round(indexed_s / lookups * 1e6, 3),
+        "scan_us_per_lookup": round(scan_per_lookup_s * 1e6, 1),
+        "speedup": round(scan_per_lookup_s / (indexed_s / lookups)),
+        "changed": len(changed),
+        "incremental_refresh_s": round(incremental_s, 4)
+    }
+
+
+def main():
+    """Benchmark indexed coupon validation"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate coupon index benchmark")
+    parser.add_argument("--coupons", type=int, default=DEFAULT_BENCHMARK_COUPONS,
+                        help="Coupons in the synthetic collection")
+    parser.add_argument("--lookups", type=int, default=DEFAULT_BENCHMARK_LOOKUPS,
+                        help="Validations to time")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic coupons")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.coupons, args.lookups, args.seed)
+    print(f"🎟️  Indexed {result['coupons']:,} coupons in {result['build_s']:.3f}s")
+    print(f"⚡ {result['lookups']:,} validations: {result['indexed_us_per_lookup']:.2f} µs each "
+          f"({result['valid']:,} valid)")
+    print(f"🐢 Full scan: {result['scan_us_per_lookup']:,.1f} µs per lookup "
+          f"({result['speedup']:,}x slower)")
+    print(f"🔁 Re-indexed {result['changed']:,} changed coupons in {result['incremental_refresh_s']:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
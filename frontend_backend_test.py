@@ -13,18 +13,34 @@ This test suite verifies:
 """
 
 import requests
-import json
 import time
 import os
 import sys
+import threading
+import argparse
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from suite_scheduler import SuiteScheduler, RateLimiter, add_scheduler_arguments, DEFAULT_MAX_WORKERS
+from source_index import SourceIndex, shared_index
+from pattern_matcher import compile_patterns
+from results_store import add_store_arguments, save_results
+from check_cache import CheckCache, source_check, add_check_cache_arguments
+from source_watch import add_watch_arguments, watch_suite
 
 class ToiralEstimateTestSuite:
-    def __init__(self):
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 sources: Optional[SourceIndex] = None,
+                 check_cache: Optional[CheckCache] = None):
         """Initialize test suite"""
         self.app_url = "http://localhost:3000"
         self.test_results = []
+        self.test_data = {}
+        self._log_lock = threading.Lock()
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.sources = sources or shared_index()
+        self.check_cache = check_cache
         
         print("🎯 TOIRAL ESTIMATE - FRONTEND-BACKEND INTEGRATION TESTING")
         print("📋 Testing Firebase operations through frontend application")
@@ -40,14 +56,22 @@ class ToiralEstimateTestSuite:
             "error": error,
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(result)
-        
         status_emoji = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
-        print(f"{status_emoji} {test_name}: {status}")
-        if details:
-            print(f"   📝 {details}")
-        if error:
-            print(f"   🚨 {error}")
+        
+        # Tests run concurrently; keep each entry's lines together
+        with self._log_lock:
+            self.test_results.append(result)
+            if self.check_cache:
+                self.check_cache.record(result)
+            print(f"{status_emoji} {test_name}: {status}")
+            if details:
+                print(f"   📝 {details}")
+            if error:
+                print(f"   🚨 {error}")
+
+    def _replay(self, entry: Dict[str, Any]):
+        """Log a stored entry of a check whose sources did not change"""
+        self.log_test(entry["test"], entry["status"], entry["details"], entry["error"])
 
     def test_frontend_accessibility(self) -> bool:
         """Test if frontend application is accessible"""
@@ -94,8 +118,6 @@ class ToiralEstimateTestSuite:
                 "VITE_FIREBASE_PROJECT_ID"
             ]
             
-            firebase_configured = all(var in env_content for var in firebase_vars)
-            
             # Check EmailJS configuration
             emailjs_vars = [
                 "VITE_EMAILJS_SERVICE_ID",
@@ -103,7 +125,9 @@ class ToiralEstimateTestSuite:
                 "VITE_EMAILJS_USER_ID"
             ]
             
-            emailjs_configured = all(var in env_content for var in emailjs_vars)
+            env_matches = compile_patterns(firebase_vars + emailjs_vars).search(env_content)
+            firebase_configured = env_matches.all(firebase_vars)
+            emailjs_configured = env_matches.all(emailjs_vars)
             
             if firebase_configured and emailjs_configured:
                 self.log_test("Environment Configuration", "PASS", 
@@ -117,25 +141,25 @@ class ToiralEstimateTestSuite:
                     missing.append("EmailJS")
                 
                 self.log_test("Environment Configuration", "FAIL", 
-                            f"Missing configurations: {', '.join(missing)}")
+                            f"Missing configurations: {', '.join(missing)}; {env_matches.describe()}")
                 return False
                 
         except Exception as e:
             self.log_test("Environment Configuration", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_firebase_service_structure(self) -> bool:
         """Test Firebase service file structure and functions"""
         try:
             firebase_service_path = "/app/src/services/firebaseService.ts"
             
-            if not os.path.exists(firebase_service_path):
+            if not self.sources.exists(firebase_service_path):
                 self.log_test("Firebase Service Structure", "FAIL", 
                             "firebaseService.ts not found")
                 return False
             
-            with open(firebase_service_path, 'r') as f:
-                service_content = f.read()
+            service_symbols = self.sources.symbols(firebase_service_path)
             
             # Check for essential functions
             required_functions = [
@@ -149,7 +173,7 @@ class ToiralEstimateTestSuite:
             
             missing_functions = []
             for func in required_functions:
-                if f"export const {func}" not in service_content:
+                if not service_symbols.exports_value(func):
                     missing_functions.append(func)
             
             if not missing_functions:
@@ -161,7 +185,7 @@ class ToiralEstimateTestSuite:
                 missing_interfaces = []
                 
                 for interface in required_interfaces:
-                    if f"interface {interface}" not in service_content:
+                    if interface not in service_symbols.interfaces:
                         missing_interfaces.append(interface)
                 
                 if not missing_interfaces:
@@ -181,18 +205,19 @@ class ToiralEstimateTestSuite:
             self.log_test("Firebase Service Structure", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_access_code_service(self) -> bool:
         """Test access code generation and validation service"""
         try:
             access_code_service_path = "/app/src/services/accessCodeService.ts"
             
-            if not os.path.exists(access_code_service_path):
+            if not self.sources.exists(access_code_service_path):
                 self.log_test("Access Code Service", "FAIL", 
                             "accessCodeService.ts not found")
                 return False
             
-            with open(access_code_service_path, 'r') as f:
-                service_content = f.read()
+            service_content = self.sources.text(access_code_service_path)
+            service_symbols = self.sources.symbols(access_code_service_path)
             
             # Check for essential access code functions
             required_functions = [
@@ -204,7 +229,7 @@ class ToiralEstimateTestSuite:
             
             missing_functions = []
             for func in required_functions:
-                if f"export const {func}" not in service_content:
+                if not service_symbols.exports_value(func):
                     missing_functions.append(func)
             
             if not missing_functions:
@@ -212,7 +237,7 @@ class ToiralEstimateTestSuite:
                             f"All {len(required_functions)} functions found")
                 
                 # Check for proper access code structure
-                if "interface AccessCode" in service_content:
+                if "AccessCode" in service_symbols.interfaces:
                     self.log_test("Access Code Interface", "PASS", 
                                 "AccessCode interface defined")
                     
@@ -238,21 +263,22 @@ class ToiralEstimateTestSuite:
             self.log_test("Access Code Service", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_email_service_integration(self) -> bool:
         """Test EmailJS integration and invitation system"""
         try:
             email_service_path = "/app/src/services/emailService.ts"
             
-            if not os.path.exists(email_service_path):
+            if not self.sources.exists(email_service_path):
                 self.log_test("Email Service Integration", "FAIL", 
                             "emailService.ts not found")
                 return False
             
-            with open(email_service_path, 'r') as f:
-                service_content = f.read()
+            service_content = self.sources.text(email_service_path)
+            service_symbols = self.sources.symbols(email_service_path)
             
             # Check for EmailJS import
-            if "from '@emailjs/browser'" in service_content:
+            if "@emailjs/browser" in service_symbols.imports:
                 self.log_test("EmailJS Import", "PASS", 
                             "EmailJS library imported correctly")
             else:
@@ -261,13 +287,14 @@ class ToiralEstimateTestSuite:
                 return False
             
             # Check for invitation email function
-            if "sendInvitationEmail" in service_content:
+            if service_symbols.exports_value("sendInvitationEmail"):
                 self.log_test("Invitation Email Function", "PASS", 
                             "sendInvitationEmail function found")
                 
                 # Check for proper EmailJS configuration usage
                 emailjs_vars = ["EMAILJS_SERVICE_ID", "EMAILJS_TEMPLATE_ID", "EMAILJS_USER_ID"]
-                config_found = all(var in service_content for var in emailjs_vars)
+                config_matches = self.sources.match(email_service_path, emailjs_vars)
+                config_found = config_matches.all()
                 
                 if config_found:
                     self.log_test("EmailJS Configuration Usage", "PASS", 
@@ -284,7 +311,7 @@ class ToiralEstimateTestSuite:
                         return False
                 else:
                     self.log_test("EmailJS Configuration Usage", "FAIL", 
-                                "EmailJS environment variables not used properly")
+                                f"EmailJS environment variables not used properly: {config_matches.describe()}")
                     return False
             else:
                 self.log_test("Invitation Email Function", "FAIL", 
@@ -295,25 +322,26 @@ class ToiralEstimateTestSuite:
             self.log_test("Email Service Integration", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_final_quotation_pricing_logic(self) -> bool:
         """Test Final Quotation Page pricing calculation logic"""
         try:
             final_quotation_path = "/app/src/pages/FinalQuotationPage.tsx"
             
-            if not os.path.exists(final_quotation_path):
+            if not self.sources.exists(final_quotation_path):
                 self.log_test("Final Quotation Page", "FAIL", 
                             "FinalQuotationPage.tsx not found")
                 return False
             
-            with open(final_quotation_path, 'r') as f:
-                page_content = f.read()
+            page_content = self.sources.text(final_quotation_path)
+            page_symbols = self.sources.symbols(final_quotation_path)
             
             # Check for pricing calculation functions
             pricing_functions = ["calculateSubtotal", "calculateTotal"]
             missing_functions = []
             
             for func in pricing_functions:
-                if f"const {func}" not in page_content:
+                if func not in page_symbols.declarations:
                     missing_functions.append(func)
             
             if not missing_functions:
@@ -375,21 +403,22 @@ class ToiralEstimateTestSuite:
             self.log_test("Final Quotation Pricing Logic", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_authentication_context(self) -> bool:
         """Test authentication context and access code login"""
         try:
             auth_context_path = "/app/src/contexts/AuthContext.tsx"
             
-            if not os.path.exists(auth_context_path):
+            if not self.sources.exists(auth_context_path):
                 self.log_test("Authentication Context", "FAIL", 
                             "AuthContext.tsx not found")
                 return False
             
-            with open(auth_context_path, 'r') as f:
-                auth_content = f.read()
+            auth_content = self.sources.text(auth_context_path)
+            auth_symbols = self.sources.symbols(auth_context_path)
             
             # Check for access code login function
-            if "loginWithAccessCode" in auth_content:
+            if "loginWithAccessCode" in auth_symbols.declarations:
                 self.log_test("Access Code Login Function", "PASS", 
                             "loginWithAccessCode function found")
                 
@@ -429,18 +458,18 @@ class ToiralEstimateTestSuite:
             self.log_test("Authentication Context", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_admin_invitation_system(self) -> bool:
         """Test admin invitation modal and system"""
         try:
             invite_modal_path = "/app/src/components/admin/InviteUserModal.tsx"
             
-            if not os.path.exists(invite_modal_path):
+            if not self.sources.exists(invite_modal_path):
                 self.log_test("Admin Invitation Modal", "FAIL", 
                             "InviteUserModal.tsx not found")
                 return False
             
-            with open(invite_modal_path, 'r') as f:
-                modal_content = f.read()
+            modal_content = self.sources.text(invite_modal_path)
             
             # Check for access code creation
             if "createAccessCode" in modal_content:
@@ -483,6 +512,7 @@ class ToiralEstimateTestSuite:
             self.log_test("Admin Invitation System", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_data_flow_components(self) -> bool:
         """Test data flow between Services → Add-ons → Final Quotation"""
         try:
@@ -490,8 +520,8 @@ class ToiralEstimateTestSuite:
             services_path = "/app/src/pages/ServicesPage.tsx"
             addons_modal_path = "/app/src/components/AddOnsModal.tsx"
             
-            services_exists = os.path.exists(services_path)
-            addons_exists = os.path.exists(addons_modal_path)
+            services_exists = self.sources.exists(services_path)
+            addons_exists = self.sources.exists(addons_modal_path)
             
             if not services_exists:
                 self.log_test("Services Page Component", "FAIL", 
@@ -504,8 +534,7 @@ class ToiralEstimateTestSuite:
                 return False
             
             # Check Services page for service selection
-            with open(services_path, 'r') as f:
-                services_content = f.read()
+            services_content = self.sources.text(services_path)
             
             if "getAllServices" in services_content:
                 self.log_test("Service Data Loading", "PASS", 
@@ -525,8 +554,7 @@ class ToiralEstimateTestSuite:
                 return False
             
             # Check Add-ons Modal for data passing
-            with open(addons_modal_path, 'r') as f:
-                addons_content = f.read()
+            addons_content = self.sources.text(addons_modal_path)
             
             if "servicePackage" in addons_content and "addOns" in addons_content:
                 self.log_test("Add-ons Data Flow", "PASS", 
@@ -567,17 +595,20 @@ class ToiralEstimateTestSuite:
             self.test_data_flow_components
         ]
         
-        passed_tests = 0
+        if self.check_cache:
+            # Static checks whose sources are unchanged replay their stored entries
+            test_functions = [self.check_cache.wrap(func, self._replay) for func in test_functions]
+        
         total_tests = len(test_functions)
         
-        for test_func in test_functions:
-            try:
-                result = test_func()
-                if result:
-                    passed_tests += 1
-                time.sleep(0.5)  # Brief pause between tests
-            except Exception as e:
-                self.log_test(test_func.__name__, "FAIL", error=str(e))
+        # Run every test as soon as the test_data it consumes is available
+        scheduler = SuiteScheduler(self.test_data, max_workers=self.max_workers,
+                                  rate_limiter=self.rate_limiter)
+        results = scheduler.run(
+            test_functions,
+            on_error=lambda test_func, e: self.log_test(test_func.__name__, "FAIL", error=str(e))
+        )
+        passed_tests = sum(1 for result in results if result)
         
         # Generate summary
         success_rate = (passed_tests / total_tests) * 100
@@ -628,19 +659,30 @@ class ToiralEstimateTestSuite:
 
 def main():
     """Main function to run frontend-backend integration tests"""
-    test_suite = ToiralEstimateTestSuite()
-    results = test_suite.run_all_tests()
+    parser = argparse.ArgumentParser(description="Toiral Estimate frontend-backend integration tests")
+    add_scheduler_arguments(parser)
+    add_store_arguments(parser)
+    add_check_cache_arguments(parser)
+    add_watch_arguments(parser)
+    args = parser.parse_args()
     
-    # Save results to file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    results_file = f"/app/integration_test_results_{timestamp}.json"
+    if args.watch:
+        # Stored verdicts are only shared with later runs when --incremental is given too
+        sys.exit(watch_suite(ToiralEstimateTestSuite(), "integration_test",
+                            args.check_cache if args.incremental else ":memory:", args.poll_interval))
+    
+    check_cache = (CheckCache("integration_test", shared_index(), args.check_cache)
+                   if args.incremental else None)
+    test_suite = ToiralEstimateTestSuite(max_workers=args.max_workers,
+                                        rate_limiter=RateLimiter(args.rate, burst=args.max_workers),
+                                        check_cache=check_cache)
+    results = test_suite.run_all_tests()
+    if check_cache:
+        print(f"\n{check_cache.summary()}")
+        check_cache.close()
     
-    try:
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        print(f"\n💾 Test results saved to: {results_file}")
-    except Exception as e:
-        print(f"\n⚠️  Could not save results file: {e}")
+    # Append results to the store
+    save_results(args, "integration_test", results)
     
     # Exit with appropriate code
     if results['success_rate'] >= 70:
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Latency Histograms for Toiral Estimate Test Suites
+Fixed-memory, HDR-style recording of HTTP call latencies
+
+LatencyHistogram buckets values on a log-linear scale: every power-of-two range
+is split into 128 linear sub-buckets, so any recorded value is reproduced to
+within 1% while the whole range from 1 µs to an hour fits in a few thousand
+counters. Recording is O(1) and memory does not grow with the number of calls.
+
+LatencyRecorder keeps one histogram per (method, collection) pair and one per
+test. The running test is carried in a context variable set by test_context(),
+which the suite scheduler enters around each test, so calls made from worker
+threads or the async client's event loop are attributed to the right test.
+Summaries keep the non-empty buckets so a later run can be compared against
+the whole distribution rather than a few percentiles.
+"""
+
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+SUB_BUCKET_BITS = 8
+SUB_BUCKET_HALF = 1 << (SUB_BUCKET_BITS - 1)
+DEFAULT_HIGHEST_US = 3600 * 1000 * 1000
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+_current_test: contextvars.ContextVar = contextvars.ContextVar("current_test", default=None)
+
+
+@contextmanager
+def test_context(name: str):
+    """Attribute HTTP calls made inside the block to test `name`"""
+    token = _current_test.set((name, time.perf_counter()))
+    try:
+        yield
+    finally:
+        _current_test.reset(token)
+
+
+def current_test() -> Optional[str]:
+    """Name of the test the caller is running in, if any"""
+    context = _current_test.get()
+    return context[0] if context else None
+
+
+def elapsed_in_test_ms() -> Optional[float]:
+    """Milliseconds since the caller's test started, if it runs under test_context()"""
+    context = _current_test.get()
+    return round((time.perf_counter() - context[1]) * 1000, 3) if context else None
+
+
+def collection_of(path: str) -> str:
+    """Collection a database path belongs to, e.g. 'workflow/quotations' or 'users'"""
+    parts = [part for part in path.strip("/").split("/") if part]
+    if not parts:
+        return "/"
+    if parts[0] == "workflow" and len(parts) > 1:
+        return f"workflow/{parts[1]}"
+    return parts[0]
+
+
+class LatencyHistogram:
+    def __init__(self, highest_us: int = DEFAULT_HIGHEST_US):
+        """Histogram of latencies between 1 µs and `highest_us`, kept to 1% precision"""
+        self.highest_us = highest_us
+        self.counts: List[int] = [0] * (self._index(highest_us) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(value_us: int) -> int:
+        shift = max(0, value_us.bit_length() - SUB_BUCKET_BITS)
+        return shift * SUB_BUCKET_HALF + (value_us >> shift)
+
+    @staticmethod
+    def _highest_equivalent(index: int) -> int:
+        """Largest value that maps to bucket `index`"""
+        if index < 2 * SUB_BUCKET_HALF:
+            return index
+        shift = index // SUB_BUCKET_HALF - 1
+        sub_bucket = index - shift * SUB_BUCKET_HALF
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, elapsed_ms: float):
+        """Add one latency measurement"""
+        value_us = min(max(0, int(round(elapsed_ms * 1000))), self.highest_us)
+        index = self._index(value_us)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_us += value_us
+            self.max_us = max(self.max_us, value_us)
+            self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add every measurement of `other` into this histogram"""
+        with self._lock:
+            for index, count in enumerate(other.counts[:len(self.counts)]):
+                self.counts[index] += count
+            self.count += other.count
+            self.total_us += other.total_us
+            self.max_us = max(self.max_us, other.max_us)
+            if other.min_us is not None:
+                self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def percentile(self, percent: float) -> float:
+        """Latency in ms at or below which `percent` of measurements fall"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, math.ceil(percent / 100 * self.count))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return min(self._highest_equivalent(index), self.max_us) / 1000
+            return self.max_us / 1000
+
+    def buckets(self) -> List[List[int]]:
+        """Non-empty buckets as [value µs, count] pairs, the form result files store"""
+        with self._lock:
+            return [[min(self._highest_equivalent(index), self.max_us), count]
+                    for index, count in enumerate(self.counts) if count]
+
+    @classmethod
+    def from_buckets(cls, buckets: List[List[int]]) -> "LatencyHistogram":
+        """Rebuild a histogram from buckets() output"""
+        histogram = cls()
+        for value_us, count in buckets:
+            value_us = min(value_us, histogram.highest_us)
+            histogram.counts[histogram._index(value_us)] += count
+            histogram.count += count
+            histogram.total_us += value_us * count
+            histogram.max_us = max(histogram.max_us, value_us)
+            histogram.min_us = value_us if histogram.min_us is None else min(histogram.min_us, value_us)
+        return histogram
+
+    def summary(self) -> Dict[str, Any]:
+        """count, min, mean, p50, p95, p99 and max in milliseconds"""
+        if not self.count:
+            return {"count": 0}
+        result = {
+            "count": self.count,
+            "min_ms": self.min_us / 1000,
+            "mean_ms": round(self.total_us / self.count / 1000, 3)
+        }
+        for percent in SUMMARY_PERCENTILES:
+            result[f"p{percent}_ms"] = self.percentile(percent)
+        result["max_ms"] = self.max_us / 1000
+        return result
+
+
+class LatencyRecorder:
+    def __init__(self):
+        """Latency histograms per (method, collection) pair and per test"""
+        self.by_endpoint: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.by_test: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, table: Dict[Any, LatencyHistogram], key: Any) -> LatencyHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(key, LatencyHistogram())
+        return histogram
+
+    def record(self, method: str, path: str, elapsed_ms: float, test: Optional[str] = None):
+        """Record one call under its endpoint and (if known) its test"""
+        self._histogram(self.by_endpoint, (method.upper(), collection_of(path))).record(elapsed_ms)
+        if test:
+            self._histogram(self.by_test, test).record(elapsed_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-endpoint and per-test latency summaries (with their buckets) for result files"""
+        return {
+            "by_endpoint": {f"{method} {collection}": {**histogram.summary(), "buckets": histogram.buckets()}
+                            for (method, collection), histogram in sorted(self.by_endpoint.items())},
+            "by_test": {test: {**histogram.summary(), "buckets": histogram.buckets()}
+                        for test, histogram in sorted(self.by_test.items())}
+        }
+
+
+def print_latency_table(summary: Dict[str, Any]):
+    """Print the per-endpoint latency table"""
+    if not summary["by_endpoint"]:
+        return
+    print(f"\n{'endpoint':<36}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for endpoint, stats in summary["by_endpoint"].items():
+        print(f"{endpoint:<36}{stats['count']:>7}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+              f"{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Performance Regression Gate for Toiral Estimate Test Suites
+Compares a run's latency distributions against the suite's baseline runs
+
+A suite exiting on success_rate alone passes a run whose quotation writes got
+three times slower. The gate compares every per-endpoint ("PUT
+workflow/quotations") and per-test latency histogram of a run with the same
+histogram pooled over the suite's baseline runs in the results store:
+
+  Mann-Whitney U   one-sided test that current calls are slower, computed on
+                   the histogram buckets with tie-corrected normal approximation
+  median ratio     current p50 / baseline p50, the size of the slowdown
+
+A step regresses only when both agree: p below --regression-alpha and the
+median ratio at or above --regression-threshold. A functional suite makes only
+a call or two per endpoint, so the baseline pools up to DEFAULT_BASELINE_RUNS
+runs; steps whose call counts could not reach significance even if every
+current call were the slowest are reported as TOO FEW and never fail the gate.
+The load test, with hundreds of calls per endpoint, is gated on every step.
+"""
+
+import argparse
+import json
+import math
+import sys
+from typing import Dict, List, Any, Optional, Tuple
+
+from latency_histogram import LatencyHistogram
+from results_store import ResultStore, DEFAULT_STORE_PATH
+
+DEFAULT_THRESHOLD = 1.5
+DEFAULT_ALPHA = 0.01
+LATENCY_SECTIONS = ("by_endpoint", "by_test")
+REGRESSED = "REGRESSED"
+IMPROVED = "IMPROVED"
+UNCHANGED = "OK"
+TOO_FEW = "TOO FEW"
+MISSING = "NO BASELINE"
+
+
+def mann_whitney_greater(baseline: List[List[int]], current: List[List[int]]) -> Tuple[float, float]:
+    """(U, one-sided p) that `current` buckets are stochastically larger than `baseline` buckets"""
+    counts: Dict[int, List[int]] = {}
+    for value, count in baseline:
+        counts.setdefault(value, [0, 0])[0] += count
+    for value, count in current:
+        counts.setdefault(value, [0, 0])[1] += count
+    n_base = sum(count for _, count in baseline)
+    n_current = sum(count for _, count in current)
+    if not n_base or not n_current:
+        return 0.0, 1.0
+    rank_sum, seen, tie_term = 0.0, 0, 0
+    for value in sorted(counts):
+        base_count, current_count = counts[value]
+        tied = base_count + current_count
+        rank_sum += current_count * (seen + (tied + 1) / 2)
+        tie_term += tied ** 3 - tied
+        seen += tied
+    u = rank_sum - n_current * (n_current + 1) / 2
+    n = n_base + n_current
+    variance = n_base * n_current / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - n_base * n_current / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def smallest_p(n_base: int, n_current: int) -> float:
+    """Exact one-sided p of the most extreme ordering: every current call slower than every baseline call"""
+    return 1 / math.comb(n_base + n_current, n_current)
+
+
+def pool_latency(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One "latency" summary whose buckets add up those of every run in `summaries`"""
+    pooled: Dict[str, Dict[str, Dict[int, int]]] = {section: {} for section in LATENCY_SECTIONS}
+    for summary in summaries:
+        for section in LATENCY_SECTIONS:
+            for name, stats in (summary.get("latency") or {}).get(section, {}).items():
+                buckets = pooled[section].setdefault(name, {})
+                for value, count in stats.get("buckets", []):
+                    buckets[value] = buckets.get(value, 0) + count
+    return {"latency": {section: {name: {"count": sum(buckets.values()),
+                                         "buckets": [[value, count] for value, count in sorted(buckets.items())]}
+                                  for name, buckets in steps.items() if buckets}
+                        for section, steps in pooled.items()}}
+
+
+def compare_histograms(name: str, baseline: Optional[Dict[str, Any]], current: Dict[str, Any],
+                       threshold: float = DEFAULT_THRESHOLD, alpha: float = DEFAULT_ALPHA) -> Dict[str, Any]:
+    """Verdict for one step given its baseline and current latency summaries"""
+    row = {"step": name, "current_calls": current.get("count", 0), "current_p50_ms": current.get("p50_ms"),
+           "baseline_calls": 0, "baseline_p50_ms": None, "ratio": None, "p_value": None}
+    if not baseline or not baseline.get("buckets") or not current.get("buckets"):
+        return {**row, "verdict": MISSING}
+    base_histogram = LatencyHistogram.from_buckets(baseline["buckets"])
+    current_histogram = LatencyHistogram.from_buckets(current["buckets"])
+    base_p50, current_p50 = base_histogram.percentile(50), current_histogram.percentile(50)
+    row.update(baseline_calls=base_histogram.count, current_calls=current_histogram.count,
+               baseline_p50_ms=base_p50, current_p50_ms=current_p50,
+               ratio=round(current_p50 / base_p50, 3) if base_p50 else None)
+    if smallest_p(base_histogram.count, current_histogram.count) >= alpha:
+        return {**row, "verdict": TOO_FEW}
+    _, slower_p = mann_whitney_greater(baseline["buckets"], current["buckets"])
+    _, faster_p = mann_whitney_greater(current["buckets"], baseline["buckets"])
+    row["p_value"] = round(slower_p, 6)
+    ratio = row["ratio"] if row["ratio"] is not None else float("inf")
+    if slower_p < alpha and ratio >= threshold:
+        verdict = REGRESSED
+    elif faster_p < alpha and ratio <= 1 / threshold:
+        verdict = IMPROVED
+    else:
+        verdict = UNCHANGED
+    return {**row, "verdict": verdict}
+
+
+def compare_runs(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+                 alpha: float = DEFAULT_ALPHA) -> List[Dict[str, Any]]:
+    """Per-endpoint and per-test verdicts of a run's "latency" summary against a (pooled) baseline's"""
+    rows = []
+    for section in LATENCY_SECTIONS:
+        base_steps = (baseline.get("latency") or {}).get(section, {})
+        for name, stats in (current.get("latency") or {}).get(section, {}).items():
+            rows.append(compare_histograms(name, base_steps.get(name), stats, threshold, alpha))
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    """Print the gate's verdict table"""
+    print(f"\n{'step':<44}{'calls':>11}{'p50 ms':>17}{'ratio':>8}{'p':>10}  verdict")
+    for row in rows:
+        calls = f"{row['baseline_calls']}→{row['current_calls']}"
+        base_p50 = f"{row['baseline_p50_ms']:.1f}" if row["baseline_p50_ms"] is not None else "-"
+        current_p50 = f"{row['current_p50_ms']:.1f}" if row["current_p50_ms"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+        p_value = f"{row['p_value']:.4f}" if row["p_value"] is not None else "-"
+        print(f"{row['step'][:43]:<44}{calls:>11}{base_p50 + '→' + current_p50:>17}{ratio:>8}{p_value:>10}"
+              f"  {row['verdict']}")
+
+
+def report_regressions(rows: List[Dict[str, Any]]) -> bool:
+    """Print the verdict table and summary line; False when any step regressed"""
+    print_comparison(rows)
+    regressed = [row["step"] for row in rows if row["verdict"] == REGRESSED]
+    if regressed:
+        print(f"\n🐢 PERFORMANCE REGRESSION in {len(regressed)} step(s): {', '.join(regressed)}")
+        return False
+    print("\n🚀 No latency regressions against the baseline")
+    return True
+
+
+def add_gate_arguments(parser: argparse.ArgumentParser):
+    """Register the shared baseline and regression options on a suite's parser"""
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Add this run to the baseline runs later runs are compared against")
+    parser.add_argument("--compare-baseline", action="store_true",
+                        help="Fail when latencies regressed against the stored baseline runs")
+    parser.add_argument("--regression-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Median slowdown (current / baseline) that counts as a regression")
+    parser.add_argument("--regression-alpha", type=float, default=DEFAULT_ALPHA,
+                        help="Significance level of the Mann-Whitney test")
+
+
+def gate_results(args: argparse.Namespace, suite: str, results: Dict[str, Any],
+                 run_id: Optional[int]) -> bool:
+    """Apply --compare-baseline / --save-baseline to a stored run; False when it regressed"""
+    if not (args.compare_baseline or args.save_baseline):
+        return True
+    if run_id is None:
+        print("⚠️  Run was not stored; skipping baseline handling")
+        return True
+    passed = True
+    with ResultStore(args.results_db) as store:
+        baseline_ids = [baseline_id for baseline_id in store.baselines(suite) if baseline_id != run_id]
+        if args.compare_baseline:
+            if not baseline_ids:
+                print(f"\n⚠️  No baseline stored for {suite}; nothing to compare against")
+            else:
+                print(f"\n📐 Latency vs {len(baseline_ids)} baseline run(s) of {suite}:")
+                baseline = pool_latency([store.run_summary(baseline_id) for baseline_id in baseline_ids])
+                passed = report_regressions(compare_runs(baseline, results, args.regression_threshold,
+                                                         args.regression_alpha))
+        # A regressed run must not become part of what later runs are held to
+        if args.save_baseline and passed:
+            store.add_baseline(suite, run_id)
+            print(f"📌 Run {run_id} added to the {suite} baseline")
+    return passed
+
+
+def load_run(store: ResultStore, reference: str) -> Dict[str, Any]:
+    """Result dict for a run id in the store or a results JSON file"""
+    if reference.isdigit():
+        summary = store.run_summary(int(reference))
+        if summary is None:
+            raise ValueError(f"no run {reference} in {store.path}")
+        return summary
+    with open(reference) as f:
+        return json.load(f)
+
+
+def main():
+    """Compare a run (or result file) against baseline runs and exit non-zero on regression"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate performance regression gate")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help="SQLite results store")
+    parser.add_argument("--suite", help="Suite whose baseline runs and latest run are compared")
+    parser.add_argument("--baseline", nargs="+", help="Baseline run ids or results files (default: the suite's)")
+    parser.add_argument("--current", help="Current run id or results file (default: the suite's latest run)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Median slowdown (current / baseline) that counts as a regression")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                        help="Significance level of the Mann-Whitney test")
+    args = parser.parse_args()
+
+    with ResultStore(args.db) as store:
+        baseline_refs = args.baseline or ([str(run_id) for run_id in store.baselines(args.suite)]
+                                          if args.suite else [])
+        latest = store.latest_run(args.suite) if args.suite else None
+        current_ref = args.current or (str(latest) if latest is not None else None)
+        if not baseline_refs or current_ref is None:
+            parser.error("pass --baseline and --current, or a --suite with stored baseline runs")
+        try:
+            baseline = pool_latency([load_run(store, reference) for reference in baseline_refs])
+            current = load_run(store, current_ref)
+        except (ValueError, OSError) as e:
+            print(f"❌ {e}")
+            sys.exit(2)
+
+    print(f"📐 Comparing {current_ref} against baseline {', '.join(baseline_refs)}")
+    sys.exit(0 if report_regressions(compare_runs(baseline, current, args.threshold, args.alpha)) else 1)
+
+
+if __name__ == "__main__":
+    main()
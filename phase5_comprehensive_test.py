@@ -23,18 +23,32 @@ Testing Focus Areas:
 """
 
 import requests
-import json
 import time
-import os
 import sys
+import threading
+import argparse
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from pricing_engine import price_scenarios
+from suite_scheduler import SuiteScheduler, RateLimiter, add_scheduler_arguments, DEFAULT_MAX_WORKERS
+from source_index import SourceIndex, shared_index
+from results_store import add_store_arguments, save_results
+from check_cache import CheckCache, source_check, add_check_cache_arguments
+from source_watch import add_watch_arguments, watch_suite
 
 class Phase5ComprehensiveTestSuite:
-    def __init__(self):
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 sources: Optional[SourceIndex] = None,
+                 check_cache: Optional[CheckCache] = None):
         """Initialize Phase 5 comprehensive test suite"""
         self.app_url = "http://localhost:3000"
         self.test_results = []
+        self._log_lock = threading.Lock()
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.sources = sources or shared_index()
+        self.check_cache = check_cache
         self.test_data = {}
         
         print("🚀 Phase 5 Comprehensive Backend Testing Suite Initialized")
@@ -51,14 +65,22 @@ class Phase5ComprehensiveTestSuite:
             "error": error,
             "timestamp": datetime.now().isoformat()
         }
-        self.test_results.append(result)
-        
         status_emoji = "✅" if status == "PASS" else "❌" if status == "FAIL" else "⚠️"
-        print(f"{status_emoji} {test_name}: {status}")
-        if details:
-            print(f"   📝 {details}")
-        if error:
-            print(f"   🚨 {error}")
+        
+        # Tests run concurrently; keep each entry's lines together
+        with self._log_lock:
+            self.test_results.append(result)
+            if self.check_cache:
+                self.check_cache.record(result)
+            print(f"{status_emoji} {test_name}: {status}")
+            if details:
+                print(f"   📝 {details}")
+            if error:
+                print(f"   🚨 {error}")
+
+    def _replay(self, entry: Dict[str, Any]):
+        """Log a stored entry of a check whose sources did not change"""
+        self.log_test(entry["test"], entry["status"], entry["details"], entry["error"])
 
     # ========================
     # FRONTEND APPLICATION TESTING
@@ -91,18 +113,18 @@ class Phase5ComprehensiveTestSuite:
     # WORKFLOW SERVICE TESTING
     # ========================
 
+    @source_check
     def test_workflow_service_structure(self) -> bool:
         """Test workflowService.ts structure and functions"""
         try:
             workflow_service_path = "/app/src/services/workflowService.ts"
             
-            if not os.path.exists(workflow_service_path):
+            if not self.sources.exists(workflow_service_path):
                 self.log_test("Workflow Service Structure", "FAIL", 
                             "workflowService.ts not found")
                 return False
             
-            with open(workflow_service_path, 'r') as f:
-                service_content = f.read()
+            service_symbols = self.sources.symbols(workflow_service_path)
             
             # Check for essential workflow functions
             required_functions = [
@@ -122,7 +144,7 @@ class Phase5ComprehensiveTestSuite:
             
             missing_functions = []
             for func in required_functions:
-                if f"export const {func}" not in service_content:
+                if not service_symbols.exports_value(func):
                     missing_functions.append(func)
             
             if not missing_functions:
@@ -138,7 +160,7 @@ class Phase5ComprehensiveTestSuite:
                 missing_interfaces = []
                 
                 for interface in required_interfaces:
-                    if f"interface {interface}" not in service_content and f"import.*{interface}" not in service_content:
+                    if interface not in service_symbols.interfaces and interface not in service_symbols.imported_names():
                         missing_interfaces.append(interface)
                 
                 if not missing_interfaces:
@@ -158,18 +180,18 @@ class Phase5ComprehensiveTestSuite:
             self.log_test("Workflow Service Structure", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_workflow_types_structure(self) -> bool:
         """Test workflow types structure"""
         try:
             types_path = "/app/src/types/workflow.ts"
             
-            if not os.path.exists(types_path):
+            if not self.sources.exists(types_path):
                 self.log_test("Workflow Types Structure", "FAIL", 
                             "workflow.ts types file not found")
                 return False
             
-            with open(types_path, 'r') as f:
-                types_content = f.read()
+            types_symbols = self.sources.symbols(types_path)
             
             # Check for essential type definitions
             required_types = [
@@ -180,7 +202,7 @@ class Phase5ComprehensiveTestSuite:
             
             missing_types = []
             for type_def in required_types:
-                if f"interface {type_def}" not in types_content:
+                if type_def not in types_symbols.interfaces:
                     missing_types.append(type_def)
             
             if not missing_types:
@@ -199,7 +221,7 @@ class Phase5ComprehensiveTestSuite:
                 all_fields_present = True
                 for interface_name, fields in key_checks:
                     for field in fields:
-                        if f"{field}:" not in types_content:
+                        if field not in types_symbols.fields_of(interface_name):
                             self.log_test(f"Workflow Types - {interface_name} Fields", "FAIL", 
                                         f"Missing field: {field}")
                             all_fields_present = False
@@ -226,19 +248,17 @@ class Phase5ComprehensiveTestSuite:
     # PHASE 5 COMPONENTS TESTING
     # ========================
 
+    @source_check
     def test_client_dashboard_component(self) -> bool:
         """Test ClientDashboard component structure and functionality"""
         try:
             dashboard_path = "/app/src/pages/ClientDashboard.tsx"
             
-            if not os.path.exists(dashboard_path):
+            if not self.sources.exists(dashboard_path):
                 self.log_test("Client Dashboard Component", "FAIL", 
                             "ClientDashboard.tsx not found")
                 return False
             
-            with open(dashboard_path, 'r') as f:
-                dashboard_content = f.read()
-            
             # Check for essential dashboard features
             required_features = [
                 "getClientDashboardData",
@@ -250,24 +270,22 @@ class Phase5ComprehensiveTestSuite:
                 "handleViewPendingApprovals"
             ]
             
-            missing_features = []
-            for feature in required_features:
-                if feature not in dashboard_content:
-                    missing_features.append(feature)
+            # Check for proper state management
+            state_checks = [
+                "useState<ClientDashboardData",
+                "useState<ProjectSetup",
+                "useState<DashboardStats",
+                "useEffect"
+            ]
+            
+            dashboard_matches = self.sources.match(dashboard_path, required_features + state_checks)
+            missing_features = dashboard_matches.missing(required_features)
             
             if not missing_features:
                 self.log_test("Client Dashboard Features", "PASS", 
                             f"All {len(required_features)} essential features found")
                 
-                # Check for proper state management
-                state_checks = [
-                    "useState<ClientDashboardData",
-                    "useState<ProjectSetup",
-                    "useState<DashboardStats",
-                    "useEffect"
-                ]
-                
-                state_management_ok = all(check in dashboard_content for check in state_checks)
+                state_management_ok = dashboard_matches.all(state_checks)
                 
                 if state_management_ok:
                     self.log_test("Client Dashboard State Management", "PASS", 
@@ -275,30 +293,28 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Client Dashboard State Management", "FAIL", 
-                                "Missing proper state management")
+                                f"Missing proper state management: {dashboard_matches.describe(state_checks)}")
                     return False
             else:
                 self.log_test("Client Dashboard Features", "FAIL", 
-                            f"Missing features: {', '.join(missing_features)}")
+                            f"Missing features: {dashboard_matches.describe(required_features)}")
                 return False
                 
         except Exception as e:
             self.log_test("Client Dashboard Component", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_pending_project_approvals_component(self) -> bool:
         """Test PendingProjectApprovals component"""
         try:
             approvals_path = "/app/src/pages/PendingProjectApprovals.tsx"
             
-            if not os.path.exists(approvals_path):
+            if not self.sources.exists(approvals_path):
                 self.log_test("Pending Project Approvals Component", "FAIL", 
                             "PendingProjectApprovals.tsx not found")
                 return False
             
-            with open(approvals_path, 'r') as f:
-                approvals_content = f.read()
-            
             # Check for essential approval features
             required_features = [
                 "getClientDashboardData",
@@ -309,23 +325,21 @@ class Phase5ComprehensiveTestSuite:
                 "project_setup"
             ]
             
-            missing_features = []
-            for feature in required_features:
-                if feature not in approvals_content:
-                    missing_features.append(feature)
+            # Check for proper navigation handling
+            navigation_checks = [
+                "navigate('/pending-project-approval')",
+                "navigate('/project-approval-details",
+                "localStorage.setItem('pendingProject'"
+            ]
+            
+            approvals_matches = self.sources.match(approvals_path, required_features + navigation_checks)
+            missing_features = approvals_matches.missing(required_features)
             
             if not missing_features:
                 self.log_test("Pending Approvals Features", "PASS", 
                             f"All {len(required_features)} essential features found")
                 
-                # Check for proper navigation handling
-                navigation_checks = [
-                    "navigate('/pending-project-approval')",
-                    "navigate('/project-approval-details",
-                    "localStorage.setItem('pendingProject'"
-                ]
-                
-                navigation_ok = any(check in approvals_content for check in navigation_checks)
+                navigation_ok = approvals_matches.any(navigation_checks)
                 
                 if navigation_ok:
                     self.log_test("Pending Approvals Navigation", "PASS", 
@@ -333,30 +347,28 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Pending Approvals Navigation", "FAIL", 
-                                "Missing navigation handling")
+                                f"Missing navigation handling: {approvals_matches.describe(navigation_checks)}")
                     return False
             else:
                 self.log_test("Pending Approvals Features", "FAIL", 
-                            f"Missing features: {', '.join(missing_features)}")
+                            f"Missing features: {approvals_matches.describe(required_features)}")
                 return False
                 
         except Exception as e:
             self.log_test("Pending Project Approvals Component", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_project_approval_details_component(self) -> bool:
         """Test ProjectApprovalDetails component"""
         try:
             details_path = "/app/src/pages/ProjectApprovalDetails.tsx"
             
-            if not os.path.exists(details_path):
+            if not self.sources.exists(details_path):
                 self.log_test("Project Approval Details Component", "FAIL", 
                             "ProjectApprovalDetails.tsx not found")
                 return False
             
-            with open(details_path, 'r') as f:
-                details_content = f.read()
-            
             # Check for essential approval details features
             required_features = [
                 "getClientQuotation",
@@ -370,24 +382,22 @@ class Phase5ComprehensiveTestSuite:
                 "handleApproveQuotation"
             ]
             
-            missing_features = []
-            for feature in required_features:
-                if feature not in details_content:
-                    missing_features.append(feature)
+            # Check for real-time pricing calculations
+            pricing_checks = [
+                "calculateSubtotal()",
+                "calculateDiscount()",
+                "calculateFinalPrice()",
+                "calculateDeliveryTime()"
+            ]
+            
+            details_matches = self.sources.match(details_path, required_features + pricing_checks)
+            missing_features = details_matches.missing(required_features)
             
             if not missing_features:
                 self.log_test("Project Approval Details Features", "PASS", 
                             f"All {len(required_features)} essential features found")
                 
-                # Check for real-time pricing calculations
-                pricing_checks = [
-                    "calculateSubtotal()",
-                    "calculateDiscount()",
-                    "calculateFinalPrice()",
-                    "calculateDeliveryTime()"
-                ]
-                
-                pricing_ok = all(check in details_content for check in pricing_checks)
+                pricing_ok = details_matches.all(pricing_checks)
                 
                 if pricing_ok:
                     self.log_test("Project Approval Real-time Pricing", "PASS", 
@@ -395,30 +405,28 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Project Approval Real-time Pricing", "FAIL", 
-                                "Missing real-time pricing calculations")
+                                f"Missing real-time pricing calculations: {details_matches.describe(pricing_checks)}")
                     return False
             else:
                 self.log_test("Project Approval Details Features", "FAIL", 
-                            f"Missing features: {', '.join(missing_features)}")
+                            f"Missing features: {details_matches.describe(required_features)}")
                 return False
                 
         except Exception as e:
             self.log_test("Project Approval Details Component", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_addons_selection_modal_component(self) -> bool:
         """Test AddOnsSelectionModal component"""
         try:
             modal_path = "/app/src/components/AddOnsSelectionModal.tsx"
             
-            if not os.path.exists(modal_path):
+            if not self.sources.exists(modal_path):
                 self.log_test("Add-ons Selection Modal Component", "FAIL", 
                             "AddOnsSelectionModal.tsx not found")
                 return False
             
-            with open(modal_path, 'r') as f:
-                modal_content = f.read()
-            
             # Check for essential modal features
             required_features = [
                 "ProjectAddOn",
@@ -434,24 +442,22 @@ class Phase5ComprehensiveTestSuite:
                 "calculateDeliveryTime"
             ]
             
-            missing_features = []
-            for feature in required_features:
-                if feature not in modal_content:
-                    missing_features.append(feature)
+            # Check for real-time pricing updates
+            realtime_checks = [
+                "Real-time calculations",
+                "Live Pricing Summary",
+                "calculateSubtotal()",
+                "calculateFinalPrice()"
+            ]
+            
+            modal_matches = self.sources.match(modal_path, required_features + realtime_checks)
+            missing_features = modal_matches.missing(required_features)
             
             if not missing_features:
                 self.log_test("Add-ons Selection Modal Features", "PASS", 
                             f"All {len(required_features)} essential features found")
                 
-                # Check for real-time pricing updates
-                realtime_checks = [
-                    "Real-time calculations",
-                    "Live Pricing Summary",
-                    "calculateSubtotal()",
-                    "calculateFinalPrice()"
-                ]
-                
-                realtime_ok = any(check in modal_content for check in realtime_checks)
+                realtime_ok = modal_matches.any(realtime_checks)
                 
                 if realtime_ok:
                     self.log_test("Add-ons Real-time Pricing Updates", "PASS", 
@@ -459,30 +465,28 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Add-ons Real-time Pricing Updates", "FAIL", 
-                                "Missing real-time pricing updates")
+                                f"Missing real-time pricing updates: {modal_matches.describe(realtime_checks)}")
                     return False
             else:
                 self.log_test("Add-ons Selection Modal Features", "FAIL", 
-                            f"Missing features: {', '.join(missing_features)}")
+                            f"Missing features: {modal_matches.describe(required_features)}")
                 return False
                 
         except Exception as e:
             self.log_test("Add-ons Selection Modal Component", "FAIL", error=str(e))
             return False
 
+    @source_check
     def test_final_quotation_review_component(self) -> bool:
         """Test FinalQuotationReview component"""
         try:
             review_path = "/app/src/pages/FinalQuotationReview.tsx"
             
-            if not os.path.exists(review_path):
+            if not self.sources.exists(review_path):
                 self.log_test("Final Quotation Review Component", "FAIL", 
                             "FinalQuotationReview.tsx not found")
                 return False
             
-            with open(review_path, 'r') as f:
-                review_content = f.read()
-            
             # Check for essential review features
             required_features = [
                 "createClientQuotation",
@@ -495,24 +499,22 @@ class Phase5ComprehensiveTestSuite:
                 "calculateDiscount"
             ]
             
-            missing_features = []
-            for feature in required_features:
-                if feature not in review_content:
-                    missing_features.append(feature)
+            # Check for proper data flow handling
+            dataflow_checks = [
+                "location.state",
+                "localStorage.getItem",
+                "pendingProject",
+                "selectedAddOns"
+            ]
+            
+            review_matches = self.sources.match(review_path, required_features + dataflow_checks)
+            missing_features = review_matches.missing(required_features)
             
             if not missing_features:
                 self.log_test("Final Quotation Review Features", "PASS", 
                             f"All {len(required_features)} essential features found")
                 
-                # Check for proper data flow handling
-                dataflow_checks = [
-                    "location.state",
-                    "localStorage.getItem",
-                    "pendingProject",
-                    "selectedAddOns"
-                ]
-                
-                dataflow_ok = all(check in review_content for check in dataflow_checks)
+                dataflow_ok = review_matches.all(dataflow_checks)
                 
                 if dataflow_ok:
                     self.log_test("Final Quotation Data Flow", "PASS", 
@@ -520,11 +522,11 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Final Quotation Data Flow", "FAIL", 
-                                "Missing proper data flow handling")
+                                f"Missing proper data flow handling: {review_matches.describe(dataflow_checks)}")
                     return False
             else:
                 self.log_test("Final Quotation Review Features", "FAIL", 
-                            f"Missing features: {', '.join(missing_features)}")
+                            f"Missing features: {review_matches.describe(required_features)}")
                 return False
                 
         except Exception as e:
@@ -548,26 +550,26 @@ class Phase5ComprehensiveTestSuite:
                 {"id": "addon3", "name": "Inventory System", "price": 399, "extraDeliveryTime": 7}
             ]
             
-            # Scenario 1: Base price only
-            scenario1_total = base_price
-            
-            # Scenario 2: Base price + selected add-ons
-            selected_addons = test_addons[:2]  # First 2 add-ons
-            addons_total = sum(addon['price'] for addon in selected_addons)
-            scenario2_subtotal = base_price + addons_total  # 2500 + 299 + 199 = 2998
-            
-            # Scenario 3: With percentage coupon (10%)
-            percentage_discount = (scenario2_subtotal * 10) / 100  # 299.8
-            scenario3_total = scenario2_subtotal - percentage_discount  # 2698.2
-            
-            # Scenario 4: With fixed coupon ($50)
-            fixed_discount = 50
-            scenario4_total = scenario2_subtotal - fixed_discount  # 2948
+            # Price all scenarios as one engine batch (first 2 add-ons selected)
+            selected = [addon['id'] for addon in test_addons[:2]]
+            base_delivery = 30
+            pricing = price_scenarios(
+                base_price, base_delivery, test_addons,
+                selections=[[], selected, selected, selected],
+                coupons=[
+                    None,                                                # Scenario 1: Base price only
+                    None,                                                # Scenario 2: + add-ons
+                    {"discount": 10, "discountType": "percentage"},      # Scenario 3: + 10% coupon
+                    {"discount": 50, "discountType": "fixed"}            # Scenario 4: + $50 coupon
+                ]
+            )
+            scenario1_total = pricing.final_price[0].item()
+            scenario2_subtotal = pricing.subtotal[1].item()  # 2500 + 299 + 199 = 2998
+            scenario3_total = pricing.final_price[2].item()  # 2998 - 299.8 = 2698.2
+            scenario4_total = pricing.final_price[3].item()  # 2998 - 50 = 2948
             
             # Scenario 5: Delivery time calculation
-            base_delivery = 30
-            addon_delivery_times = [addon['extraDeliveryTime'] for addon in selected_addons]
-            total_delivery = base_delivery + sum(addon_delivery_times)  # 30 + 5 + 3 = 38
+            total_delivery = pricing.final_delivery_time[1].item()  # 30 + 5 + 3 = 38
             
             # Verify calculations
             if scenario1_total == 2500:
@@ -709,19 +711,17 @@ class Phase5ComprehensiveTestSuite:
     # SEED DATA TESTING
     # ========================
 
+    @source_check
     def test_seed_data_service(self) -> bool:
         """Test Phase 5 seed data service"""
         try:
             seed_data_path = "/app/src/services/seedPhase5Data.ts"
             
-            if not os.path.exists(seed_data_path):
+            if not self.sources.exists(seed_data_path):
                 self.log_test("Phase 5 Seed Data Service", "FAIL", 
                             "seedPhase5Data.ts not found")
                 return False
             
-            with open(seed_data_path, 'r') as f:
-                seed_content = f.read()
-            
             # Check for essential seed data functions
             required_functions = [
                 "createPhase5TestData",
@@ -731,26 +731,24 @@ class Phase5ComprehensiveTestSuite:
                 "createCoupon"
             ]
             
-            missing_functions = []
-            for func in required_functions:
-                if func not in seed_content:
-                    missing_functions.append(func)
+            # Check for proper test data structure
+            test_data_checks = [
+                "sampleCoupons",
+                "testClient",
+                "projectSetup",
+                "WELCOME10",
+                "SUMMER20",
+                "testuser1"
+            ]
+            
+            seed_matches = self.sources.match(seed_data_path, required_functions + test_data_checks)
+            missing_functions = seed_matches.missing(required_functions)
             
             if not missing_functions:
                 self.log_test("Seed Data Service Functions", "PASS", 
                             f"All {len(required_functions)} essential functions found")
                 
-                # Check for proper test data structure
-                test_data_checks = [
-                    "sampleCoupons",
-                    "testClient",
-                    "projectSetup",
-                    "WELCOME10",
-                    "SUMMER20",
-                    "testuser1"
-                ]
-                
-                test_data_ok = all(check in seed_content for check in test_data_checks)
+                test_data_ok = seed_matches.all(test_data_checks)
                 
                 if test_data_ok:
                     self.log_test("Seed Data Structure", "PASS", 
@@ -758,11 +756,11 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Seed Data Structure", "FAIL", 
-                                "Missing proper test data structure")
+                                f"Missing proper test data structure: {seed_matches.describe(test_data_checks)}")
                     return False
             else:
                 self.log_test("Seed Data Service Functions", "FAIL", 
-                            f"Missing functions: {', '.join(missing_functions)}")
+                            f"Missing functions: {seed_matches.describe(required_functions)}")
                 return False
                 
         except Exception as e:
@@ -773,20 +771,18 @@ class Phase5ComprehensiveTestSuite:
     # ROUTE VALIDATION TESTING
     # ========================
 
+    @source_check
     def test_phase5_routes_configuration(self) -> bool:
         """Test Phase 5 routes configuration"""
         try:
             # Check App.tsx for route definitions
             app_path = "/app/src/App.tsx"
             
-            if not os.path.exists(app_path):
+            if not self.sources.exists(app_path):
                 self.log_test("Phase 5 Routes Configuration", "FAIL", 
                             "App.tsx not found")
                 return False
             
-            with open(app_path, 'r') as f:
-                app_content = f.read()
-            
             # Check for Phase 5 routes
             required_routes = [
                 "/client-dashboard",
@@ -795,24 +791,22 @@ class Phase5ComprehensiveTestSuite:
                 "/final-quotation-review"
             ]
             
-            missing_routes = []
-            for route in required_routes:
-                if route not in app_content:
-                    missing_routes.append(route)
+            # Check for proper component imports
+            component_imports = [
+                "ClientDashboard",
+                "PendingProjectApprovals",
+                "ProjectApprovalDetails",
+                "FinalQuotationReview"
+            ]
+            
+            app_matches = self.sources.match(app_path, required_routes + component_imports)
+            missing_routes = app_matches.missing(required_routes)
             
             if not missing_routes:
                 self.log_test("Phase 5 Routes Definition", "PASS", 
                             f"All {len(required_routes)} Phase 5 routes defined")
                 
-                # Check for proper component imports
-                component_imports = [
-                    "ClientDashboard",
-                    "PendingProjectApprovals",
-                    "ProjectApprovalDetails",
-                    "FinalQuotationReview"
-                ]
-                
-                imports_ok = all(comp in app_content for comp in component_imports)
+                imports_ok = app_matches.all(component_imports)
                 
                 if imports_ok:
                     self.log_test("Phase 5 Component Imports", "PASS", 
@@ -820,11 +814,11 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Phase 5 Component Imports", "FAIL", 
-                                "Missing Phase 5 component imports")
+                                f"Missing Phase 5 component imports: {app_matches.describe(component_imports)}")
                     return False
             else:
                 self.log_test("Phase 5 Routes Definition", "FAIL", 
-                            f"Missing routes: {', '.join(missing_routes)}")
+                            f"Missing routes: {app_matches.describe(required_routes)}")
                 return False
                 
         except Exception as e:
@@ -835,20 +829,18 @@ class Phase5ComprehensiveTestSuite:
     # DATA INTEGRATION TESTING
     # ========================
 
+    @source_check
     def test_firebase_integration_setup(self) -> bool:
         """Test Firebase integration setup for Phase 5"""
         try:
             # Check Firebase configuration
             firebase_config_path = "/app/src/config/firebase.ts"
             
-            if not os.path.exists(firebase_config_path):
+            if not self.sources.exists(firebase_config_path):
                 self.log_test("Firebase Integration Setup", "FAIL", 
                             "firebase.ts config not found")
                 return False
             
-            with open(firebase_config_path, 'r') as f:
-                firebase_content = f.read()
-            
             # Check for essential Firebase imports and setup
             firebase_checks = [
                 "initializeApp",
@@ -858,7 +850,8 @@ class Phase5ComprehensiveTestSuite:
                 "auth"
             ]
             
-            firebase_ok = all(check in firebase_content for check in firebase_checks)
+            firebase_matches = self.sources.match(firebase_config_path, firebase_checks)
+            firebase_ok = firebase_matches.all()
             
             if firebase_ok:
                 self.log_test("Firebase Configuration", "PASS", 
@@ -866,9 +859,6 @@ class Phase5ComprehensiveTestSuite:
                 
                 # Check workflow service Firebase usage
                 workflow_path = "/app/src/services/workflowService.ts"
-                with open(workflow_path, 'r') as f:
-                    workflow_content = f.read()
-                
                 firebase_usage_checks = [
                     "from \"firebase/database\"",
                     "ref, set, get, update",
@@ -876,7 +866,8 @@ class Phase5ComprehensiveTestSuite:
                     "workflow/"
                 ]
                 
-                usage_ok = all(check in workflow_content for check in firebase_usage_checks)
+                workflow_matches = self.sources.match(workflow_path, firebase_usage_checks)
+                usage_ok = workflow_matches.all()
                 
                 if usage_ok:
                     self.log_test("Firebase Workflow Integration", "PASS", 
@@ -884,11 +875,11 @@ class Phase5ComprehensiveTestSuite:
                     return True
                 else:
                     self.log_test("Firebase Workflow Integration", "FAIL", 
-                                "Firebase not properly integrated in workflow service")
+                                f"Firebase not properly integrated in workflow service: {workflow_matches.describe()}")
                     return False
             else:
                 self.log_test("Firebase Configuration", "FAIL", 
-                            "Firebase not properly configured")
+                            f"Firebase not properly configured: {firebase_matches.describe()}")
                 return False
                 
         except Exception as e:
@@ -917,17 +908,20 @@ class Phase5ComprehensiveTestSuite:
             self.test_firebase_integration_setup
         ]
         
-        passed_tests = 0
+        if self.check_cache:
+            # Static checks whose sources are unchanged replay their stored entries
+            test_functions = [self.check_cache.wrap(func, self._replay) for func in test_functions]
+        
         total_tests = len(test_functions)
         
-        for test_func in test_functions:
-            try:
-                result = test_func()
-                if result:
-                    passed_tests += 1
-                time.sleep(0.5)  # Brief pause between tests
-            except Exception as e:
-                self.log_test(test_func.__name__, "FAIL", error=str(e))
+        # Run every test as soon as the test_data it consumes is available
+        scheduler = SuiteScheduler(self.test_data, max_workers=self.max_workers,
+                                  rate_limiter=self.rate_limiter)
+        results = scheduler.run(
+            test_functions,
+            on_error=lambda test_func, e: self.log_test(test_func.__name__, "FAIL", error=str(e))
+        )
+        passed_tests = sum(1 for result in results if result)
         
         # Generate summary
         success_rate = (passed_tests / total_tests) * 100
@@ -990,19 +984,30 @@ def main():
     print("=" * 90)
     
     # Initialize and run tests
-    test_suite = Phase5ComprehensiveTestSuite()
-    results = test_suite.run_all_tests()
+    parser = argparse.ArgumentParser(description="Toiral Estimate Phase 5 comprehensive tests")
+    add_scheduler_arguments(parser)
+    add_store_arguments(parser)
+    add_check_cache_arguments(parser)
+    add_watch_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.watch:
+        # Stored verdicts are only shared with later runs when --incremental is given too
+        sys.exit(watch_suite(Phase5ComprehensiveTestSuite(), "phase5_comprehensive_test",
+                            args.check_cache if args.incremental else ":memory:", args.poll_interval))
     
-    # Save results to file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    results_file = f"/app/phase5_comprehensive_test_results_{timestamp}.json"
+    check_cache = (CheckCache("phase5_comprehensive_test", shared_index(), args.check_cache)
+                   if args.incremental else None)
+    test_suite = Phase5ComprehensiveTestSuite(max_workers=args.max_workers,
+                                             rate_limiter=RateLimiter(args.rate, burst=args.max_workers),
+                                             check_cache=check_cache)
+    results = test_suite.run_all_tests()
+    if check_cache:
+        print(f"\n{check_cache.summary()}")
+        check_cache.close()
     
-    try:
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        print(f"\n💾 Test results saved to: {results_file}")
-    except Exception as e:
-        print(f"\n⚠️  Could not save results file: {e}")
+    # Append results to the store
+    save_results(args, "phase5_comprehensive_test", results)
     
     # Exit with appropriate code
     if results['success_rate'] >= 80:
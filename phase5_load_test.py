@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Phase 5 Workflow Load Generator for Toiral Estimate
+Drives many virtual clients through the full Phase 5 client workflow
+
+Each virtual client walks the same pipeline as Phase5WorkflowTestSuite, built
+from the suite's own fixture builders:
+
+  create client → project setup → quotation → approval → running project → status
+
+Virtual clients are started evenly over --ramp-up seconds, at most
+--concurrency of them run at once, and each pauses for --think-time seconds
+(±50% jitter) between steps. The run reports workflow and request throughput
+plus per-step p50/p95/p99 latency, and removes everything it created through
+a cleanup journal. Reports go to the results store, where --compare-baseline
+holds each endpoint's latency to the baseline runs.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Tuple
+
+from latency_histogram import LatencyHistogram
+from rtdb_client import BaseRTDBClient, RTDBClient, DEFAULT_MAX_BATCH_BYTES
+from rtdb_emulator import add_emulator_arguments, database_url
+from cleanup_journal import CleanupJournal
+from code_allocator import CodeAllocator, CLIENT_CODES, ACCESS_CODES
+from phase5_backend_test import Phase5WorkflowTestSuite
+from results_store import add_store_arguments, save_results
+from perf_gate import add_gate_arguments, gate_results
+
+STEPS = ("create_client", "project_setup", "quotation", "approval", "running_project", "status")
+DEFAULT_CLIENTS = 100
+DEFAULT_CONCURRENCY = 10
+
+
+class Phase5LoadTest:
+    def __init__(self, db: BaseRTDBClient, clients: int = DEFAULT_CLIENTS,
+                 concurrency: int = DEFAULT_CONCURRENCY, ramp_up: float = 0.0,
+                 think_time: float = 0.0):
+        """Load test of `clients` virtual clients against `db`"""
+        self.db = db
+        self.clients = clients
+        self.concurrency = max(1, concurrency)
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.fixtures = Phase5WorkflowTestSuite(db)
+        # Unique per virtual client and unused in the database; independent draws of client codes
+        # likely collide past ~900 clients
+        self.client_codes = self._allocate(CLIENT_CODES, clients)
+        self.access_codes = self._allocate(ACCESS_CODES, clients)
+        self.journal = CleanupJournal("phase5_load", db.base_url)
+        self.latencies: Dict[str, LatencyHistogram] = {step: LatencyHistogram() for step in STEPS}
+        self.errors: Dict[str, int] = {step: 0 for step in STEPS}
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def _allocate(self, space, count: int) -> List[str]:
+        """`count` codes from `space` that no stored record already holds"""
+        allocator = CodeAllocator(space, expected=count)
+        allocator.seed_from_database(self.db)
+        return allocator.allocate(count)
+
+    def _think(self):
+        if self.think_time > 0:
+            time.sleep(self.think_time * random.uniform(0.5, 1.5))
+
+    def _step(self, name: str, call: Callable[[], Any]) -> bool:
+        """Time one workflow step; False stops this virtual client"""
+        start = time.perf_counter()
+        try:
+            response = call()
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if ok:
+            self.latencies[name].record(elapsed_ms)
+        else:
+            with self._lock:
+                self.errors[name] += 1
+        return ok
+
+    def run_virtual_client(self, index: int, started: float) -> bool:
+        """Walk one client through the whole workflow"""
+        delay = started + (self.ramp_up * index / self.clients) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        fx = self.fixtures
+        client_id, project_id = fx.generate_test_id(), fx.generate_test_id()
+        quotation_id, running_project_id = fx.generate_test_id(), fx.generate_test_id()
+        client_code, access_code = self.client_codes[index], self.access_codes[index]
+        self.journal.record_many([
+            f"workflow/clients/{client_id}",
+            f"workflow/project-setups/{project_id}",
+            f"workflow/quotations/{quotation_id}",
+            f"workflow/running-projects/{running_project_id}",
+            f"workflow/status/{client_id}"
+        ])
+        quotation = fx.build_quotation_fixture(quotation_id, client_id, client_code, project_id)
+
+        steps: List[Tuple[str, Callable[[], Any]]] = [
+            ("create_client", lambda: self.db.put(
+                f"workflow/clients/{client_id}",
+                fx.build_client_fixture(client_id, client_code, access_code))),
+            ("project_setup", lambda: self.db.put(
+                f"workflow/project-setups/{project_id}",
+                fx.build_project_setup_fixture(project_id, client_id, client_code))),
+            ("quotation", lambda: self.db.put(f"workflow/quotations/{quotation_id}", quotation)),
+            ("approval", lambda: self.db.patch(
+                f"workflow/quotations/{quotation_id}", fx.build_approval_update())),
+            ("running_project", lambda: self.db.put(
+                f"workflow/running-projects/{running_project_id}",
+                fx.build_running_project_fixture(running_project_id, client_id, client_code,
+                                                 quotation_id, quotation))),
+            ("status", lambda: self.db.put(
+                f"workflow/status/{client_id}", fx.build_workflow_status_fixture(client_id)))
+        ]
+        for position, (name, call) in enumerate(steps):
+            if position:
+                self._think()
+            if not self._step(name, call):
+                return False
+        with self._lock:
+            self.completed += 1
+        return True
+
+    def run(self) -> Dict[str, Any]:
+        """Run every virtual client and summarise throughput and latency"""
+        print(f"🚦 Driving {self.clients} virtual client(s), concurrency {self.concurrency}, "
+              f"ramp-up {self.ramp_up}s, think time {self.think_time}s")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="virtual-client") as pool:
+            list(pool.map(lambda index: self.run_virtual_client(index, started), range(self.clients)))
+        wall_s = time.perf_counter() - started
+
+        requests_made = (sum(histogram.count for histogram in self.latencies.values())
+                         + sum(self.errors.values()))
+        steps = {}
+        for name in STEPS:
+            histogram = self.latencies[name]
+            steps[name] = {
+                "count": histogram.count,
+                "errors": self.errors[name],
+                "p50_ms": histogram.percentile(50),
+                "p95_ms": histogram.percentile(95),
+                "p99_ms": histogram.percentile(99),
+                "max_ms": histogram.max_us / 1000
+            }
+        # The workflow steps stand in for tests so the regression gate covers both
+        latency = self.db.latency.summary()
+        latency["by_test"] = {name: {**self.latencies[name].summary(), "buckets": self.latencies[name].buckets()}
+                              for name in STEPS if self.latencies[name].count}
+        return {
+            "clients": self.clients,
+            "concurrency": self.concurrency,
+            "ramp_up_s": self.ramp_up,
+            "think_time_s": self.think_time,
+            "completed_workflows": self.completed,
+            "wall_time_s": round(wall_s, 3),
+            "workflows_per_s": round(self.completed / wall_s, 3) if wall_s else 0.0,
+            "requests_per_s": round(requests_made / wall_s, 3) if wall_s else 0.0,
+            "steps": steps,
+            "latency": latency
+        }
+
+    def cleanup(self, max_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> bool:
+        """Delete everything the virtual clients created"""
+        responses = self.journal.cleanup(self.db, max_bytes)
+        return all(response.status_code == 200 for response in responses)
+
+
+def print_load_report(report: Dict[str, Any]):
+    """Print throughput and the per-step latency table"""
+    print("\n" + "=" * 70)
+    print("🏁 PHASE 5 LOAD TEST COMPLETE")
+    print("=" * 70)
+    print(f"📊 Workflows: {report['completed_workflows']}/{report['clients']} completed "
+          f"in {report['wall_time_s']:.2f}s")
+    print(f"🚀 Throughput: {report['workflows_per_s']:.1f} workflows/s, "
+          f"{report['requests_per_s']:.1f} requests/s")
+    print(f"\n{'step':<17}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, step in report["steps"].items():
+        print(f"{name:<17}{step['count']:>7}{step['errors']:>8}{step['p50_ms']:>10.1f}"
+              f"{step['p95_ms']:>10.1f}{step['p99_ms']:>10.1f}{step['max_ms']:>10.1f}")
+
+
+def main():
+    """Main function to run the Phase 5 load test"""
+    print("🔥 TOIRAL ESTIMATE - PHASE 5 WORKFLOW LOAD TEST")
+    print("=" * 80)
+
+    parser = argparse.ArgumentParser(description="Toiral Estimate Phase 5 workflow load generator")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS,
+                        help="Number of virtual clients to walk through the workflow")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum virtual clients in flight at once")
+    parser.add_argument("--ramp-up", type=float, default=0.0,
+                        help="Seconds over which virtual client starts are spread")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean pause in seconds between a client's workflow steps")
+    parser.add_argument("--keep-data", action="store_true",
+                        help="Leave the generated workflow data in the database")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for generated IDs and think-time jitter")
+    add_emulator_arguments(parser)
+    add_store_arguments(parser)
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if not (args.base_url or args.emulator):
+        # Never default to the live project database
+        parser.error("choose a target: --base-url URL or --emulator")
+    base_url, emulator = database_url(args, None)
+    db = RTDBClient(base_url, pool_size=max(args.concurrency, 1))
+    load_test = Phase5LoadTest(db, clients=args.clients, concurrency=args.concurrency,
+                               ramp_up=args.ramp_up, think_time=args.think_time)
+    report = load_test.run()
+    print_load_report(report)
+
+    if not args.keep_data:
+        cleaned = load_test.cleanup()
+        print(f"\n🧹 Cleanup {'completed' if cleaned else 'incomplete; run a suite with --sweep-journal'}")
+    else:
+        # Kept on purpose: a later --sweep-journal must not find and delete it
+        load_test.journal.discard()
+    db.close()
+    if emulator:
+        emulator.stop()
+
+    run_id = save_results(args, "phase5_load", report)
+    latency_ok = gate_results(args, "phase5_load", report, run_id)
+
+    sys.exit(0 if report["completed_workflows"] == report["clients"] and latency_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Stored Quotation Audit for Toiral Estimate
+Recomputes the totals of every workflow/quotations record and lists drift
+
+Quotations are streamed one member at a time (from the database with
+stream=True, or from a JSON export of the quotations node), their inputs are
+gathered into column batches, and each batch is repriced by the fixed-point
+core in pricing_engine under a declared RoundingPolicy. Every stored
+addOnsTotal, discountAmount, finalPrice, addOnsDeliveryTime and
+finalDeliveryTime that differs from the recomputed value is reported; records
+that cannot be priced at all are listed as skipped. Memory stays bounded by the
+batch size, so a million-record export audits in seconds.
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from pricing_engine import (RoundingPolicy, APP_ROUNDING, ROUNDING_MODES, COUPON_TYPES, encode_coupon,
+                            from_cents, price_totals_cents, to_cents)
+from rtdb_client import RTDBClient, DEFAULT_BASE_URL
+from rtdb_emulator import add_emulator_arguments, database_url
+from rtdb_stream import ObjectStream, DEFAULT_CHUNK_BYTES
+
+QUOTATIONS_PATH = "workflow/quotations"
+AMOUNT_FIELDS = ("addOnsTotal", "discountAmount", "finalPrice")
+DAY_FIELDS = ("addOnsDeliveryTime", "finalDeliveryTime")
+DEFAULT_BATCH_SIZE = 50_000
+DEFAULT_MAX_LISTED = 1000
+
+
+class QuotationAudit:
+    def __init__(self, policy: RoundingPolicy = APP_ROUNDING, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_listed: int = DEFAULT_MAX_LISTED):
+        """Audit quotations in batches of `batch_size`, listing at most `max_listed` mismatches"""
+        self.policy = policy
+        self.batch_size = max(1, batch_size)
+        self.max_listed = max_listed
+        self.audited = 0
+        self.mismatched = 0
+        self.field_mismatches: Dict[str, int] = {field: 0 for field in AMOUNT_FIELDS + DAY_FIELDS}
+        self.mismatches: List[Dict[str, Any]] = []
+        self.skipped: List[Dict[str, Any]] = []
+        self._reset_batch()
+
+    def _reset_batch(self):
+        self._ids: List[str] = []
+        self._columns: Dict[str, List[Any]] = {name: [] for name in (
+            "base", "addons", "base_days", "addon_days", "coupon_type", "coupon_value")}
+        self._stored: Dict[str, List[float]] = {field: [] for field in AMOUNT_FIELDS + DAY_FIELDS}
+
+    def add(self, quotation_id: str, quotation: Any):
+        """Queue one stored quotation; full batches are repriced immediately"""
+        try:
+            addons = quotation.get("selectedAddOns") or []
+            if isinstance(addons, dict):
+                addons = list(addons.values())
+            row = (
+                float(quotation["basePrice"]),
+                sum(round(float(addon["price"]) * 100) for addon in addons),
+                int(quotation["baseDeliveryTime"]),
+                sum(int(addon.get("extraDeliveryTime", 0)) for addon in addons),
+                *encode_coupon(quotation.get("appliedCoupon"))
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            self.skipped.append({"id": quotation_id, "reason": f"{type(e).__name__}: {e}"})
+            return
+
+        self._ids.append(quotation_id)
+        for name, value in zip(self._columns, row):
+            self._columns[name].append(value)
+        for field, values in self._stored.items():
+            stored = quotation.get(field)
+            values.append(stored if isinstance(stored, (int, float)) and not isinstance(stored, bool)
+                          else math.nan)
+        if len(self._ids) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Reprice the queued batch and compare it with the stored totals"""
+        if not self._ids:
+            return
+        columns = self._columns
+        result = price_totals_cents(
+            to_cents(columns["base"]), columns["addons"], columns["base_days"],
+            columns["addon_days"], columns["coupon_type"], columns["coupon_value"], self.policy
+        )
+        expected = {
+            "addOnsTotal": result.addons_total,
+            "discountAmount": result.discount_amount,
+            "finalPrice": result.final_price,
+            "addOnsDeliveryTime": result.addons_delivery_time,
+            "finalDeliveryTime": result.final_delivery_time
+        }
+
+        any_mismatch = np.zeros(len(self._ids), dtype=bool)
+        differs: Dict[str, np.ndarray] = {}
+        for field in AMOUNT_FIELDS + DAY_FIELDS:
+            stored = np.asarray(self._stored[field], dtype=np.float64)
+            missing = np.isnan(stored)
+            stored = np.where(missing, 0, stored)
+            stored = to_cents(stored) if field in AMOUNT_FIELDS else np.rint(stored).astype(np.int64)
+            differs[field] = missing | (stored != expected[field])
+            self.field_mismatches[field] += int(differs[field].sum())
+            any_mismatch |= differs[field]
+
+        for row in np.flatnonzero(any_mismatch):
+            self.mismatched += 1
+            if len(self.mismatches) >= self.max_listed:
+                continue
+            fields = {}
+            for field in AMOUNT_FIELDS + DAY_FIELDS:
+                if differs[field][row]:
+                    stored = self._stored[field][row]
+                    value = int(expected[field][row])
+                    fields[field] = {
+                        "stored": None if math.isnan(stored) else stored,
+                        "expected": from_cents(value) if field in AMOUNT_FIELDS else value
+                    }
+            self.mismatches.append({"id": self._ids[row], "fields": fields})
+
+        self.audited += len(self._ids)
+        self._reset_batch()
+
+    def audit(self, members: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+        """Audit every (id, quotation) member and return the report"""
+        start = time.perf_counter()
+        for quotation_id, quotation in members:
+            self.add(quotation_id, quotation)
+        self.flush()
+        elapsed = time.perf_counter() - start
+        return {
+            "rounding": self.policy.describe(),
+            "audited": self.audited,
+            "mismatched": self.mismatched,
+            "skipped": len(self.skipped),
+            "field_mismatches": self.field_mismatches,
+            "elapsed_s": round(elapsed, 3),
+            "quotations_per_s": round(self.audited / elapsed) if elapsed else 0,
+            "mismatches": self.mismatches,
+            "skipped_records": self.skipped[:self.max_listed]
+        }
+
+
+def read_export(export_file: str, chunk_size: int = DEFAULT_CHUNK_BYTES) -> ObjectStream:
+    """Stream the members of a JSON (or .json.gz) export of the quotations node"""
+    opener = gzip.open if export_file.endswith(".gz") else open
+
+    def chunks() -> Iterator[bytes]:
+        with opener(export_file, "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    return ObjectStream(chunks())
+
+
+def stream_quotations(db: RTDBClient, chunk_size: int = DEFAULT_CHUNK_BYTES) -> ObjectStream:
+    """Stream workflow/quotations from the database; close the stream if it is not read to the end"""
+    response = db.get(QUOTATIONS_PATH, stream=True)
+    if response.status_code != 200:
+        response.close()
+        raise RuntimeError(f"HTTP {response.status_code} reading '{QUOTATIONS_PATH}'")
+
+    def chunks() -> Iterator[bytes]:
+        # Return the pooled connection once the body is exhausted or the stream is closed
+        try:
+            yield from response.iter_content(chunk_size)
+        finally:
+            response.close()
+
+    return ObjectStream(chunks())
+
+
+def _synthetic_quotation(rng: random.Random, coupon_types: List[str]) -> Dict[str, Any]:
+    addons = [{"id": f"addon{n}", "price": rng.choice((49, 99, 149, 199.99)),
+               "extraDeliveryTime": rng.randint(0, 5)} for n in range(rng.randint(0, 4))]
+    coupon = None
+    if rng.random() < 0.5:
+        discount_type = rng.choice(coupon_types)
+        coupon = {"discount": rng.randint(5, 30) if discount_type == "percentage" else rng.randint(10, 200),
+                  "discountType": discount_type}
+    return {"basePrice": rng.randint(500, 10_000), "baseDeliveryTime": rng.randint(7, 60),
+            "selectedAddOns": addons, "appliedCoupon": coupon, "status": "pending_approval"}
+
+
+def write_synthetic_export(export_file: str, size: int, drift: float = 0.01, seed: int = 0,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write `size` random quotations, a `drift` fraction with stale totals; returns the drifted count"""
+    rng = random.Random(seed)
+    coupon_types = list(COUPON_TYPES)
+    drifted = 0
+    with open(export_file, "w", encoding="utf-8") as f:
+        f.write("{")
+        for offset in range(0, size, batch_size):
+            batch = [_synthetic_quotation(rng, coupon_types) for _ in range(min(batch_size, size - offset))]
+            coupons = [encode_coupon(quotation["appliedCoupon"]) for quotation in batch]
+            priced = price_totals_cents(
+                to_cents([quotation["basePrice"] for quotation in batch]),
+                [sum(round(addon["price"] * 100) for addon in quotation["selectedAddOns"]) for quotation in batch],
+                [quotation["baseDeliveryTime"] for quotation in batch],
+                [sum(addon["extraDeliveryTime"] for addon in quotation["selectedAddOns"]) for quotation in batch],
+                [coupon_type for coupon_type, _ in coupons], [value for _, value in coupons]
+            )
+            for row, quotation in enumerate(batch):
+                quotation.update({
+                    "addOnsTotal": from_cents(priced.addons_total[row]),
+                    "discountAmount": from_cents(priced.discount_amount[row]),
+                    "finalPrice": from_cents(priced.final_price[row]),
+                    "addOnsDeliveryTime": int(priced.addons_delivery_time[row]),
+                    "finalDeliveryTime": int(priced.final_delivery_time[row])
+                })
+                if rng.random() < drift:
+                    quotation["finalPrice"] += 1
+                    drifted += 1
+                f.write(("," if offset + row else "") + json.dumps(f"q{offset + row:07d}") + ":"
+                        + json.dumps(quotation, separators=(",", ":")))
+        f.write("}")
+    return drifted
+
+
+def print_audit_report(report: Dict[str, Any], listed: int = 20):
+    """Print the audit totals and the first `listed` mismatches"""
+    print(f"\n🧾 Audited {report['audited']:,} quotation(s) in {report['elapsed_s']:.2f}s "
+          f"({report['quotations_per_s']:,}/s), rounding {report['rounding']}")
+    print(f"{'✅' if not report['mismatched'] else '❌'} {report['mismatched']:,} with drifted totals, "
+          f"{report['skipped']:,} skipped")
+    for field, count in report["field_mismatches"].items():
+        if count:
+            print(f"   {field:<20}{count:>10,}")
+    for mismatch in report["mismatches"][:listed]:
+        details = ", ".join(f"{field} {values['stored']} → {values['expected']}"
+                            for field, values in mismatch["fields"].items())
+        print(f"   ❌ {mismatch['id']}: {details}")
+    for skipped in report["skipped_records"][:listed]:
+        print(f"   ⚠️  {skipped['id']}: {skipped['reason']}")
+
+
+def main():
+    """Main function to audit stored quotation totals"""
+    print("🧾 TOIRAL ESTIMATE - STORED QUOTATION AUDIT")
+    print("=" * 80)
+
+    parser = argparse.ArgumentParser(description="Recompute and verify stored quotation totals")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--export", metavar="FILE",
+                        help="Audit a JSON (or .json.gz) export of workflow/quotations")
+    source.add_argument("--benchmark", type=int, metavar="N",
+                        help="Audit N synthetic quotations written to a temporary export")
+    parser.add_argument("--rounding", choices=ROUNDING_MODES, default=APP_ROUNDING.mode,
+                        help="How percentage discounts are rounded")
+    parser.add_argument("--unit-cents", type=int, default=APP_ROUNDING.unit_cents,
+                        help="Rounding unit in cents (100 = whole units, as the app stores them)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Quotations repriced per vectorized batch")
+    parser.add_argument("--max-listed", type=int, default=DEFAULT_MAX_LISTED,
+                        help="Mismatches kept in the results file")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    audit = QuotationAudit(RoundingPolicy(args.unit_cents, args.rounding), args.batch_size, args.max_listed)
+    db, emulator = None, None
+    if args.benchmark:
+        fd, export_file = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            drifted = write_synthetic_export(export_file, args.benchmark)
+            print(f"📝 Wrote {args.benchmark:,} synthetic quotations "
+                  f"({os.path.getsize(export_file) / 1e6:.0f} MB, {drifted:,} drifted)")
+            report = audit.audit(read_export(export_file))
+        finally:
+            os.remove(export_file)
+    elif args.export:
+        report = audit.audit(read_export(args.export))
+    else:
+        base_url, emulator = database_url(args, DEFAULT_BASE_URL)
+        db = RTDBClient(base_url)
+        with stream_quotations(db) as quotations:
+            report = audit.audit(quotations)
+
+    print_audit_report(report)
+    if db:
+        db.close()
+    if emulator:
+        emulator.stop()
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results_file = f"/app/quotation_audit_results_{timestamp}.json"
+    try:
+        with open(results_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Audit results saved to: {results_file}")
+    except Exception as e:
+        print(f"\n⚠️  Could not save results file: {e}")
+
+    sys.exit(0 if not report["mismatched"] and not report["skipped"] else 1)
+
+
+if __name__ == "__main__":
+    main()
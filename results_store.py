@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Results Store for Toiral Estimate Test Suites
+One indexed SQLite file holding every suite run, in place of per-run JSON files
+
+Each suite used to write a pretty-printed <suite>_results_<timestamp>.json, so
+a question like "how slow has Client Quotation - Creation been lately" meant
+opening every file ever written. Runs are now appended to a single store:
+
+  runs      one row per suite run (suite, start time, totals, summary JSON)
+  results   one row per logged test (status, duration_ms, details, error)
+
+results carries its run's start time and is indexed on (test, started_at,
+duration_ms), so "p95 of a test over the last 30 runs" is an index range read
+of 30 rows however many runs are stored. `import` loads the existing JSON
+files (skipping any already imported); `query` and `history` answer trends,
+and `baseline` pins the runs perf_gate.py compares later runs of a suite to.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+DEFAULT_STORE_PATH = "/app/test_results.db"
+DEFAULT_LAST_RUNS = 30
+DEFAULT_BASELINE_RUNS = 10
+QUERY_PERCENTILES = (50, 95, 99)
+RESULT_FILE_PATTERN = re.compile(r"^(?P<suite>.+)_results_(?P<stamp>\d{8}_\d{6})\.json$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       INTEGER PRIMARY KEY,
+    suite        TEXT NOT NULL,
+    started_at   TEXT NOT NULL,
+    source       TEXT UNIQUE,
+    total_tests  INTEGER,
+    passed_tests INTEGER,
+    failed_tests INTEGER,
+    success_rate REAL,
+    summary      TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id      INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    suite       TEXT NOT NULL,
+    started_at  TEXT NOT NULL,
+    test        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    duration_ms REAL,
+    timestamp   TEXT,
+    details     TEXT,
+    error       TEXT
+);
+CREATE TABLE IF NOT EXISTS baselines (
+    suite  TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    PRIMARY KEY (suite, run_id)
+);
+CREATE INDEX IF NOT EXISTS runs_by_suite ON runs (suite, started_at);
+CREATE INDEX IF NOT EXISTS results_by_test ON results (test, started_at, duration_ms);
+CREATE INDEX IF NOT EXISTS results_by_suite_test ON results (suite, test, started_at, duration_ms);
+CREATE INDEX IF NOT EXISTS results_by_run ON results (run_id);
+"""
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linearly interpolated `pct`th percentile of `values`, or None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def parse_result_filename(path: str) -> Optional[Tuple[str, str]]:
+    """(suite, ISO start time) encoded in a <suite>_results_<YYYYmmdd_HHMMSS>.json name"""
+    match = RESULT_FILE_PATTERN.match(os.path.basename(path))
+    if not match:
+        return None
+    started = datetime.strptime(match.group("stamp"), "%Y%m%d_%H%M%S")
+    return match.group("suite"), started.isoformat()
+
+
+class ResultStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """Open (creating if needed) the SQLite store at `path`"""
+        self.path = path
+        # Suites may finish at the same time; wait for the writer instead of failing
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the underlying connection"""
+        self.conn.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append_run(self, suite: str, results: Dict[str, Any], started_at: Optional[str] = None,
+                   source: Optional[str] = None) -> int:
+        """Store one run_all_tests() result dict and return its run_id"""
+        started_at = started_at or datetime.now().isoformat(timespec="seconds")
+        tests = results.get("test_results", [])
+        summary = {key: value for key, value in results.items() if key != "test_results"}
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (suite, started_at, source, total_tests, passed_tests, failed_tests,"
+                " success_rate, summary) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (suite, started_at, source, results.get("total_tests", len(tests)),
+                 results.get("passed_tests"), results.get("failed_tests"),
+                 results.get("success_rate"), json.dumps(summary)))
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO results (run_id, suite, started_at, test, status, duration_ms, timestamp,"
+                " details, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, suite, started_at, test["test"], test["status"], test.get("duration_ms"),
+                  test.get("timestamp"), test.get("details", ""), test.get("error", ""))
+                 for test in tests])
+        return run_id
+
+    def import_file(self, path: str) -> Optional[int]:
+        """Import one legacy results file; None when it was already imported"""
+        source = os.path.basename(path)
+        if self.conn.execute("SELECT 1 FROM runs WHERE source = ?", (source,)).fetchone():
+            return None
+        with open(path) as f:
+            results = json.load(f)
+        parsed = parse_result_filename(path)
+        if parsed:
+            suite, started_at = parsed
+        else:
+            timestamps = [test.get("timestamp") for test in results.get("test_results", []) if test.get("timestamp")]
+            suite = os.path.splitext(source)[0]
+            started_at = min(timestamps) if timestamps else datetime.fromtimestamp(
+                os.path.getmtime(path)).isoformat(timespec="seconds")
+        return self.append_run(suite, results, started_at, source)
+
+    def import_files(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Import several legacy results files, counting imported and skipped ones"""
+        counts = {"imported": 0, "skipped": 0}
+        for path in paths:
+            counts["imported" if self.import_file(path) is not None else "skipped"] += 1
+        return counts
+
+    def recent_results(self, test: str, last: int = DEFAULT_LAST_RUNS,
+                       suite: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The `test` rows of the last `last` runs that logged it, newest first"""
+        where, params = "test = ?", [test]
+        if suite:
+            where, params = "suite = ? AND test = ?", [suite, test]
+        # Limit runs, not rows: a test may log several rows in one run
+        rows = self.conn.execute(
+            f"SELECT run_id, suite, started_at, status, duration_ms FROM results WHERE {where}"
+            f" AND run_id IN (SELECT run_id FROM results WHERE {where} GROUP BY run_id"
+            " ORDER BY MAX(started_at) DESC, run_id DESC LIMIT ?)"
+            " ORDER BY started_at DESC, run_id DESC, rowid", params + params + [last]).fetchall()
+        return [{"run_id": row[0], "suite": row[1], "started_at": row[2], "status": row[3],
+                 "duration_ms": row[4]} for row in rows]
+
+    def test_trend(self, test: str, last: int = DEFAULT_LAST_RUNS, suite: Optional[str] = None,
+                   percentiles: Iterable[float] = QUERY_PERCENTILES) -> Dict[str, Any]:
+        """Duration percentiles and pass rate of `test` over its last `last` runs"""
+        rows = self.recent_results(test, last, suite)
+        durations = [row["duration_ms"] for row in rows if row["duration_ms"] is not None]
+        return {
+            "test": test,
+            "suite": suite,
+            "runs": len({row["run_id"] for row in rows}),
+            "timed_runs": len(durations),
+            "passed": sum(1 for row in rows if row["status"] == "PASS"),
+            "min_ms": min(durations) if durations else None,
+            "max_ms": max(durations) if durations else None,
+            "percentiles": {pct: percentile(durations, pct) for pct in percentiles}
+        }
+
+    def run_summary(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """Stored result dict of a run without its test_results, or None if unknown"""
+        row = self.conn.execute("SELECT summary FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest_run(self, suite: str) -> Optional[int]:
+        """run_id of the suite's most recent run"""
+        row = self.conn.execute("SELECT run_id FROM runs WHERE suite = ? ORDER BY started_at DESC LIMIT 1",
+                                (suite,)).fetchone()
+        return row[0] if row else None
+
+    def set_baselines(self, suite: str, run_ids: Iterable[int]):
+        """Make `run_ids` the runs later runs of `suite` are compared against"""
+        with self.conn:
+            self.conn.execute("DELETE FROM baselines WHERE suite = ?", (suite,))
+            self.conn.executemany("INSERT INTO baselines (suite, run_id) VALUES (?, ?)",
+                                  [(suite, run_id) for run_id in run_ids])
+
+    def add_baseline(self, suite: str, run_id: int, keep: int = DEFAULT_BASELINE_RUNS):
+        """Add `run_id` to the suite's baseline runs, keeping only the newest `keep`"""
+        self.set_baselines(suite, ([run_id] + self.baselines(suite))[:keep])
+
+    def baselines(self, suite: str) -> List[int]:
+        """run_ids of the suite's baseline runs, newest first"""
+        rows = self.conn.execute(
+            "SELECT baselines.run_id FROM baselines JOIN runs ON runs.run_id = baselines.run_id"
+            " WHERE baselines.suite = ? ORDER BY runs.started_at DESC, runs.run_id DESC", (suite,)).fetchall()
+        return [row[0] for row in rows]
+
+    def list_runs(self, suite: Optional[str] = None, last: int = DEFAULT_LAST_RUNS) -> List[Dict[str, Any]]:
+        """Most recent runs, newest first"""
+        where, params = ("WHERE suite = ?", [suite]) if suite else ("", [])
+        rows = self.conn.execute(
+            f"SELECT run_id, suite, started_at, total_tests, passed_tests, failed_tests, success_rate, source"
+            f" FROM runs {where} ORDER BY started_at DESC LIMIT ?", params + [last]).fetchall()
+        keys = ("run_id", "suite", "started_at", "total_tests", "passed_tests", "failed_tests",
+                "success_rate", "source")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+def add_store_arguments(parser: argparse.ArgumentParser):
+    """Register the shared --results-db and --json-results options on a suite's parser"""
+    parser.add_argument("--results-db", default=DEFAULT_STORE_PATH,
+                        help="SQLite results store the run is appended to")
+    parser.add_argument("--json-results", action="store_true",
+                        help="Also write the per-run <suite>_results_<timestamp>.json file")
+
+
+def save_results(args: argparse.Namespace, suite: str, results: Dict[str, Any]) -> Optional[int]:
+    """Append a suite's results to the store (and the legacy JSON file when asked); returns the run_id"""
+    now = datetime.now()
+    run_id = None
+    try:
+        with ResultStore(args.results_db) as store:
+            run_id = store.append_run(suite, results, now.isoformat(timespec="seconds"))
+        print(f"\n💾 Test results stored as run {run_id} in: {args.results_db}")
+    except Exception as e:
+        print(f"\n⚠️  Could not store results: {e}")
+    if args.json_results:
+        results_file = f"/app/{suite}_results_{now.strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            with open(results_file, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"💾 Test results saved to: {results_file}")
+        except Exception as e:
+            print(f"⚠️  Could not save results file: {e}")
+    return run_id
+
+
+def format_ms(value: Optional[float]) -> str:
+    """Milliseconds for display, or '-' when unknown"""
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def main():
+    """Import legacy result files and query test trends"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate test results store")
+    parser.add_argument("--db", default=DEFAULT_STORE_PATH, help="SQLite results store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import <suite>_results_<timestamp>.json files")
+    import_parser.add_argument("files", nargs="+", help="Result files to import")
+    query_parser = commands.add_parser("query", help="Duration percentiles of one test")
+    query_parser.add_argument("test", help="Test name, e.g. 'Client Quotation - Creation'")
+    query_parser.add_argument("--last", type=int, default=DEFAULT_LAST_RUNS, help="Number of recent runs")
+    query_parser.add_argument("--suite", help="Only runs of this suite, e.g. phase5_test")
+    query_parser.add_argument("--percentile", type=float, nargs="+", default=list(QUERY_PERCENTILES),
+                              help="Percentiles to report")
+    history_parser = commands.add_parser("history", help="Per-run status and duration of one test")
+    history_parser.add_argument("test", help="Test name")
+    history_parser.add_argument("--last", type=int, default=DEFAULT_LAST_RUNS, help="Number of recent runs")
+    history_parser.add_argument("--suite", help="Only runs of this suite")
+    baseline_parser = commands.add_parser("baseline", help="Show or set a suite's baseline runs")
+    baseline_parser.add_argument("suite", help="Suite name, e.g. phase5_test")
+    baseline_parser.add_argument("run_ids", type=int, nargs="*", help="Runs to use as the baseline")
+    runs_parser = commands.add_parser("runs", help="Most recent runs")
+    runs_parser.add_argument("--last", type=int, default=DEFAULT_LAST_RUNS, help="Number of recent runs")
+    runs_parser.add_argument("--suite", help="Only runs of this suite")
+    args = parser.parse_args()
+
+    with ResultStore(args.db) as store:
+        if args.command == "import":
+            counts = store.import_files(args.files)
+            print(f"📥 Imported {counts['imported']} run(s), skipped {counts['skipped']} already stored")
+        elif args.command == "query":
+            trend = store.test_trend(args.test, args.last, args.suite, args.percentile)
+            if not trend["runs"]:
+                print(f"❌ No runs of '{args.test}' in {args.db}")
+                sys.exit(1)
+            print(f"📊 {args.test}: last {trend['runs']} run(s), {trend['timed_runs']} timed, "
+                  f"{trend['passed']} passed")
+            for pct, value in trend["percentiles"].items():
+                print(f"   p{pct:g}: {format_ms(value)} ms")
+            print(f"   min {format_ms(trend['min_ms'])} ms, max {format_ms(trend['max_ms'])} ms")
+        elif args.command == "history":
+            rows = store.recent_results(args.test, args.last, args.suite)
+            print(f"{'run':>6}  {'suite':<26}{'started':<21}{'status':<9}{'ms':>10}")
+            for row in rows:
+                print(f"{row['run_id']:>6}  {row['suite']:<26}{row['started_at']:<21}{row['status']:<9}"
+                      f"{format_ms(row['duration_ms']):>10}")
+        elif args.command == "baseline":
+            if args.run_ids:
+                unknown = [run_id for run_id in args.run_ids if store.run_summary(run_id) is None]
+                if unknown:
+                    print(f"❌ No run {', '.join(map(str, unknown))} in {args.db}")
+                    sys.exit(1)
+                store.set_baselines(args.suite, args.run_ids)
+            run_ids = store.baselines(args.suite)
+            print(f"📌 {args.suite} baseline: "
+                  f"{'runs ' + ', '.join(map(str, run_ids)) if run_ids else 'not set'}")
+        else:
+            print(f"{'run':>6}  {'suite':<26}{'started':<21}{'tests':>6}{'passed':>8}{'rate':>8}")
+            for run in store.list_runs(args.suite, args.last):
+                rate = f"{run['success_rate']:.1f}%" if run["success_rate"] is not None else "-"
+                print(f"{run['run_id']:>6}  {run['suite']:<26}{run['started_at']:<21}"
+                      f"{run['total_tests'] or 0:>6}{run['passed_tests'] or 0:>8}{rate:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+HTTP Cassettes for Toiral Estimate Backend Test Suites
+Record every database exchange of a suite run and replay it without a network
+
+--record attaches a CassetteWriter to the suite's client: each request
+(method, path, query params, body) is written with its response (status,
+ETag, body) and the measured latency to a gzip-compressed NDJSON cassette.
+--replay swaps the client for ReplayRTDBClient, which answers from the
+cassette instead of the network; with --replay-latency each answer is held
+back for the recorded time, so harness overhead can be measured apart from
+network time and slow runs can be reproduced. A streamed GET is not buffered
+for the cassette: its chunks are teed as the consumer reads them and the
+exchange is written once the body has been read (or the response closed).
+
+Test IDs come from the global `random` module, so the cassette stores the seed
+the recording ran with and replay reseeds with it. Interactions are matched on
+method, path and query params, consuming recorded answers for the same request
+in order.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from rtdb_client import BaseRTDBClient, RTDBResponse, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+
+CASSETTE_VERSION = 1
+RECORDED_HEADERS = ("ETag",)
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def add_cassette_arguments(parser: argparse.ArgumentParser):
+    """Register the shared --record / --replay options on a suite's parser"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="CASSETTE",
+                       help="Record every database exchange to a .jsonl.gz cassette")
+    group.add_argument("--replay", metavar="CASSETTE",
+                       help="Serve database responses from a cassette instead of the network")
+    parser.add_argument("--replay-latency", action="store_true",
+                        help="Hold each replayed response for its recorded latency")
+
+
+def _match_key(method: str, path: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+    canonical = json.dumps({key: str(value) for key, value in (params or {}).items()}, sort_keys=True)
+    return method.upper(), path.strip("/"), canonical
+
+
+class CassetteWriter:
+    def __init__(self, cassette_file: str, base_url: str, seed: int):
+        """Open a cassette for writing; the header carries the base URL and random seed"""
+        self.cassette_file = cassette_file
+        self._file = gzip.open(cassette_file, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.interactions = 0
+        self._streams: Set["StreamRecording"] = set()
+        self._write_line({
+            "cassette": CASSETTE_VERSION,
+            "base_url": base_url,
+            "seed": seed,
+            "recorded": datetime.now().isoformat()
+        })
+
+    def _write_line(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def write(self, method: str, path: str, params: Optional[Dict[str, Any]], json_body: Any,
+              headers: Optional[Dict[str, str]], response: Any, elapsed_ms: float, streamed: bool = False):
+        """Append one request/response exchange; a streamed body is written once its consumer has read it"""
+        entry = {
+            "method": method.upper(),
+            "path": path.strip("/"),
+            "params": {key: str(value) for key, value in (params or {}).items()},
+            "body": json_body,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS
+                        if name in response.headers},
+            "response": None,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "offset_ms": round((time.perf_counter() - self._started) * 1000 - elapsed_ms, 3)
+        }
+        if headers:
+            entry["request_headers"] = headers
+        if streamed:
+            # Reading response.content here would buffer the whole body before its consumer sees a byte
+            with self._lock:
+                self._streams.add(StreamRecording(self, entry, response))
+            return
+        entry["response"] = response.content.decode("utf-8", errors="replace")
+        self._append(entry)
+
+    def _append(self, entry: Dict[str, Any]):
+        with self._lock:
+            self._write_line(entry)
+            self.interactions += 1
+
+    def _finish_stream(self, recording: "StreamRecording"):
+        """Write a streamed exchange whose body has been read in full"""
+        with self._lock:
+            self._streams.discard(recording)
+        recording.entry["response"] = b"".join(recording.chunks).decode("utf-8", errors="replace")
+        self._append(recording.entry)
+
+    def close(self):
+        """Write any streamed exchanges still being read, then flush and close the cassette"""
+        with self._lock:
+            pending = list(self._streams)
+        for recording in pending:
+            recording.finish()
+        with self._lock:
+            self._file.close()
+
+
+class StreamRecording:
+    def __init__(self, writer: CassetteWriter, entry: Dict[str, Any], response: Any):
+        """Tee the chunks of a streamed `response` into `entry` as its consumer reads them"""
+        self.writer = writer
+        self.entry = entry
+        self.chunks: List[bytes] = []
+        self.done = False
+        self._iter_content = response.iter_content
+        self._close = response.close
+        response.iter_content = self.iter_content
+        response.close = self.close
+
+    def iter_content(self, chunk_size: int = 1, *args, **kwargs):
+        chunks = self._iter_content(chunk_size, *args, **kwargs)
+        try:
+            for chunk in chunks:
+                self.chunks.append(chunk)
+                yield chunk
+        finally:
+            # ObjectStream stops at the closing brace, before the iterator is exhausted
+            self.finish(chunks)
+
+    def close(self):
+        self.finish()
+        self._close()
+
+    def finish(self, rest: Optional[Iterable[bytes]] = None):
+        """Read whatever the consumer left unread and write the exchange, once"""
+        if self.done:
+            return
+        self.done = True
+        try:
+            self.chunks.extend(self._iter_content(STREAM_CHUNK_BYTES) if rest is None else rest)
+        except Exception:
+            # Connection already gone: keep what was read
+            pass
+        self.writer._finish_stream(self)
+
+
+def start_recording(db: BaseRTDBClient, cassette_file: str,
+                    seed: Optional[int] = None) -> CassetteWriter:
+    """Seed `random` and attach a cassette writer to `db`"""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    random.seed(seed)
+    db.cassette = CassetteWriter(cassette_file, db.base_url, seed)
+    return db.cassette
+
+
+def read_cassette(cassette_file: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return (header, interactions) from a cassette"""
+    with gzip.open(cassette_file, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("cassette") != CASSETTE_VERSION:
+            raise ValueError(f"{cassette_file} is not a version {CASSETTE_VERSION} cassette")
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayRTDBClient(BaseRTDBClient):
+    def __init__(self, cassette_file: str, reproduce_latency: bool = False,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT):
+        """Client answering from a recorded cassette; reseeds `random` to match the recording"""
+        header, interactions = read_cassette(cassette_file)
+        super().__init__(header["base_url"], pool_size, timeout)
+        self.header = header
+        self.reproduce_latency = reproduce_latency
+        self.misses: List[Tuple[str, str]] = []
+        self._tapes: Dict[Tuple[str, str, str], deque] = {}
+        self._tapes_lock = threading.Lock()
+        for interaction in interactions:
+            key = _match_key(interaction["method"], interaction["path"], interaction["params"])
+            self._tapes.setdefault(key, deque()).append(interaction)
+        random.seed(header["seed"])
+
+    def request(self, method: str, path: str, json_body: Any = None,
+                params: Optional[Dict[str, Any]] = None, **kwargs) -> RTDBResponse:
+        """Serve the next recorded response for this request"""
+        start = time.perf_counter()
+        with self._tapes_lock:
+            tape = self._tapes.get(_match_key(method, path, params))
+            interaction = tape.popleft() if tape else None
+            if interaction is None:
+                self.misses.append((method.upper(), path.strip("/")))
+
+        if interaction is None:
+            response = RTDBResponse(599, json.dumps({
+                "error": f"No recorded response for {method.upper()} /{path.strip('/')}"
+            }).encode("utf-8"), {})
+        else:
+            response = RTDBResponse(interaction["status"], interaction["response"].encode("utf-8"),
+                                    dict(interaction["headers"]))
+            if self.reproduce_latency:
+                remaining = interaction["elapsed_ms"] / 1000 - (time.perf_counter() - start)
+                if remaining > 0:
+                    time.sleep(remaining)
+        self._record(method, path, response, (time.perf_counter() - start) * 1000,
+                     params=params, json_body=json_body)
+        return response
+
+    def _concurrently(self, calls: List[Tuple[str, str, Any, Optional[Dict[str, Any]]]]) -> List[RTDBResponse]:
+        """Issue independent calls together so recorded latencies overlap as they did live"""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.pool_size, len(calls)))) as pool:
+            return list(pool.map(lambda call: self.request(call[0], call[1], call[2], call[3]), calls))
+
+    def get_many(self, paths: List[str],
+                 params: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[RTDBResponse]:
+        """GET several independent paths concurrently"""
+        params = params or [None] * len(paths)
+        return self._concurrently([("GET", path, None, query) for path, query in zip(paths, params)])
+
+    def put_many(self, writes: List[Tuple[str, Any]]) -> List[RTDBResponse]:
+        """PUT several independent (path, value) pairs concurrently"""
+        return self._concurrently([("PUT", path, data, None) for path, data in writes])
+
+    def unused(self) -> int:
+        """Recorded interactions that were never requested"""
+        with self._tapes_lock:
+            return sum(len(tape) for tape in self._tapes.values())
+
+
+def print_cassette_summary(db: BaseRTDBClient):
+    """Report what was recorded to, or replayed from, a cassette"""
+    if isinstance(db, ReplayRTDBClient):
+        print(f"📼 Replayed {len(db.calls) - len(db.misses)} interaction(s) "
+              f"({'recorded' if db.reproduce_latency else 'no'} latency), "
+              f"{len(db.misses)} miss(es), {db.unused()} unused")
+        for method, path in db.misses[:10]:
+            print(f"   ❓ Not in cassette: {method} /{path}")
+    elif db.cassette is not None:
+        print(f"📼 Recorded {db.cassette.interactions} interaction(s) to {db.cassette.cassette_file}")
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Firebase Realtime Database REST Client for Toiral Estimate Test Suites
+Pooled, keep-alive HTTP access shared by the backend test suites
+
+Every suite used to call bare requests.get/put/patch/delete, which opens a new
+TCP + TLS connection to the asia-southeast1 database for each call. This client
+keeps one requests.Session with a sized connection pool so DNS lookups and TLS
+handshakes are paid once per connection, and records the latency of every call.
+
+AsyncRTDBClient offers the same interface on top of an asyncio event loop
+(aiohttp), so independent reads and writes issued through get_many/put_many
+run concurrently instead of one after another.
+
+WriteBatch gathers pending writes and sends them as multi-path PATCH requests
+at a common root, so N fixture writes become one atomic round trip.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from latency_histogram import LatencyRecorder, current_test
+
+try:
+    import aiohttp
+except ImportError:  # only needed for --async mode
+    aiohttp = None
+
+DEFAULT_BASE_URL = "https://toiral-estimate-default-rtdb.asia-southeast1.firebasedatabase.app"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_BATCH_BYTES = 1024 * 1024
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+class RTDBResponse:
+    """Minimal requests.Response-compatible result returned by AsyncRTDBClient"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str]):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content) if self.content else None
+
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class BaseRTDBClient:
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """Shared configuration and latency capture for both client flavours"""
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.calls: List[Dict[str, Any]] = []
+        self._calls_lock = threading.Lock()
+        self.latency = LatencyRecorder()
+        # Optional sink (e.g. rtdb_cassette.CassetteWriter) that sees every exchange
+        self.cassette = None
+
+    def url(self, path: str) -> str:
+        """Build the REST URL for a database path such as 'workflow/clients/abc'"""
+        path = path.strip("/")
+        return f"{self.base_url}/{path}.json" if path else f"{self.base_url}/.json"
+
+    def request(self, method: str, path: str, json_body: Any = None,
+                params: Optional[Dict[str, Any]] = None, **kwargs):
+        """Send one request; implemented by the concrete clients"""
+        raise NotImplementedError
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        """GET a database path"""
+        return self.request("GET", path, params=params, **kwargs)
+
+    def put(self, path: str, data: Any, **kwargs):
+        """PUT (replace) the value at a database path"""
+        return self.request("PUT", path, json_body=data, **kwargs)
+
+    def patch(self, path: str, data: Dict[str, Any], **kwargs):
+        """PATCH (update) children of a database path"""
+        return self.request("PATCH", path, json_body=data, **kwargs)
+
+    def delete(self, path: str, **kwargs):
+        """DELETE the value at a database path"""
+        return self.request("DELETE", path, **kwargs)
+
+    def get_many(self, paths: List[str],
+                 params: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[Any]:
+        """GET several independent paths (with optional per-path query params) in order"""
+        params = params or [None] * len(paths)
+        return [self.get(path, params=query) for path, query in zip(paths, params)]
+
+    def put_many(self, writes: List[Tuple[str, Any]]) -> List[Any]:
+        """PUT several independent (path, value) pairs, returning responses in order"""
+        return [self.put(path, data) for path, data in writes]
+
+    def batch(self, root: str = "", max_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> "WriteBatch":
+        """Start a multi-path write batch rooted at `root`"""
+        return WriteBatch(self, root, max_bytes)
+
+    def _record(self, method: str, path: str, response: Any, elapsed_ms: float,
+                streamed: bool = False, params: Optional[Dict[str, Any]] = None,
+                json_body: Any = None, headers: Optional[Dict[str, str]] = None):
+        """Capture per-call latency and transfer size"""
+        if self.cassette is not None and response is not None:
+            self.cassette.write(method, path, params, json_body, headers, response, elapsed_ms, streamed)
+        # Streamed bodies are not read here; their consumer counts the bytes
+        body_bytes = len(response.content) if response is not None and not streamed else 0
+        call = {
+            "method": method,
+            "path": path.strip("/"),
+            "status": response.status_code if response is not None else None,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "bytes": body_bytes
+        }
+        with self._calls_lock:
+            self.calls.append(call)
+        self.latency.record(method, path, elapsed_ms, current_test())
+
+    def latency_summary(self) -> Dict[str, Any]:
+        """Summarise recorded call latencies"""
+        with self._calls_lock:
+            elapsed = sorted(call["elapsed_ms"] for call in self.calls)
+        if not elapsed:
+            return {"calls": 0}
+        return {
+            "calls": len(elapsed),
+            "total_ms": round(sum(elapsed), 3),
+            "min_ms": elapsed[0],
+            "avg_ms": round(sum(elapsed) / len(elapsed), 3),
+            "max_ms": elapsed[-1]
+        }
+
+    def close(self):
+        """Release pooled connections"""
+
+
+class RTDBClient(BaseRTDBClient):
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """Create a pooled keep-alive client for the database at base_url"""
+        super().__init__(base_url, pool_size, timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+        # Proxy settings are re-read from the environment on every request; a local
+        # emulator never goes through a proxy, so skip that per-call lookup for it
+        self.session.trust_env = urlsplit(self.base_url).hostname not in LOOPBACK_HOSTS
+
+    def request(self, method: str, path: str, json_body: Any = None,
+                params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        """Send one request through the pooled session and record its latency"""
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.session.request(method, self.url(path), json=json_body,
+                                            params=params, **kwargs)
+            return response
+        finally:
+            self._record(method, path, response, (time.perf_counter() - start) * 1000,
+                         streamed=kwargs.get("stream", False), params=params,
+                         json_body=json_body, headers=kwargs.get("headers"))
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+
+class AsyncRTDBClient(BaseRTDBClient):
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """Create an aiohttp client driven by a private event loop thread"""
+        if aiohttp is None:
+            raise RuntimeError("Async mode requires aiohttp (pip install aiohttp)")
+        super().__init__(base_url, pool_size, timeout)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="rtdb-async-loop", daemon=True)
+        self._thread.start()
+        self._session = self._run(self._open_session())
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+        return aiohttp.ClientSession(connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    def _run(self, coro):
+        """Run a coroutine on the client loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def send(self, method: str, path: str, json_body: Any = None,
+                   params: Optional[Dict[str, Any]] = None,
+                   headers: Optional[Dict[str, str]] = None, **kwargs) -> RTDBResponse:
+        """Coroutine form of request(); stream and timeout hints are ignored"""
+        if params:
+            params = {key: str(value) for key, value in params.items()}
+        start = time.perf_counter()
+        response = None
+        try:
+            async with self._session.request(method, self.url(path), json=json_body,
+                                             params=params, headers=headers) as raw:
+                content = await raw.read()
+                response = RTDBResponse(raw.status, content, dict(raw.headers))
+            return response
+        finally:
+            self._record(method, path, response, (time.perf_counter() - start) * 1000,
+                         params=params, json_body=json_body, headers=headers)
+
+    def request(self, method: str, path: str, json_body: Any = None,
+                params: Optional[Dict[str, Any]] = None, **kwargs) -> RTDBResponse:
+        """Send one request on the event loop and block until it completes"""
+        return self._run(self.send(method, path, json_body, params, **kwargs))
+
+    def get_many(self, paths: List[str],
+                 params: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[RTDBResponse]:
+        """GET several independent paths concurrently"""
+        params = params or [None] * len(paths)
+
+        async def fetch_all():
+            return await asyncio.gather(*(self.send("GET", path, params=query)
+                                          for path, query in zip(paths, params)))
+        return self._run(fetch_all())
+
+    def put_many(self, writes: List[Tuple[str, Any]]) -> List[RTDBResponse]:
+        """PUT several independent (path, value) pairs concurrently"""
+        async def write_all():
+            return await asyncio.gather(*(self.send("PUT", path, data) for path, data in writes))
+        return self._run(write_all())
+
+    def close(self):
+        """Close the aiohttp session and stop the event loop thread"""
+        self._run(self._session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+class WriteBatch:
+    def __init__(self, db: BaseRTDBClient, root: str = "", max_bytes: int = DEFAULT_MAX_BATCH_BYTES):
+        """Collect writes under `root` and flush them as multi-path PATCH requests"""
+        self.db = db
+        self.root = root.strip("/")
+        self.max_bytes = max_bytes
+        self.pending: Dict[str, Any] = {}
+
+    def _relative(self, path: str) -> str:
+        path = path.strip("/")
+        if not self.root:
+            return path
+        if path == self.root or not path.startswith(self.root + "/"):
+            raise ValueError(f"Path '{path}' is not below batch root '{self.root}'")
+        return path[len(self.root) + 1:]
+
+    def put(self, path: str, value: Any) -> "WriteBatch":
+        """Queue a write of `value` at `path` (relative to the database root)"""
+        self.pending[self._relative(path)] = value
+        return self
+
+    def delete(self, path: str) -> "WriteBatch":
+        """Queue removal of `path`; a null value deletes the location"""
+        return self.put(path, None)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def chunks(self) -> List[Dict[str, Any]]:
+        """Split pending writes into PATCH bodies no larger than max_bytes"""
+        chunks, current, current_bytes = [], {}, 2
+        for key, value in self.pending.items():
+            # Size of '"key": value, ' inside the JSON object
+            entry_bytes = len(json.dumps({key: value}).encode("utf-8"))
+            if entry_bytes + 2 > self.max_bytes:
+                raise ValueError(f"Write to '{key}' ({entry_bytes} bytes) exceeds "
+                                 f"max batch size of {self.max_bytes} bytes")
+            if current and current_bytes + entry_bytes > self.max_bytes:
+                chunks.append(current)
+                current, current_bytes = {}, 2
+            current[key] = value
+            current_bytes += entry_bytes
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def commit(self, atomic: bool = False) -> List[Any]:
+        """Send pending writes, stopping at the first failed chunk; unapplied writes stay pending"""
+        chunks = self.chunks()
+        # Each chunk is applied atomically, so only a batch that fits in one chunk is all-or-nothing
+        if atomic and len(chunks) > 1:
+            raise ValueError(f"Batch of {len(self.pending)} writes needs {len(chunks)} PATCH requests "
+                             f"of at most {self.max_bytes} bytes and would not be applied atomically")
+        responses = []
+        for chunk in chunks:
+            response = self.db.patch(self.root, chunk)
+            responses.append(response)
+            if response.status_code != 200:
+                break
+            for key in chunk:
+                del self.pending[key]
+        return responses
+
+    def __enter__(self) -> "WriteBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
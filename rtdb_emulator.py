@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Local Firebase Realtime Database Emulator for Toiral Estimate Test Suites
+In-process stand-in for the RTDB REST API so the backend suites run offline
+
+The archived backend results fail with "HTTP 401 Permission denied" whenever the
+live asia-southeast1 instance refuses the unauthenticated test traffic, and every
+round trip to it costs tens of milliseconds. RTDBEmulator serves the subset of
+the REST surface the suites use from an in-memory tree on a local
+ThreadingHTTPServer:
+
+  * GET / PUT / PATCH / POST / DELETE on .json paths, including print=silent
+  * shallow=true reads
+  * orderBy ("$key", "$value" or a child path) with equalTo, startAt, endAt,
+    limitToFirst and limitToLast, optionally enforcing declared .indexOn rules;
+    equalTo on a declared index is answered from a value → keys map that is
+    rebuilt only after a write, so indexed lookups stay cheap on big trees
+  * multi-path PATCH updates, rejecting overlapping paths like the real service
+  * ETags (X-Firebase-ETag: true) and conditional writes with if-match,
+    where "null_etag" matches an empty location
+
+Point a suite at it with --emulator (starts one in-process) or with
+--base-url http://127.0.0.1:<port> against a standalone `python rtdb_emulator.py`.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 0
+NULL_ETAG = "null_etag"
+PUSH_CHARS = "-0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+QUERY_PARAMS = ("orderBy", "equalTo", "startAt", "endAt", "limitToFirst", "limitToLast")
+
+
+class EmulatorError(Exception):
+    def __init__(self, status: int, message: str):
+        """An error answered to the client as {"error": message}"""
+        super().__init__(message)
+        self.status = status
+
+
+def split_path(path: str) -> List[str]:
+    """Database path as a list of decoded segments"""
+    return [unquote(part) for part in path.strip("/").split("/") if part]
+
+
+def normalize(value: Any) -> Any:
+    """Stored form of a written value: arrays become objects and nulls/empties vanish"""
+    if isinstance(value, list):
+        value = {str(index): item for index, item in enumerate(value)}
+    if isinstance(value, dict):
+        children = {str(key): normalize(child) for key, child in value.items()}
+        children = {key: child for key, child in children.items() if child is not None}
+        return children or None
+    return value
+
+
+def render(value: Any) -> Any:
+    """Output form of a stored value; mostly-dense integer keys render as arrays"""
+    if not isinstance(value, dict):
+        return value
+    children = {key: render(child) for key, child in value.items()}
+    if children and all(key.isdigit() and (key == "0" or not key.startswith("0")) for key in children):
+        highest = max(int(key) for key in children)
+        if len(children) * 2 > highest + 1:
+            return [children.get(str(index)) for index in range(highest + 1)]
+    return children
+
+
+def etag(value: Any) -> str:
+    """ETag for a stored value"""
+    if value is None:
+        return NULL_ETAG
+    canonical = json.dumps(render(value), sort_keys=True, separators=(",", ":"))
+    return base64.b64encode(hashlib.sha1(canonical.encode("utf-8")).digest()).decode("ascii")
+
+
+def _key_order(key: str) -> Tuple:
+    """Firebase key ordering: 32-bit integer keys numerically first, then strings"""
+    if key.lstrip("-").isdigit() and -2 ** 31 <= int(key) < 2 ** 31:
+        return (0, int(key), "")
+    return (1, 0, key)
+
+
+def _value_order(value: Any) -> Tuple:
+    """Firebase value ordering: null, false, true, numbers, strings, objects"""
+    if value is None:
+        return (0, 0)
+    if value is False:
+        return (1, 0)
+    if value is True:
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5, 0)
+
+
+class RTDBEmulator:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 data: Any = None, indexes: Optional[Dict[str, List[str]]] = None):
+        """Emulator serving `data`; if `indexes` is given only those children may be queried"""
+        self.host = host
+        self.port = port
+        self.indexes = ({path.strip("/"): list(children) for path, children in indexes.items()}
+                        if indexes is not None else None)
+        self._root = normalize(data)
+        self._lock = threading.RLock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._rng = random.Random()
+        self._version = 0
+        self._value_indexes: Dict[Tuple[str, str], Tuple[int, Dict[Tuple, List[str]]]] = {}
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        """Root URL to hand to RTDBClient"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "RTDBEmulator":
+        """Start serving on a background thread"""
+        handler = type("BoundRTDBHandler", (RTDBRequestHandler,), {"emulator": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="rtdb-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self) -> "RTDBEmulator":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _get_node(self, parts: List[str]) -> Any:
+        node = self._root
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _set_node(self, parts: List[str], value: Any):
+        value = normalize(value)
+        self._version += 1
+        if not parts:
+            self._root = value
+            return
+        if not isinstance(self._root, dict):
+            self._root = {}
+        trail = [self._root]
+        for part in parts[:-1]:
+            child = trail[-1].get(part)
+            if not isinstance(child, dict):
+                child = trail[-1][part] = {}
+            trail.append(child)
+        if value is None:
+            trail[-1].pop(parts[-1], None)
+        else:
+            trail[-1][parts[-1]] = value
+        # Prune parents left empty by a delete
+        for depth in range(len(parts) - 1, 0, -1):
+            if trail[depth]:
+                break
+            trail[depth - 1].pop(parts[depth - 1], None)
+        if not self._root:
+            self._root = None
+
+    def snapshot(self, path: str = "") -> Any:
+        """Current value at a path, as a client would read it"""
+        with self._lock:
+            return render(self._get_node(split_path(path)))
+
+    def load(self, data: Any):
+        """Replace the whole database"""
+        with self._lock:
+            self._root = normalize(data)
+            self._version += 1
+
+    def push_id(self) -> str:
+        """Chronologically sortable key in the style of Firebase push IDs"""
+        millis = int(time.time() * 1000)
+        stamp = ""
+        for _ in range(8):
+            stamp = PUSH_CHARS[millis % 64] + stamp
+            millis //= 64
+        return stamp + "".join(self._rng.choice(PUSH_CHARS) for _ in range(12))
+
+    def _query(self, path: str, node: Any, params: Dict[str, str]) -> Any:
+        order_by = json.loads(params["orderBy"])
+        if not isinstance(order_by, str):
+            raise EmulatorError(400, "orderBy must be a valid JSON encoded path")
+        if order_by not in ("$key", "$value", "$priority") and self.indexes is not None:
+            if order_by not in self.indexes.get(path.strip("/"), []):
+                raise EmulatorError(400, f'Index not defined, add ".indexOn": "{order_by}", '
+                                         f'for path "/{path.strip("/")}", to the rules')
+        if not isinstance(node, dict):
+            return None
+        if (self.indexes is not None and set(params) & set(QUERY_PARAMS) == {"orderBy", "equalTo"}
+                and order_by in self.indexes.get(path.strip("/"), [])):
+            keys = self._value_index(path.strip("/"), order_by, node).get(
+                _value_order(json.loads(params["equalTo"])), [])
+            return {key: node[key] for key in sorted(keys, key=_key_order)}
+
+        def sort_value(item: Tuple[str, Any]) -> Any:
+            key, value = item
+            if order_by == "$key":
+                return key
+            if order_by == "$value":
+                return value
+            if order_by == "$priority":
+                return None
+            child = value
+            for part in split_path(order_by):
+                child = child.get(part) if isinstance(child, dict) else None
+            return child
+
+        def position(item: Tuple[str, Any]) -> Tuple:
+            if order_by == "$key":
+                return (_key_order(item[0]),)
+            return (_value_order(sort_value(item)), _key_order(item[0]))
+
+        def bound(name: str) -> Tuple:
+            value = json.loads(params[name])
+            return (_key_order(str(value)),) if order_by == "$key" else (_value_order(value),)
+
+        items = sorted(node.items(), key=position)
+        for name, keep in (("equalTo", lambda p, b: p[:1] == b),
+                           ("startAt", lambda p, b: p[:1] >= b),
+                           ("endAt", lambda p, b: p[:1] <= b)):
+            if name in params:
+                limit = bound(name)
+                items = [item for item in items if keep(position(item), limit)]
+        if "limitToFirst" in params:
+            items = items[:int(params["limitToFirst"])]
+        if "limitToLast" in params:
+            count = int(params["limitToLast"])
+            items = items[-count:] if count else []
+        return {key: value for key, value in items}
+
+    def _value_index(self, path: str, child: str, node: Dict[str, Any]) -> Dict[Tuple, List[str]]:
+        """Keys of `node` grouped by the value of `child`, cached until the next write"""
+        cached = self._value_indexes.get((path, child))
+        if cached and cached[0] == self._version:
+            return cached[1]
+        index: Dict[Tuple, List[str]] = {}
+        child_parts = split_path(child)
+        for key, value in node.items():
+            for part in child_parts:
+                value = value.get(part) if isinstance(value, dict) else None
+            index.setdefault(_value_order(value), []).append(key)
+        self._value_indexes[(path, child)] = (self._version, index)
+        return index
+
+    def handle(self, method: str, path: str, params: Dict[str, str], headers: Dict[str, str],
+               body: Any) -> Tuple[int, Any, Dict[str, str]]:
+        """Apply one REST call; returns (status, JSON body, extra headers)"""
+        parts = split_path(path)
+        with self._lock:
+            self.requests += 1
+            current = self._get_node(parts)
+            response_headers = {}
+            if headers.get("x-firebase-etag", "").lower() == "true":
+                response_headers["ETag"] = etag(current)
+
+            if method == "GET":
+                shallow = params.get("shallow") == "true"
+                if shallow and any(name in params for name in QUERY_PARAMS):
+                    raise EmulatorError(400, "Mixing 'shallow' and querying parameters is not supported")
+                if any(name in params for name in QUERY_PARAMS):
+                    if "orderBy" not in params:
+                        raise EmulatorError(400, "orderBy must be defined when other query "
+                                                 "parameters are defined")
+                    return 200, render(self._query(path, current, params)), response_headers
+                if shallow and isinstance(current, dict):
+                    return 200, {key: True for key in current}, response_headers
+                return 200, render(current), response_headers
+
+            if "if-match" in headers and headers["if-match"] != etag(current):
+                response_headers["ETag"] = etag(current)
+                return 412, render(current), response_headers
+
+            if method == "PUT":
+                self._set_node(parts, body)
+                result = render(self._get_node(parts))
+            elif method == "DELETE":
+                self._set_node(parts, None)
+                result = None
+            elif method == "POST":
+                name = self.push_id()
+                self._set_node(parts + [name], body)
+                result = {"name": name}
+            elif method == "PATCH":
+                if not isinstance(body, dict):
+                    raise EmulatorError(400, "Invalid data; couldn't parse JSON object")
+                updates = [(split_path(key), value) for key, value in body.items()]
+                seen = set()
+                for update_parts, _ in sorted(updates, key=lambda update: len(update[0])):
+                    if any(tuple(update_parts[:i]) in seen for i in range(1, len(update_parts) + 1)):
+                        raise EmulatorError(400, "Invalid data; path overlaps another update")
+                    seen.add(tuple(update_parts))
+                for update_parts, value in updates:
+                    self._set_node(parts + update_parts, value)
+                result = body
+            else:
+                raise EmulatorError(405, f"Method {method} not supported")
+
+            if "ETag" in response_headers:
+                response_headers["ETag"] = etag(self._get_node(parts))
+            if params.get("print") == "silent":
+                return 204, None, response_headers
+            return 200, result, response_headers
+
+
+class RTDBRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end translating requests into RTDBEmulator.handle() calls"""
+    emulator: RTDBEmulator = None
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        if not url.path.endswith(".json"):
+            self._send(404, {"error": "Not found; paths must end in .json"}, {})
+            return
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        headers = {name.lower(): value for name, value in self.headers.items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+            status, payload, extra = self.emulator.handle(self.command, url.path[:-len(".json")],
+                                                          params, headers, body)
+        except ValueError:
+            status, payload, extra = 400, {"error": "Invalid data; couldn't parse JSON object"}, {}
+        except EmulatorError as e:
+            status, payload, extra = e.status, {"error": str(e)}, {}
+        self._send(status, payload, extra)
+
+    def _send(self, status: int, payload: Any, extra: Dict[str, str]):
+        body = b"" if status == 204 else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in extra.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = do_PATCH = do_POST = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+def database_url(args: argparse.Namespace, default: str) -> Tuple[str, Optional[RTDBEmulator]]:
+    """Base URL chosen by --emulator / --base-url, plus the emulator started for it"""
+    if args.emulator:
+        emulator = RTDBEmulator().start()
+        print(f"🧪 Using in-process RTDB emulator at {emulator.base_url}")
+        return emulator.base_url, emulator
+    return args.base_url or default, None
+
+
+def add_emulator_arguments(parser: argparse.ArgumentParser):
+    """Register the shared --base-url and --emulator options on a suite's parser"""
+    parser.add_argument("--base-url", default=None,
+                        help="Database root URL (overrides the production database)")
+    parser.add_argument("--emulator", action="store_true",
+                        help="Run against an in-process RTDB emulator instead of Firebase")
+
+
+def load_indexes(rules_file: str) -> Dict[str, List[str]]:
+    """Collect .indexOn declarations from a database rules file"""
+    with open(rules_file, "r") as f:
+        rules = json.load(f).get("rules", {})
+    indexes: Dict[str, List[str]] = {}
+
+    def walk(node: Dict[str, Any], path: List[str]):
+        for key, child in node.items():
+            if key == ".indexOn":
+                indexes["/".join(path)] = [child] if isinstance(child, str) else list(child)
+            elif isinstance(child, dict) and not key.startswith("$"):
+                walk(child, path + [key])
+
+    walk(rules, [])
+    return indexes
+
+
+def main():
+    """Run a standalone emulator"""
+    parser = argparse.ArgumentParser(description="Local Firebase RTDB REST emulator")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--data", help="JSON file to seed the database with")
+    parser.add_argument("--rules", help="database.rules.json whose .indexOn entries are enforced")
+    args = parser.parse_args()
+
+    data = None
+    if args.data:
+        with open(args.data, "r") as f:
+            data = json.load(f)
+    indexes = load_indexes(args.rules) if args.rules else None
+
+    emulator = RTDBEmulator(args.host, args.port, data=data, indexes=indexes).start()
+    print(f"🔥 RTDB emulator listening on {emulator.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Indexed Firebase Queries for Toiral Estimate Test Suites
+Server-side orderBy/equalTo filtering with a full-scan fallback
+
+getClientQuotations and getClientProjects in workflowService.ts download whole
+collections and filter them by clientId on the client. The REST API can do the
+filtering server-side with ?orderBy="clientId"&equalTo="<id>", but only when
+the collection declares ".indexOn": ["clientId"] in the database rules;
+otherwise it answers 400 "Index not defined". The helpers here try the indexed
+query first and fall back to streaming the collection and filtering locally.
+"""
+
+import json
+import time
+from typing import Dict, Any, Iterable, Tuple
+
+from rtdb_client import BaseRTDBClient
+from rtdb_stream import stream_members
+
+INDEXED = "indexed"
+SCAN = "scan"
+
+
+def equal_to_params(child: str, value: Any) -> Dict[str, str]:
+    """Query parameters selecting children whose `child` equals `value`"""
+    # The REST API expects both parameters as JSON literals
+    return {"orderBy": json.dumps(child), "equalTo": json.dumps(value)}
+
+
+def is_missing_index(response: Any) -> bool:
+    """True if the database rejected a query because the child is not indexed"""
+    return response.status_code == 400 and "index not defined" in response.text.lower()
+
+
+def filter_equal(members: Iterable[Tuple[str, Any]], child: str, value: Any) -> Dict[str, Any]:
+    """Local equivalent of an equalTo query over (key, record) pairs"""
+    return {key: record for key, record in members
+            if isinstance(record, dict) and record.get(child) == value}
+
+
+class QueryResult:
+    def __init__(self, strategy: str, records: Dict[str, Any], status_code: int,
+                 bytes_transferred: int, elapsed_ms: float, requests: int):
+        """Matching records plus what it cost to fetch them"""
+        self.strategy = strategy
+        self.records = records
+        self.status_code = status_code
+        self.bytes_transferred = bytes_transferred
+        self.elapsed_ms = elapsed_ms
+        self.requests = requests
+
+    def summary(self) -> Dict[str, Any]:
+        """Cost figures for reporting"""
+        return {
+            "strategy": self.strategy,
+            "status": self.status_code,
+            "matches": len(self.records),
+            "bytes": self.bytes_transferred,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "requests": self.requests
+        }
+
+
+def scan_equal(db: BaseRTDBClient, path: str, child: str, value: Any) -> QueryResult:
+    """Stream the whole collection and filter it locally, one record at a time"""
+    start = time.perf_counter()
+    response = db.get(path, stream=True)
+    try:
+        if response.status_code == 200:
+            members = stream_members(response)
+            records = filter_equal(members, child, value)
+            body_bytes = members.bytes_read
+        else:
+            records, body_bytes = {}, len(response.content)
+    finally:
+        response.close()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return QueryResult(SCAN, records, response.status_code, body_bytes, elapsed_ms, 1)
+
+
+def resolve_query(db: BaseRTDBClient, response: Any, path: str, child: str, value: Any,
+                  elapsed_ms: float = 0.0) -> QueryResult:
+    """Result of an indexed equalTo query, rerun as a scan if the index is missing"""
+    if is_missing_index(response):
+        fallback = scan_equal(db, path, child, value)
+        fallback.bytes_transferred += len(response.content)
+        fallback.elapsed_ms += elapsed_ms
+        fallback.requests += 1
+        return fallback
+    records = (response.json() or {}) if response.status_code == 200 else {}
+    return QueryResult(INDEXED, records, response.status_code, len(response.content), elapsed_ms, 1)
+
+
+def query_equal(db: BaseRTDBClient, path: str, child: str, value: Any) -> QueryResult:
+    """Filter server-side by `child`, falling back to a scan when it is not indexed"""
+    start = time.perf_counter()
+    response = db.get(path, params=equal_to_params(child, value))
+    return resolve_query(db, response, path, child, value, (time.perf_counter() - start) * 1000)
+
+
+def compare_strategies(db: BaseRTDBClient, path: str, child: str, value: Any) -> Dict[str, Any]:
+    """Run the same lookup both ways and report bytes and latency for each"""
+    indexed = query_equal(db, path, child, value)
+    scan = scan_equal(db, path, child, value)
+    return {
+        "path": path,
+        "indexed": indexed.summary(),
+        "scan": scan.summary(),
+        "consistent": set(indexed.records) == set(scan.records)
+    }
+
+
+def describe_comparison(comparison: Dict[str, Any]) -> str:
+    """One-line rendering of compare_strategies() output"""
+    indexed, scan = comparison["indexed"], comparison["scan"]
+    if indexed["strategy"] != INDEXED:
+        indexed_text = "index missing, fell back to scan"
+    else:
+        indexed_text = f"{indexed['bytes']} B in {indexed['elapsed_ms']:.1f} ms"
+    return (f"{comparison['path']}: indexed {indexed_text}; "
+            f"scan {scan['bytes']} B in {scan['elapsed_ms']:.1f} ms "
+            f"({scan['matches']} match(es))")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Firebase Realtime Database Statistics Collector for Toiral Estimate Test Suites
+Counts and sizes collections without downloading them
+
+Record counts come from ?shallow=true reads, which return only the child keys.
+Subtree sizes are estimated by fetching a random sample of children and scaling
+the mean child size by the child count; small nodes are descended into so that
+a handful of large collections (e.g. under 'workflow') are each sampled on their
+own. Shallow key lists are streamed and sampled with a reservoir, so even a
+collection with millions of children is never held in memory. Full subtrees are
+only streamed when explicitly requested, and every figure is reported next to
+the number of bytes it cost to obtain.
+"""
+
+import json
+import random
+from typing import Dict, List, Any, Optional, Tuple
+
+from rtdb_client import BaseRTDBClient
+from rtdb_stream import ObjectStream, stream_members
+
+DEFAULT_SAMPLE_SIZE = 5
+DEFAULT_DEPTH = 2
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class StatisticsCollector:
+    def __init__(self, db: BaseRTDBClient, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 seed: Optional[int] = None):
+        """Collect database statistics through `db`, sampling `sample_size` children per node"""
+        self.db = db
+        self.sample_size = max(1, sample_size)
+        # Derived from the global generator so seeding `random` makes sampling reproducible
+        self.rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        self.bytes_transferred = 0
+        self.requests = 0
+
+    def _stream(self, path: str, params: Optional[Dict[str, Any]] = None) -> ObjectStream:
+        """Open a streamed read; the caller iterates (and thereby consumes) the body"""
+        response = self.db.get(path, params=params, stream=True)
+        self.requests += 1
+        if response.status_code != 200:
+            response.close()
+            raise RuntimeError(f"HTTP {response.status_code} reading '{path or '/'}'")
+        return stream_members(response, STREAM_CHUNK_BYTES)
+
+    def _scan_keys(self, path: str) -> Tuple[int, List[str], int, Optional[int]]:
+        """Stream a shallow read, returning (child count, key sample, key overhead, leaf size)"""
+        members = self._stream(path, {"shallow": "true"})
+        count, sample, key_overhead = 0, [], 1
+        for key, _ in members:
+            count += 1
+            # '"key":' plus a separator for every child, and the enclosing braces
+            key_overhead += len(json.dumps(key)) + 2
+            # Reservoir sampling keeps the sample uniform without holding every key
+            if len(sample) < self.sample_size:
+                sample.append(key)
+            else:
+                slot = self.rng.randrange(count)
+                if slot < self.sample_size:
+                    sample[slot] = key
+        self.bytes_transferred += members.bytes_read
+        leaf_size = None if members.is_object else (members.bytes_read if members.value is not None else 0)
+        return count, sample, key_overhead, leaf_size
+
+    def count_children(self, path: str) -> int:
+        """Number of direct children of a node"""
+        return self._scan_keys(path)[0]
+
+    def estimate_size(self, path: str, depth: int = DEFAULT_DEPTH,
+                      scan: Optional[Tuple[int, List[str], int, Optional[int]]] = None) -> int:
+        """Estimate the serialized size of a subtree in bytes, reusing `path`'s _scan_keys() result if given"""
+        count, sample, key_overhead, leaf_size = scan or self._scan_keys(path)
+        if leaf_size is not None:
+            return leaf_size
+        if not count:
+            return 0
+
+        if count <= self.sample_size and depth > 0:
+            return key_overhead + sum(self.estimate_size(f"{path}/{key}".strip("/"), depth - 1)
+                                      for key in sample)
+
+        sampled_bytes = sum(self.stream_size(f"{path}/{key}".strip("/")) for key in sample)
+        return key_overhead + round(sampled_bytes / len(sample) * count)
+
+    def stream_size(self, path: str) -> int:
+        """Exact subtree size, streamed in chunks without buffering the body"""
+        response = self.db.get(path, stream=True)
+        self.requests += 1
+        try:
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code} reading '{path or '/'}'")
+            total = 0
+            for chunk in response.iter_content(STREAM_CHUNK_BYTES):
+                total += len(chunk)
+            self.bytes_transferred += total
+            return total
+        finally:
+            response.close()
+
+    def collect(self, collections: List[str], full: bool = False) -> Dict[str, Any]:
+        """Count and size each collection, and total their sizes"""
+        statistics: Dict[str, Any] = {}
+        sizes: Dict[str, int] = {}
+        for collection in collections:
+            try:
+                # One shallow read both counts the children and samples them for the estimate
+                scan = self._scan_keys(collection)
+                statistics[collection] = scan[0]
+                sizes[collection] = (self.stream_size(collection) if full
+                                     else self.estimate_size(collection, scan=scan))
+            except Exception:
+                statistics[collection] = 0
+                sizes[collection] = 0
+
+        # Sized from the collections already read rather than by sampling the root again:
+        # each present collection's body plus its '"key":' and separator, inside the braces
+        data_size_bytes = 2 + sum(len(json.dumps(collection)) + 2 + size
+                                  for collection, size in sizes.items() if size)
+
+        statistics["data_size_mb"] = round(data_size_bytes / (1024 * 1024), 2)
+        statistics["collection_bytes"] = sizes
+        statistics["size_mode"] = "streamed" if full else "sampled"
+        statistics["bytes_transferred"] = self.bytes_transferred
+        statistics["requests"] = self.requests
+        return statistics
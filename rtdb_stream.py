@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Reader for Toiral Estimate Test Suites
+Walks the top level of a large RTDB response without holding it in memory
+
+response.json() on a whole collection (or on /.json) keeps both the raw body
+and the parsed tree alive at once. ObjectStream instead consumes a chunked
+response (requests' iter_content with stream=True) and yields the top-level
+(key, value) members one at a time, counting the bytes it has read. Only the
+member currently being assembled is buffered, so peak memory is bounded by the
+largest single record rather than by the size of the collection.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, Tuple
+
+DEFAULT_CHUNK_BYTES = 64 * 1024
+
+# Characters that matter to the scanner outside and inside string literals
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_WHITESPACE = " \t\r\n"
+_DECODER = json.JSONDecoder()
+
+
+class ObjectStream:
+    def __init__(self, chunks: Iterable[bytes]):
+        """Incrementally parse the top-level JSON object delivered by `chunks`"""
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._exhausted = False
+        self.bytes_read = 0
+        self.is_object = None
+        self.value = None
+        self._members = None
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer; False once the body is exhausted"""
+        if self._exhausted:
+            return False
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.bytes_read += len(chunk)
+            self._buffer += self._decoder.decode(chunk)
+            return True
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._exhausted = True
+        return False
+
+    def _next_significant(self, pos: int) -> int:
+        """Index of the next non-whitespace character at or after `pos`"""
+        while True:
+            while pos < len(self._buffer) and self._buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(self._buffer) or not self._fill():
+                return pos
+
+    def _scan_string(self, pos: int) -> int:
+        """Index just past the string literal whose opening quote is at `pos`"""
+        pos += 1
+        while True:
+            match = _STRING_SPECIAL.search(self._buffer, pos)
+            if match is None:
+                pos = len(self._buffer)
+            elif match.group() == '"':
+                return match.end()
+            elif match.end() < len(self._buffer):
+                pos = match.end() + 1
+                continue
+            else:
+                pos = match.start()
+            if not self._fill():
+                raise ValueError("Unterminated string in JSON stream")
+
+    def _scan_until(self, pos: int, stops: str) -> int:
+        """Index of the first `stops` character at nesting depth zero"""
+        depth = 0
+        while True:
+            match = _STRUCTURAL.search(self._buffer, pos)
+            if match is None:
+                pos = len(self._buffer)
+                if not self._fill():
+                    raise ValueError("Truncated JSON stream")
+                continue
+            char = match.group()
+            if char == '"':
+                pos = self._scan_string(match.start())
+            elif depth == 0 and char in stops:
+                return match.start()
+            elif char in "{[":
+                depth += 1
+                pos = match.end()
+            elif char in "}]":
+                depth -= 1
+                pos = match.end()
+            else:
+                pos = match.end()
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        """Yield (key, value) for each top-level member; the stream is read only once"""
+        if self._members is None:
+            self._members = self._parse()
+        return self._members
+
+    def _parse(self) -> Iterator[Tuple[str, Any]]:
+        pos = self._next_significant(0)
+        if pos >= len(self._buffer):
+            self.is_object = False
+            return
+        if self._buffer[pos] != "{":
+            # Leaf value (or null): small by definition, parse it whole
+            while self._fill():
+                pass
+            self.is_object = False
+            self.value = json.loads(self._buffer)
+            self._buffer = ""
+            return
+
+        self.is_object = True
+        pos = self._next_significant(pos + 1)
+        if pos < len(self._buffer) and self._buffer[pos] == "}":
+            return
+        while True:
+            key, pos = self._decode(pos, ":")
+            pos = self._next_significant(pos)
+            value, pos = self._decode(self._next_significant(pos + 1), ",}")
+            pos = self._next_significant(pos)
+            closing = self._buffer[pos] == "}"
+            pos += 1
+            # Drop the consumed prefix once it outweighs the unread tail
+            if pos >= len(self._buffer) // 2:
+                self._buffer = self._buffer[pos:]
+                pos = 0
+            yield key, value
+            if closing:
+                return
+            pos = self._next_significant(pos)
+
+    def _decode(self, pos: int, stops: str) -> Tuple[Any, int]:
+        """Decode the JSON value starting at `pos`, reading more chunks if it is incomplete"""
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, pos)
+            # A number cut after its "." or "e" decodes as its prefix ("1303" of "1303.25"),
+            # so only a value followed by one of its stop characters is known to be complete
+            following = self._next_significant(end)
+            if following < len(self._buffer) and self._buffer[following] in stops:
+                return value, end
+        except json.JSONDecodeError:
+            pass
+        # Incomplete: find where it ends with the structural scanner, then decode once
+        self._scan_until(pos, stops)
+        return _DECODER.raw_decode(self._buffer, pos)
+
+    def close(self):
+        """Stop reading, closing the chunk source if it is a generator"""
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "ObjectStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def drain(self) -> int:
+        """Discard any unread members and return the total body size in bytes"""
+        for _ in self:
+            pass
+        return self.bytes_read
+
+
+def stream_members(response: Any, chunk_size: int = DEFAULT_CHUNK_BYTES) -> ObjectStream:
+    """ObjectStream over a response fetched with stream=True"""
+    return ObjectStream(response.iter_content(chunk_size))
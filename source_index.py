@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Source Index for Toiral Estimate Static-Analysis Suites
+Reads and indexes each file under src/ once per process
+
+backend_test_simplified.py, frontend_backend_test.py and
+phase5_comprehensive_test.py inspect the same TypeScript sources (App.tsx,
+workflowService.ts, FinalQuotationPage.tsx, ...) and used to open() and read()
+them again in every test that looked at them. A SourceIndex memory-maps each
+file on first use and builds its ts_symbols.SymbolTable (exports,
+declarations, interfaces with their fields, type aliases and imports); the
+full token stream is only produced if a caller asks for it, and match()
+results for a pattern list are kept with the file.
+
+Entries are keyed by (mtime, size); a file whose stat changed is re-hashed and,
+if its SHA-256 matches a body already parsed, reuses that parse instead of
+scanning again. shared_index() returns the one index all suites in a
+process query, so running several of them together reads every file once.
+track() records which files (and pattern lists) a test looked up, which is
+what check_cache.py keys its stored verdicts on.
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Iterable, Iterator, Optional, Tuple
+
+from pattern_matcher import PatternMatches, compile_patterns
+from ts_symbols import SymbolTable, Interface, TypeAlias
+
+DEFAULT_SOURCE_ROOT = "/app/src"
+SOURCE_EXTENSIONS = (".ts", ".tsx")
+
+# JSX text may hold a stray quote; keeping '…' and "…" on one line bounds the damage
+TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`)
+  | (?P<number>\d[\d_]*(?:\.\d+)?)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<punct>=>|\?\.|\?\?|\.\.\.|[{}()\[\];:,.<>=?!&|+\-*/%^~@\#])
+""", re.S | re.X)
+
+Token = Tuple[str, str, int]
+
+
+def tokenize(text: str) -> List[Token]:
+    """(kind, text, offset) tokens of a TypeScript / TSX source, comments dropped"""
+    return [(match.lastgroup, match.group(), match.start())
+            for match in TOKEN_PATTERN.finditer(text) if match.lastgroup != "comment"]
+
+
+class SourceFile:
+    def __init__(self, path: str, mtime_ns: int, size: int, sha256: str, text: str, symbols: SymbolTable):
+        """One indexed file: its text and symbol table at a given (mtime, size, hash)"""
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.sha256 = sha256
+        self.text = text
+        self.symbols = symbols
+        self._tokens: Optional[List[Token]] = None
+        self._matches: Dict[Tuple[str, ...], PatternMatches] = {}
+
+    @property
+    def tokens(self) -> List[Token]:
+        """Full token stream, produced on first use (symbol lookups do not need it)"""
+        if self._tokens is None:
+            self._tokens = tokenize(self.text)
+        return self._tokens
+
+    @property
+    def exports(self) -> Dict[str, str]:
+        return self.symbols.exports
+
+    @property
+    def declarations(self) -> Dict[str, str]:
+        return self.symbols.declarations
+
+    @property
+    def interfaces(self) -> Dict[str, Interface]:
+        return self.symbols.interfaces
+
+    @property
+    def type_aliases(self) -> Dict[str, TypeAlias]:
+        return self.symbols.type_aliases
+
+    @property
+    def imports(self) -> Dict[str, List[str]]:
+        return self.symbols.imports
+
+    def imported_names(self) -> List[str]:
+        """Every name the file imports, from any module"""
+        return self.symbols.imported_names()
+
+    def match(self, patterns: Iterable[str]) -> PatternMatches:
+        """Occurrences of `patterns` in the file, found once per pattern list and cached"""
+        key = tuple(patterns)
+        if key not in self._matches:
+            self._matches[key] = compile_patterns(key).search(self.text)
+        return self._matches[key]
+
+
+class SourceAccess:
+    def __init__(self):
+        """Files and pattern lists one caller looked up, as recorded by SourceIndex.track()"""
+        self.files: Dict[str, Optional[Tuple[int, int, str]]] = {}
+        self.patterns: List[Tuple[str, ...]] = []
+
+    def add_file(self, path: str, source: Optional["SourceFile"]):
+        """Record `path` at its indexed (mtime, size, hash), or as missing"""
+        self.files[path] = (source.mtime_ns, source.size, source.sha256) if source else None
+
+    def add_patterns(self, patterns: Tuple[str, ...]):
+        if patterns not in self.patterns:
+            self.patterns.append(patterns)
+
+
+def read_mapped(path: str) -> bytes:
+    """File contents through a read-only memory map (empty files cannot be mapped)"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:]
+
+
+class SourceIndex:
+    def __init__(self, root: str = DEFAULT_SOURCE_ROOT):
+        """Index of the sources under `root`, filled lazily as files are requested"""
+        self.root = os.path.abspath(root)
+        self._files: Dict[str, SourceFile] = {}
+        self._parsed: Dict[str, Tuple[str, SymbolTable]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "hash_hits": 0, "parsed": 0, "bytes_read": 0}
+        self._local = threading.local()
+
+    @contextmanager
+    def track(self) -> Iterator[SourceAccess]:
+        """Record every file and pattern list looked up on this thread while the block runs"""
+        previous = getattr(self._local, "access", None)
+        access = self._local.access = SourceAccess()
+        try:
+            yield access
+        finally:
+            self._local.access = previous
+
+    def _record(self, path: str, source: Optional[SourceFile]) -> Optional[SourceFile]:
+        access = getattr(self._local, "access", None)
+        if access is not None:
+            access.add_file(path, source)
+        return source
+
+    def get(self, path: str) -> Optional[SourceFile]:
+        """Indexed file at `path` (absolute or relative to the root), or None if it does not exist"""
+        path = path if os.path.isabs(path) else os.path.join(self.root, path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return self._record(path, None)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached and (cached.mtime_ns, cached.size) == (stat.st_mtime_ns, stat.st_size):
+                self.stats["hits"] += 1
+                return self._record(path, cached)
+            data = read_mapped(path)
+            self.stats["bytes_read"] += len(data)
+            sha256 = hashlib.sha256(data).hexdigest()
+            parsed = self._parsed.get(sha256)
+            if parsed:
+                self.stats["hash_hits"] += 1
+            else:
+                text = data.decode("utf-8", errors="replace")
+                parsed = self._parsed[sha256] = (text, SymbolTable(text))
+                self.stats["parsed"] += 1
+            if cached and cached.sha256 in self._parsed and cached.sha256 != sha256:
+                del self._parsed[cached.sha256]
+            source = self._files[path] = SourceFile(path, stat.st_mtime_ns, len(data), sha256, *parsed)
+        return self._record(path, source)
+
+    def exists(self, path: str) -> bool:
+        """Whether `path` exists (indexing it if so)"""
+        return self.get(path) is not None
+
+    def text(self, path: str) -> str:
+        """Contents of `path`; raises FileNotFoundError like open() would"""
+        source = self.get(path)
+        if source is None:
+            raise FileNotFoundError(path)
+        return source.text
+
+    def symbols(self, path: str) -> SymbolTable:
+        """Symbol table of `path`; raises FileNotFoundError like open() would"""
+        source = self.get(path)
+        if source is None:
+            raise FileNotFoundError(path)
+        return source.symbols
+
+    def match(self, path: str, patterns: Iterable[str]) -> PatternMatches:
+        """Occurrences of `patterns` in `path`; raises FileNotFoundError like open() would"""
+        source = self.get(path)
+        if source is None:
+            raise FileNotFoundError(path)
+        patterns = tuple(patterns)
+        access = getattr(self._local, "access", None)
+        if access is not None:
+            access.add_patterns(patterns)
+        return source.match(patterns)
+
+    def index_all(self) -> List[SourceFile]:
+        """Index every .ts / .tsx file under the root"""
+        sources = []
+        for directory, _, names in os.walk(self.root):
+            for name in sorted(names):
+                if name.endswith(SOURCE_EXTENSIONS):
+                    source = self.get(os.path.join(directory, name))
+                    if source:
+                        sources.append(source)
+        return sources
+
+    def find_export(self, name: str) -> List[str]:
+        """Indexed files exporting `name`"""
+        with self._lock:
+            files = list(self._files.values())
+        return [source.path for source in files if name in source.exports]
+
+
+_shared: Optional[SourceIndex] = None
+_shared_lock = threading.Lock()
+
+
+def shared_index(root: str = DEFAULT_SOURCE_ROOT) -> SourceIndex:
+    """The process-wide index the static suites share"""
+    global _shared
+    with _shared_lock:
+        if _shared is None or _shared.root != os.path.abspath(root):
+            _shared = SourceIndex(root)
+        return _shared
+
+
+def main():
+    """Index a source tree and report what was found"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate source index")
+    parser.add_argument("--root", default=DEFAULT_SOURCE_ROOT, help="Source tree to index")
+    parser.add_argument("--file", help="Print the symbols of one file (relative to the root)")
+    args = parser.parse_args()
+
+    index = SourceIndex(args.root)
+    started = time.perf_counter()
+    sources = index.index_all()
+    cold_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    index.index_all()
+    warm_ms = (time.perf_counter() - started) * 1000
+
+    print(f"📚 Indexed {len(sources)} file(s), {index.stats['bytes_read']:,} bytes")
+    print(f"⏱️  Cold {cold_ms:.1f} ms, warm {warm_ms:.1f} ms")
+    print(f"🔎 {sum(len(source.exports) for source in sources)} exports, "
+          f"{sum(len(source.interfaces) for source in sources)} interfaces, "
+          f"{sum(len(source.imports) for source in sources)} import statements")
+    if args.file:
+        source = index.get(args.file)
+        if source is None:
+            print(f"❌ {args.file} not found under {args.root}")
+            return
+        print(f"\n📄 {source.path} ({source.sha256[:12]})")
+        print(f"   exports: {', '.join(f'{name} ({kind})' for name, kind in source.exports.items())}")
+        for name, interface in source.interfaces.items():
+            print(f"   interface {name}: {', '.join(interface.fields)}")
+        for module, names in source.imports.items():
+            print(f"   import {', '.join(names) or '(side effects)'} from '{module}'")
+
+
+if __name__ == "__main__":
+    main()
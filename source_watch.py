@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Watch Mode for Toiral Estimate Static-Analysis Suites
+Re-runs only the source checks affected by each edit under src/
+
+Re-running frontend_backend_test.py or phase5_comprehensive_test.py by hand
+after every edit pays interpreter start-up, imports and a full scan each time.
+With --watch a suite stays up with its SourceIndex in memory, runs its
+@source_check tests once, and then waits for filesystem events under the
+source root:
+
+  inotify   Linux, through libc via ctypes; one watch per directory, new
+            directories are added as they appear, bursts of events from one
+            save are coalesced for DEBOUNCE_SECONDS
+  polling   anywhere else (or when inotify cannot be set up): the tree's
+            (mtime, size) snapshot is compared every --poll-interval seconds
+
+Each batch of changed paths is mapped through the check cache's recorded
+dependencies to the tests that read them; only those re-run, and the change
+in their verdicts is printed. Tests that reach the network are not watched.
+"""
+
+import argparse
+import contextlib
+import ctypes
+import ctypes.util
+import io
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, List, Any, Callable, Optional, Set, Tuple
+
+from check_cache import CheckCache
+
+DEBOUNCE_SECONDS = 0.05
+DEFAULT_POLL_INTERVAL = 0.5
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def add_watch_arguments(parser: argparse.ArgumentParser):
+    """Register the shared --watch and --poll-interval options on a suite's parser"""
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and re-check the sources affected by each edit")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between scans when inotify is unavailable")
+
+
+class InotifyWatcher:
+    def __init__(self, root: str):
+        """inotify watches on `root` and every directory below it"""
+        self.root = os.path.abspath(root)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: Dict[int, str] = {}
+        self._add_tree(self.root)
+
+    def _add_tree(self, top: str):
+        for directory, _, _ in os.walk(top):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._directories[wd] = directory
+
+    def _read(self) -> Set[str]:
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            directory = self._directories.get(wd)
+            if mask & IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.isdir(path):
+                    # Files may land in the new directory before its watch exists
+                    self._add_tree(path)
+                    changed.update(os.path.join(d, f) for d, _, files in os.walk(path) for f in files)
+                continue
+            changed.add(path)
+        return changed
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Paths changed by the next burst of events, or an empty set after `timeout` seconds"""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        changed = self._read()
+        while select.select([self.fd], [], [], DEBOUNCE_SECONDS)[0]:
+            changed |= self._read()
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    def __init__(self, root: str, interval: float = DEFAULT_POLL_INTERVAL):
+        """Periodic (mtime, size) snapshots of every file under `root`"""
+        self.root = os.path.abspath(root)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Paths added, removed or modified since the last call, or an empty set after `timeout` seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else deadline - time.monotonic()
+            time.sleep(max(0.0, min(self.interval, remaining)))
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """An inotify watcher on `root`, or a polling one where inotify is unavailable"""
+    try:
+        return InotifyWatcher(root)
+    except (OSError, AttributeError) as e:
+        print(f"⚠️  inotify unavailable ({e}); polling every {poll_interval}s")
+        return PollingWatcher(root, poll_interval)
+
+
+def source_checks(suite: Any) -> List[Callable]:
+    """The suite's @source_check tests, in declaration order"""
+    tests = [getattr(suite, name) for name in dir(type(suite))
+             if name.startswith("test_") and getattr(getattr(suite, name), "source_check", False)]
+    return sorted(tests, key=lambda test: test.__func__.__code__.co_firstlineno)
+
+
+def verdict_changes(before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> List[str]:
+    """Lines describing how a test's logged entries changed between two runs"""
+    emoji = {"PASS": "✅", "FAIL": "❌"}
+    old = {entry["test"]: entry for entry in before}
+    new = {entry["test"]: entry for entry in after}
+    lines = []
+    for name in list(old) + [name for name in new if name not in old]:
+        if name not in new:
+            lines.append(f"   ➖ {name} (no longer reported)")
+            continue
+        entry = new[name]
+        detail = entry.get("error") or entry.get("details") or ""
+        previous = old.get(name)
+        if previous is None:
+            lines.append(f"   ➕ {emoji.get(entry['status'], '⚠️')} {name}: {entry['status']}  {detail}".rstrip())
+        elif previous["status"] != entry["status"]:
+            lines.append(f"   {emoji.get(previous['status'], '⚠️')}→{emoji.get(entry['status'], '⚠️')} {name}: "
+                         f"{previous['status']} → {entry['status']}  {detail}".rstrip())
+        elif (previous.get("error") or previous.get("details") or "") != detail:
+            lines.append(f"   📝 {name}: {detail}")
+    return lines
+
+
+class WatchSession:
+    def __init__(self, suite: Any, cache: CheckCache):
+        """Re-run `suite`'s source checks through `cache` as the files they read change"""
+        self.suite = suite
+        self.cache = cache
+        self.tests = {test.__name__: cache.wrap(test, suite._replay) for test in source_checks(suite)}
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+
+    def run(self, names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Run tests `names` quietly and return the entries each one logged"""
+        results = {}
+        for name in names:
+            start = len(self.suite.test_results)
+            with contextlib.redirect_stdout(io.StringIO()):
+                try:
+                    self.tests[name]()
+                except Exception as e:
+                    self.suite.log_test(name, "FAIL", error=str(e))
+            results[name] = [{key: entry.get(key, "") for key in ("test", "status", "details", "error")}
+                             for entry in self.suite.test_results[start:]]
+            # A long session must not keep every entry it ever logged
+            del self.suite.test_results[start:]
+        return results
+
+    def start(self):
+        """Run every source check once and print the starting verdicts"""
+        started = time.perf_counter()
+        self.entries = self.run(list(self.tests))
+        entries = [entry for logged in self.entries.values() for entry in logged]
+        passed = sum(1 for entry in entries if entry["status"] == "PASS")
+        print(f"👀 {len(self.tests)} source check(s), {passed}/{len(entries)} entries passing "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+        for entry in entries:
+            if entry["status"] != "PASS":
+                print(f"   ❌ {entry['test']}: {entry.get('error') or entry.get('details')}")
+
+    def update(self, changed: Set[str]) -> List[str]:
+        """Re-run the checks that read any of `changed` and print how their verdicts moved"""
+        started = time.perf_counter()
+        affected = [name for name in self.cache.dependents(changed) if name in self.tests]
+        results = self.run(affected)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        shown = ", ".join(sorted(os.path.relpath(path, self.suite.sources.root) for path in changed)[:3])
+        more = f" (+{len(changed) - 3} more)" if len(changed) > 3 else ""
+        if not affected:
+            print(f"\n🔄 {shown}{more}: no source check reads it")
+            return affected
+        print(f"\n🔄 {shown}{more}: {len(affected)} check(s) re-run in {elapsed_ms:.1f} ms")
+        lines = []
+        for name in affected:
+            lines.extend(verdict_changes(self.entries.get(name, []), results[name]))
+            self.entries[name] = results[name]
+        print("\n".join(lines) if lines else "   No verdict changes")
+        return affected
+
+
+def watch_suite(suite: Any, suite_name: str, cache_path: str = ":memory:",
+                poll_interval: float = DEFAULT_POLL_INTERVAL) -> int:
+    """Run `suite`'s source checks, then re-run those affected by each change under its source root"""
+    cache = CheckCache(suite_name, suite.sources, cache_path)
+    suite.check_cache = cache
+    session = WatchSession(suite, cache)
+    watcher = open_watcher(suite.sources.root, poll_interval)
+    print(f"👀 Watching {suite.sources.root} with {type(watcher).__name__} (Ctrl+C to stop)")
+    try:
+        session.start()
+        while True:
+            changed = watcher.changes()
+            if changed:
+                session.update(changed)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+        cache.close()
+    return 0
+
+
+def main():
+    """Print the paths changed under a tree as they change"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate source watcher")
+    parser.add_argument("--root", default="/app/src", help="Tree to watch")
+    parser.add_argument("--poll", action="store_true", help="Poll instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between scans when polling")
+    args = parser.parse_args()
+
+    watcher = (PollingWatcher(args.root, args.poll_interval) if args.poll
+               else open_watcher(args.root, args.poll_interval))
+    print(f"👀 Watching {args.root} with {type(watcher).__name__} (Ctrl+C to stop)")
+    try:
+        while True:
+            for path in sorted(watcher.changes()):
+                print(f"🔄 {os.path.relpath(path, args.root)}")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Dependency-Aware Test Scheduler for Toiral Estimate Test Suites
+Runs suite tests concurrently as soon as the test_data they need is available
+
+Each test declares which self.test_data keys it produces and consumes with the
+@depends decorator. The scheduler starts every test on a thread pool once the
+producers of its consumed keys have finished (whether or not they set them),
+and paces test starts with a shared token-bucket RateLimiter instead of fixed
+time.sleep() pauses.
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+from latency_histogram import test_context
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RATE = 5.0
+
+
+def depends(produces: Iterable[str] = (), consumes: Iterable[str] = (), run_last: bool = False):
+    """Declare the test_data keys a test produces and consumes"""
+    def decorator(func: Callable) -> Callable:
+        func.produces = tuple(produces)
+        func.consumes = tuple(consumes)
+        func.run_last = run_last
+        return func
+    return decorator
+
+
+def add_scheduler_arguments(parser: argparse.ArgumentParser):
+    """Register the shared --max-workers and --rate options on a suite's parser"""
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Maximum number of tests running at the same time")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="Maximum test starts per second (0 disables pacing)")
+
+
+class RateLimiter:
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = 1):
+        """Token bucket allowing `rate` acquisitions per second with bursts up to `burst`"""
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+class SuiteScheduler:
+    def __init__(self, test_data: Dict[str, Any], max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """Schedule tests against the suite's shared test_data dictionary"""
+        self.test_data = test_data
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = rate_limiter or RateLimiter(DEFAULT_RATE, burst=self.max_workers)
+
+    def _is_ready(self, func: Callable, waiting: List[Callable], running: Iterable[Callable]) -> bool:
+        """A test is ready once nothing still pending can produce what it consumes"""
+        others = [f for f in waiting if f is not func] + list(running)
+        if getattr(func, "run_last", False):
+            return not others
+        for key in getattr(func, "consumes", ()):
+            # A producer may publish its key before it finishes checking the data behind it
+            if any(key in getattr(other, "produces", ()) for other in others):
+                return False
+        return True
+
+    def _run_one(self, func: Callable, on_error: Callable[[Callable, Exception], None]) -> bool:
+        self.rate_limiter.acquire()
+        try:
+            with test_context(func.__name__):
+                return bool(func())
+        except Exception as e:
+            on_error(func, e)
+            return False
+
+    def run(self, test_functions: List[Callable],
+            on_error: Callable[[Callable, Exception], None]) -> List[bool]:
+        """Run all tests, returning their results in the order they were given"""
+        waiting = list(test_functions)
+        running = {}
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="suite-test") as pool:
+            while waiting or running:
+                ready = [f for f in waiting if self._is_ready(f, waiting, running.values())]
+                if not ready and not running:
+                    # Dependency cycle: fall back to declaration order
+                    ready = waiting[:1]
+                for func in ready:
+                    waiting.remove(func)
+                    running[pool.submit(self._run_one, func, on_error)] = func
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[id(running.pop(future))] = future.result()
+
+        return [results[id(func)] for func in test_functions]
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Synthetic Workflow Dataset Generator for Toiral Estimate
+Streams production-scale Phase 5 workflow data in constant memory
+
+Records follow src/types/workflow.ts and the Phase 5 suite fixtures. Each
+client gets a ProjectSetup and then progresses a random distance through the
+workflow:
+
+  client → project setup → quotation → approval → running project
+         (+ 5 milestones and 3 payment stages, as workflowService creates them)
+
+Every reference (clientId, clientCode, projectId, quotationId, the milestone
+and payment-stage projectId) points at a record generated for the same client,
+and quotation totals come from the fixed-point pricing core. Client i draws
+from its own generator seeded with (seed, i), so a run is reproducible and any
+range of clients can be generated on its own. Records are produced lazily as
+(path, value) pairs and written either as NDJSON lines or through size-bounded
+multi-path PATCHes, so memory use does not grow with --clients.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterator, Tuple
+
+from pricing_engine import quotation_totals
+from rtdb_client import BaseRTDBClient, RTDBClient, DEFAULT_MAX_BATCH_BYTES
+from rtdb_emulator import PUSH_CHARS, add_emulator_arguments, database_url
+
+DEFAULT_CLIENTS = 1000
+DEFAULT_COUPONS = 50
+DEFAULT_ANCHOR = "2025-01-01T00:00:00"
+DEFAULT_SPAN_DAYS = 365
+WORKFLOW_ROOT = "workflow"
+
+# How far each client has progressed: (stage, weight)
+STAGES = (("project_setup", 20), ("pending_approval", 25), ("rejected", 5),
+          ("project_running", 35), ("project_completed", 15))
+FIRST_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn")
+LAST_NAMES = ("Smith", "Rahman", "Garcia", "Chen", "Okafor", "Novak", "Silva", "Khan", "Müller", "Brown")
+PACKAGES = ("Web & App Design", "Premium Package", "E-commerce Package", "Landing Page", "Brand Identity")
+FEATURES = ("Responsive Web Design", "Mobile Optimization", "SEO Integration", "Content Management System",
+            "Analytics Setup", "Custom responsive design", "Product catalog management",
+            "Shopping cart functionality", "Secure payment processing", "User account management",
+            "Admin dashboard", "Mobile-first approach")
+ADD_ONS = (
+    {"id": "addon1", "name": "Priority Support", "description": "24/7 customer support with 4-hour response time",
+     "price": 99, "extraDeliveryTime": 0, "category": "Support"},
+    {"id": "addon2", "name": "SEO Package", "description": "Advanced SEO optimization for better rankings",
+     "price": 149, "extraDeliveryTime": 3, "category": "Marketing"},
+    {"id": "addon-advanced-seo", "name": "Advanced SEO Package",
+     "description": "Comprehensive SEO optimization with keyword research and analytics",
+     "price": 299, "extraDeliveryTime": 5, "category": "Marketing"},
+    {"id": "addon-payment-gateway", "name": "Multiple Payment Gateways",
+     "description": "Integration with PayPal, Stripe, and other payment providers",
+     "price": 199, "extraDeliveryTime": 3, "category": "Development"},
+    {"id": "addon-inventory-management", "name": "Advanced Inventory System",
+     "description": "Real-time inventory tracking and low stock alerts",
+     "price": 399, "extraDeliveryTime": 7, "category": "Development"}
+)
+# workflowService.createDefaultMilestones / createDefaultPaymentStages
+MILESTONES = (("Project Kickoff", 10), ("Design Phase", 30), ("Development Phase", 60),
+              ("Testing Phase", 85), ("Project Delivery", 100))
+PAYMENT_STAGES = (("First Payment (60%)", 60), ("Second Payment (20%)", 20), ("Final Payment (20%)", 20))
+WORKFLOW_STEPS = ("clientCreated", "projectSetup", "invitationSent", "clientApproval",
+                  "projectRunning", "projectCompleted")
+
+
+def push_id(moment: datetime, rng: random.Random) -> str:
+    """Firebase-style push ID for a record created at `moment`"""
+    millis = int(moment.timestamp() * 1000)
+    stamp = ""
+    for _ in range(8):
+        stamp = PUSH_CHARS[millis % 64] + stamp
+        millis //= 64
+    return stamp + "".join(rng.choices(PUSH_CHARS, k=12))
+
+
+class WorkflowGenerator:
+    def __init__(self, seed: int = 0, coupons: int = DEFAULT_COUPONS, anchor: str = DEFAULT_ANCHOR,
+                 span_days: int = DEFAULT_SPAN_DAYS):
+        """Generator of clients created over `span_days` days from `anchor`"""
+        self.seed = seed
+        self.anchor = datetime.fromisoformat(anchor)
+        self.span_seconds = span_days * 86400
+        self.coupons = [self._coupon(index) for index in range(coupons)]
+        self._stages = [stage for stage, _ in STAGES]
+        self._weights = [weight for _, weight in STAGES]
+
+    def _coupon(self, index: int) -> Dict[str, Any]:
+        rng = random.Random(f"{self.seed}:coupon:{index}")
+        created = self.anchor + timedelta(seconds=rng.uniform(0, self.span_seconds))
+        discount_type = rng.choice(("percentage", "fixed"))
+        discount = rng.choice((5, 10, 15, 20, 25)) if discount_type == "percentage" else rng.choice((25, 50, 100))
+        return {
+            "id": push_id(created, rng),
+            "code": f"{'SAVE' if discount_type == 'percentage' else 'FLAT'}{discount}{index:03d}",
+            "discount": discount,
+            "discountType": discount_type,
+            "description": f"{discount}{'%' if discount_type == 'percentage' else ' off'} synthetic coupon",
+            "validUntil": (created + timedelta(days=rng.choice((30, 60, 90, 120)))).isoformat(),
+            "minOrderAmount": rng.choice((100, 150, 200, 300, 500)),
+            "usageLimit": rng.choice((20, 25, 50, 75, 100)),
+            "usedCount": rng.randint(0, 20),
+            "isActive": rng.random() < 0.9
+        }
+
+    def coupon_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(path, coupon) pairs for the shared coupon catalog"""
+        for coupon in self.coupons:
+            yield f"{WORKFLOW_ROOT}/coupons/{coupon['id']}", coupon
+
+    def client_records(self, index: int) -> List[Tuple[str, Dict[str, Any]]]:
+        """Every record of client `index`, in the order the app would write them"""
+        rng = random.Random(f"{self.seed}:client:{index}")
+        created = self.anchor + timedelta(seconds=rng.uniform(0, self.span_seconds))
+        stage = rng.choices(self._stages, self._weights)[0]
+        records: List[Tuple[str, Dict[str, Any]]] = []
+
+        client_id = push_id(created, rng)
+        client_code = f"CLI{rng.randint(0, 999):03d}{''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=2))}"
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        package = rng.choice(PACKAGES)
+        records.append((f"{WORKFLOW_ROOT}/clients/{client_id}", {
+            "id": client_id,
+            "clientCode": client_code,
+            "name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}{index}@example.com",
+            "phone": f"+1{rng.randint(2000000000, 9999999999)}",
+            "selectedPackage": package,
+            "additionalNotes": "Synthetic load-test client",
+            "projectDetails": f"{package} project",
+            "accessCode": "".join(rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789", k=8)),
+            "createdAt": created.isoformat(),
+            "createdBy": "admin_synthetic",
+            "status": "active" if stage != "rejected" else "inactive"
+        }))
+
+        setup_at = created + timedelta(hours=rng.uniform(1, 72))
+        project_id = push_id(setup_at, rng)
+        base_price = rng.randrange(500, 10_001, 50)
+        base_deadline = rng.randint(7, 60)
+        add_ons = [dict(addon, isRequired=False) for addon in rng.sample(ADD_ONS, rng.randint(1, len(ADD_ONS)))]
+        available = rng.sample(self.coupons, min(2, len(self.coupons)))
+        project_name = f"{package} for {last}"
+        description = f"{package} with {len(add_ons)} optional add-on(s)"
+        features = rng.sample(FEATURES, rng.randint(3, 6))
+        setup_status = {"project_setup": "sent_to_client", "rejected": "rejected"}.get(stage, "approved")
+        records.append((f"{WORKFLOW_ROOT}/project-setups/{project_id}", {
+            "id": project_id,
+            "clientId": client_id,
+            "clientCode": client_code,
+            "projectName": project_name,
+            "features": features,
+            "description": description,
+            "basePrice": base_price,
+            "baseDeadline": base_deadline,
+            "availableCoupons": [{key: coupon[key] for key in
+                                  ("id", "code", "discount", "discountType", "description", "isActive")}
+                                 for coupon in available],
+            "addOns": add_ons,
+            "status": setup_status,
+            "createdAt": setup_at.isoformat(),
+            "updatedAt": setup_at.isoformat()
+        }))
+
+        step_times = {"clientCreated": created, "projectSetup": setup_at,
+                      "invitationSent": setup_at + timedelta(minutes=rng.uniform(5, 120))}
+        if stage != "project_setup":
+            quoted_at = step_times["invitationSent"] + timedelta(hours=rng.uniform(1, 120))
+            quotation_id = push_id(quoted_at, rng)
+            selected = [{key: value for key, value in addon.items() if key != "isRequired"}
+                        for addon in add_ons if rng.random() < 0.5]
+            coupon = rng.choice(available) if available and rng.random() < 0.4 else None
+            confirmed = stage in ("project_running", "project_completed")
+            quotation = {
+                "id": quotation_id,
+                "clientId": client_id,
+                "clientCode": client_code,
+                "projectId": project_id,
+                "selectedAddOns": selected,
+                "basePrice": base_price,
+                "baseDeliveryTime": base_deadline,
+                "clientConfirmed": confirmed,
+                "status": "confirmed" if confirmed else stage,
+                "createdAt": quoted_at.isoformat(),
+                "updatedAt": quoted_at.isoformat()
+            }
+            if coupon:
+                quotation["appliedCoupon"] = {key: coupon[key] for key in
+                                              ("id", "code", "discount", "discountType", "description")}
+            quotation.update(quotation_totals(quotation))
+            if confirmed:
+                confirmed_at = quoted_at + timedelta(hours=rng.uniform(1, 48))
+                quotation["confirmedAt"] = quotation["updatedAt"] = confirmed_at.isoformat()
+                step_times["clientApproval"] = step_times["projectRunning"] = confirmed_at
+            records.append((f"{WORKFLOW_ROOT}/quotations/{quotation_id}", quotation))
+
+            if confirmed:
+                records.extend(self._running_project(rng, stage, client_id, client_code, quotation,
+                                                     project_name, description, features, step_times))
+
+        current_step = {"project_setup": "invitation_sent", "pending_approval": "client_approval",
+                        "rejected": "client_approval"}.get(stage, stage)
+        records.append((f"{WORKFLOW_ROOT}/status/{client_id}", {
+            "clientId": client_id,
+            "currentStep": current_step,
+            "steps": {step: ({"completed": True, "completedAt": step_times[step].isoformat()}
+                             if step in step_times else {"completed": False})
+                      for step in WORKFLOW_STEPS},
+            "updatedAt": max(step_times.values()).isoformat()
+        }))
+        return records
+
+    def _running_project(self, rng: random.Random, stage: str, client_id: str, client_code: str,
+                         quotation: Dict[str, Any], project_name: str, description: str,
+                         features: List[str], step_times: Dict[str, datetime]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Running project plus its default milestones and payment stages"""
+        start = step_times["projectRunning"]
+        total_days = quotation["finalDeliveryTime"]
+        end = start + timedelta(days=total_days)
+        completed = stage == "project_completed"
+        progress = 100 if completed else rng.randint(0, 95)
+        running_id = push_id(start, rng)
+        if completed:
+            step_times["projectCompleted"] = end + timedelta(days=rng.randint(-3, 10))
+
+        records: List[Tuple[str, Dict[str, Any]]] = []
+        for order, (title, percentage) in enumerate(MILESTONES, 1):
+            target = start + timedelta(days=total_days * percentage // 100)
+            done = progress >= percentage
+            milestone = {
+                "id": push_id(start, rng),
+                "projectId": running_id,
+                "title": title,
+                "description": f"{title} completion",
+                "targetDate": target.isoformat(),
+                "status": "completed" if done else ("in_progress" if progress >= percentage - 25 else "pending"),
+                "progress": 100 if done else max(0, min(99, (progress - (percentage - 25)) * 4)),
+                "order": order
+            }
+            if done:
+                milestone["completedDate"] = (target + timedelta(days=rng.randint(-2, 4))).isoformat()
+            records.append((f"{WORKFLOW_ROOT}/milestones/{milestone['id']}", milestone))
+
+        paid_stages = len(PAYMENT_STAGES) if completed else rng.randint(0, len(PAYMENT_STAGES) - 1)
+        for order, (title, percentage) in enumerate(PAYMENT_STAGES, 1):
+            due = start + timedelta(days=order * 15)
+            payment = {
+                "id": push_id(start, rng),
+                "projectId": running_id,
+                "title": title,
+                "amount": round(quotation["finalPrice"] * percentage / 100),
+                "percentage": percentage,
+                "dueDate": due.isoformat(),
+                "status": "paid" if order <= paid_stages else "pending",
+                "order": order
+            }
+            if order <= paid_stages:
+                payment["paidDate"] = (due - timedelta(days=rng.randint(0, 10))).isoformat()
+                payment["paymentMethod"] = rng.choice(("bank_transfer", "card", "paypal"))
+                payment["transactionId"] = "TXN" + "".join(rng.choices("0123456789", k=10))
+            records.append((f"{WORKFLOW_ROOT}/payment-stages/{payment['id']}", payment))
+
+        payment_status = ("fully_confirmed" if paid_stages == len(PAYMENT_STAGES)
+                          else "partially_confirmed" if paid_stages else "pending")
+        project = {
+            "id": running_id,
+            "clientId": client_id,
+            "clientCode": client_code,
+            "quotationId": quotation["id"],
+            "projectName": project_name,
+            "description": description,
+            "startDate": start.isoformat(),
+            "estimatedEndDate": end.isoformat(),
+            "overallProgress": progress,
+            "milestones": [],
+            "paymentStatus": payment_status,
+            "paymentBreakdown": [],
+            "features": features,
+            "selectedAddOns": quotation["selectedAddOns"],
+            "finalPrice": quotation["finalPrice"],
+            "finalDeliveryTime": total_days,
+            "status": "completed" if completed else "active",
+            "createdAt": start.isoformat(),
+            "updatedAt": start.isoformat()
+        }
+        if completed:
+            project["actualEndDate"] = step_times["projectCompleted"].isoformat()
+        return [(f"{WORKFLOW_ROOT}/running-projects/{running_id}", project)] + records
+
+    def records(self, clients: int, offset: int = 0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Lazily yield (path, record) for the coupon catalog and clients offset .. offset+clients-1"""
+        if offset == 0:
+            yield from self.coupon_records()
+        for index in range(offset, offset + clients):
+            yield from self.client_records(index)
+
+
+def write_ndjson(records: Iterator[Tuple[str, Dict[str, Any]]], output_file: str) -> Dict[str, int]:
+    """Write one {"path", "value"} line per record (gzip-compressed for .gz files)"""
+    opener = gzip.open if output_file.endswith(".gz") else open
+    written = 0
+    with opener(output_file, "wt", encoding="utf-8") as f:
+        for path, value in records:
+            f.write(json.dumps({"path": path, "value": value}, separators=(",", ":")) + "\n")
+            written += 1
+    return {"records": written, "requests": 0}
+
+
+def write_database(records: Iterator[Tuple[str, Dict[str, Any]]], db: BaseRTDBClient,
+                   max_bytes: int = DEFAULT_MAX_BATCH_BYTES) -> Dict[str, int]:
+    """Write records as multi-path PATCHes under workflow/ of at most `max_bytes` each"""
+    batch = db.batch(WORKFLOW_ROOT, max_bytes=max_bytes)
+    written, requests_made, pending_bytes = 0, 0, 2
+
+    def flush() -> int:
+        responses = batch.commit()
+        failed = [response for response in responses if response.status_code != 200]
+        if failed:
+            raise RuntimeError(f"HTTP {failed[0].status_code} writing a synthetic data batch")
+        return len(responses)
+
+    for path, value in records:
+        entry_bytes = len(json.dumps({path: value}, separators=(",", ":")).encode("utf-8"))
+        if len(batch) and pending_bytes + entry_bytes > max_bytes:
+            requests_made += flush()
+            pending_bytes = 2
+        batch.put(path, value)
+        pending_bytes += entry_bytes
+        written += 1
+    if len(batch):
+        requests_made += flush()
+    return {"records": written, "requests": requests_made}
+
+
+def main():
+    """Main function to generate a synthetic workflow dataset"""
+    print("🏭 TOIRAL ESTIMATE - SYNTHETIC WORKFLOW DATA")
+    print("=" * 80)
+
+    parser = argparse.ArgumentParser(description="Generate Phase 5 workflow data at production scale")
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS, help="Clients to generate")
+    parser.add_argument("--offset", type=int, default=0,
+                        help="Index of the first client (generate a large dataset in parts)")
+    parser.add_argument("--coupons", type=int, default=DEFAULT_COUPONS, help="Coupons in the shared catalog")
+    parser.add_argument("--seed", type=int, default=0, help="Seed; the same seed yields the same dataset")
+    parser.add_argument("--anchor", default=DEFAULT_ANCHOR, help="Earliest client creation time (ISO 8601)")
+    parser.add_argument("--span-days", type=int, default=DEFAULT_SPAN_DAYS,
+                        help="Days over which client creation times are spread")
+    parser.add_argument("--output", metavar="FILE",
+                        help="Write NDJSON (.ndjson or .ndjson.gz) instead of loading a database")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BATCH_BYTES,
+                        help="Maximum size of each multi-path PATCH when loading a database")
+    add_emulator_arguments(parser)
+    args = parser.parse_args()
+
+    generator = WorkflowGenerator(args.seed, args.coupons, args.anchor, args.span_days)
+    records = generator.records(args.clients, args.offset)
+    start = time.perf_counter()
+    db, emulator = None, None
+    if args.output:
+        print(f"📝 Writing {args.clients:,} clients (seed {args.seed}) to {args.output}")
+        result = write_ndjson(records, args.output)
+    elif args.base_url or args.emulator:
+        base_url, emulator = database_url(args, None)
+        db = RTDBClient(base_url)
+        print(f"📤 Loading {args.clients:,} clients (seed {args.seed}) into {base_url}")
+        result = write_database(records, db, args.max_bytes)
+    else:
+        # Never default to the live project database
+        parser.error("choose a target: --output FILE, --base-url URL or --emulator")
+    elapsed = time.perf_counter() - start
+
+    requests_note = f", {result['requests']:,} PATCH requests" if result["requests"] else ""
+    print(f"✅ {result['records']:,} records in {elapsed:.1f}s "
+          f"({result['records'] / elapsed:,.0f} records/s{requests_note})")
+    if db:
+        db.close()
+    if emulator:
+        emulator.stop()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Streaming JSON Reader
+Feeds ObjectStream bodies split at every byte offset
+
+A chunk boundary can land anywhere in a response, including inside a number
+("1303." | "25"), where the prefix already decodes as a valid but wrong value.
+"""
+
+import json
+import unittest
+
+from rtdb_stream import ObjectStream
+
+BODY = {"price": 1303.25, "views": 2.5e10, "ratio": -1.5E-3, "count": 42,
+        "nested": {"prices": [1.5, 2e3]}, "name": "Toiral", "flag": True, "none": None}
+
+
+def split_at(body: bytes, offset: int):
+    return [body[:offset], body[offset:]]
+
+
+class ObjectStreamTest(unittest.TestCase):
+    def test_numbers_split_at_every_offset(self):
+        """A float and an exponent decode whole wherever the chunk boundary falls"""
+        for value in (1303.25, 2.5e10, -1.5E-3):
+            body = json.dumps({"amount": value}).encode()
+            for offset in range(len(body) + 1):
+                with self.subTest(value=value, offset=offset):
+                    self.assertEqual(dict(ObjectStream(split_at(body, offset))), {"amount": value})
+
+    def test_trailing_number_split_at_every_offset(self):
+        """The last member, closed by "}" instead of ",", is not cut short either"""
+        body = b'{"a": 1, "total": 1303.25}'
+        for offset in range(len(body) + 1):
+            with self.subTest(offset=offset):
+                self.assertEqual(dict(ObjectStream(split_at(body, offset))), {"a": 1, "total": 1303.25})
+
+    def test_one_byte_chunks(self):
+        body = json.dumps(BODY).encode()
+        stream = ObjectStream(body[i:i + 1] for i in range(len(body)))
+        self.assertEqual(dict(stream), BODY)
+        self.assertEqual(stream.bytes_read, len(body))
+
+    def test_truncated_body_raises(self):
+        with self.assertRaises(ValueError):
+            dict(ObjectStream([b'{"a": 1303.']))
+
+
+if __name__ == "__main__":
+    unittest.main()
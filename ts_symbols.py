@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+TypeScript Declaration Scanner for Toiral Estimate Static-Analysis Suites
+Builds a per-file symbol table without tokenizing the whole file
+
+The static suites used to look for `export const createClient` or
+`interface Client` by substring search, and checked `clientCode:` anywhere in
+workflow.ts, so a field of one interface satisfied a check on another. The
+scanner finds declaration keywords with one literal search each, drops those
+inside comments and string literals, and parses each declaration in place:
+
+  exports        exported name → kind (const, function, interface, type, ...)
+  declarations   every const / let / var / function / class / interface / type / enum
+  interfaces     name → members (field → type text), optional fields, extends list
+  type_aliases   name → definition, object-literal fields, string-literal variants
+  imports        module specifier → local names bound
+
+Function bodies and JSX between declarations are never tokenized.
+`python ts_symbols.py --root src` benchmarks the scanner against full
+tokenization over the source tree.
+"""
+
+import argparse
+import os
+import re
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+DECLARATION_KINDS = ("const", "let", "var", "function", "class", "interface", "type", "enum")
+VALUE_KINDS = ("const", "let", "var", "function", "class")
+MEMBER_MODIFIERS = ("readonly", "public", "private", "protected", "static")
+
+_STRING = r"'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"|`(?:\\.|[^`\\])*`"
+_COMMENT = r"//[^\n]*|/\*.*?\*/"
+_SKIP = re.compile(rf"{_COMMENT}|{_STRING}", re.S)
+# One literal search per keyword is several times faster than an alternation of all of them
+_KEYWORDS = [(keyword, re.compile(rf"{keyword}(?![\w$])")) for keyword in ("export", "import") + DECLARATION_KINDS]
+_NESTING = re.compile(rf"(?P<skip>{_COMMENT}|{_STRING})|(?P<arrow>=>)|(?P<open>[{{(\[<])|(?P<close>[}})\]>])"
+                      r"|(?P<separator>[;,\n])", re.S)
+_NAME = re.compile(r"\s*(\*\s*)?([A-Za-z_$][\w$]*)")
+_MEMBER = re.compile(r"\s*(?:(?:readonly|public|private|protected|static)\s+)*"
+                     r"([A-Za-z_$][\w$]*|'[^'\n]*'|\"[^\"\n]*\")\s*(\?)?\s*([:(<])")
+_EXTENDS = re.compile(r"\s*(?:<[^{]*?>)?\s*(?:extends\s+([^{]*))?\{", re.S)
+_IMPORT = re.compile(rf"\s*(?:type\s+)?(?:([^;'\"`]*?)\s*from\s*)?({_STRING})", re.S)
+_STRING_VARIANT = re.compile(rf"^\s*(?:{_STRING})\s*$", re.S)
+
+
+def _matching(text: str, start: int, opener: str = "{") -> int:
+    """Index just past the bracket closing the one at `start`"""
+    depth = 0
+    for match in _NESTING.finditer(text, start):
+        if match.lastgroup in ("open", "close"):
+            bracket = match.group()
+            if bracket in "<>" and opener != "<":
+                continue
+            depth += 1 if match.lastgroup == "open" else -1
+            if depth == 0:
+                return match.end()
+    return len(text)
+
+
+def strip_comments(text: str) -> str:
+    """`text` with each comment replaced by a space; comment markers inside string literals are kept"""
+    return _SKIP.sub(lambda match: " " if match.group().startswith("/") else match.group(), text)
+
+
+def split_commas(text: str) -> List[str]:
+    """Comma-separated parts of `text`, ignoring commas nested in brackets (`Omit<A, 'id'>`)"""
+    parts, depth, start = [], 0, 0
+    for match in _NESTING.finditer(text):
+        group = match.lastgroup
+        if group == "open":
+            depth += 1
+        elif group == "close":
+            depth -= 1
+        elif group == "separator" and depth == 0 and match.group() == ",":
+            parts.append(text[start:match.start()])
+            start = match.end()
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def split_members(body: str) -> List[str]:
+    """Top-level members of an interface / object-type body (without its braces)"""
+    members, depth, start = [], 0, 0
+    for match in _NESTING.finditer(body):
+        group = match.lastgroup
+        if group == "open":
+            depth += 1
+        elif group == "close":
+            depth -= 1
+        elif group == "separator" and depth == 0:
+            # A newline ends a member only when another member starts on the next line
+            if match.group() == "\n" and not _MEMBER.match(body, match.end()):
+                continue
+            members.append(body[start:match.start()])
+            start = match.end()
+    members.append(body[start:])
+    return [member.strip() for member in members if member.strip()]
+
+
+def parse_members(body: str) -> Tuple[Dict[str, str], List[str]]:
+    """(member → type text, optional member names) of an object-type body"""
+    fields: Dict[str, str] = {}
+    optional: List[str] = []
+    # A leading `/** doc */` would hide the member name, a trailing `// note` would end up in its type
+    for member in split_members(strip_comments(body)):
+        match = _MEMBER.match(member)
+        if not match:
+            continue
+        name = match.group(1).strip("'\"")
+        fields[name] = (member[match.end():].strip() if match.group(3) == ":"
+                        else member[match.start(3):].strip())
+        if match.group(2):
+            optional.append(name)
+    return fields, optional
+
+
+class Interface:
+    def __init__(self, name: str, fields: Dict[str, str], optional: List[str], extends: List[str]):
+        """An interface declaration: members with their type text, optional ones and parents"""
+        self.name = name
+        self.fields = fields
+        self.optional = optional
+        self.extends = extends
+
+
+class TypeAlias:
+    def __init__(self, name: str, definition: str):
+        """A `type Name = ...` declaration with its object fields or string-literal variants"""
+        self.name = name
+        self.definition = definition
+        self.fields: Dict[str, str] = {}
+        self.optional: List[str] = []
+        self.variants: List[str] = []
+        if definition.startswith("{") and definition.endswith("}"):
+            self.fields, self.optional = parse_members(definition[1:-1])
+        else:
+            parts = [part.strip() for part in definition.split("|") if part.strip()]
+            if parts and all(_STRING_VARIANT.match(part) for part in parts):
+                self.variants = [part[1:-1] for part in parts]
+
+
+class SymbolTable:
+    def __init__(self, text: str):
+        """Scan `text` (a .ts / .tsx source) for its declarations"""
+        self.exports: Dict[str, str] = {}
+        self.declarations: Dict[str, str] = {}
+        self.interfaces: Dict[str, Interface] = {}
+        self.type_aliases: Dict[str, TypeAlias] = {}
+        self.imports: Dict[str, List[str]] = {}
+        self._scan(text)
+
+    def exports_value(self, name: str) -> bool:
+        """Whether `name` is exported as a runtime value (const, function, class, ...)"""
+        return self.exports.get(name) in VALUE_KINDS
+
+    def declares_type(self, name: str) -> bool:
+        """Whether the file declares `name` as an interface or type alias"""
+        return name in self.interfaces or name in self.type_aliases
+
+    def imported_names(self) -> List[str]:
+        """Every name the file imports, from any module"""
+        return [name for names in self.imports.values() for name in names]
+
+    def fields_of(self, name: str) -> Dict[str, str]:
+        """Members of interface or object type alias `name` ({} if unknown)"""
+        if name in self.interfaces:
+            return self.interfaces[name].fields
+        if name in self.type_aliases:
+            return self.type_aliases[name].fields
+        return {}
+
+    def _scan(self, text: str):
+        skipped = [(match.start(), match.end()) for match in _SKIP.finditer(text)]
+        skip_starts = [start for start, _ in skipped]
+        candidates = []
+        for keyword, pattern in _KEYWORDS:
+            for match in pattern.finditer(text):
+                start = match.start()
+                if start and (text[start - 1].isalnum() or text[start - 1] in "_$."):
+                    continue
+                # Keywords inside comments and string literals are text, not code
+                span = bisect_right(skip_starts, start) - 1
+                if span >= 0 and skipped[span][1] > start:
+                    continue
+                candidates.append((start, keyword, match.end()))
+        candidates.sort()
+        resume = 0
+        for start, keyword, end in candidates:
+            if start < resume:
+                continue
+            if keyword == "import":
+                resume = self._scan_import(text, end)
+            elif keyword == "export":
+                resume = self._scan_export(text, end)
+            else:
+                resume = self._declare(text, keyword, end)[1]
+
+    def _declare(self, text: str, keyword: str, position: int) -> Tuple[Optional[str], int]:
+        """Record the declaration whose keyword ends at `position`; (name, resume position)"""
+        match = _NAME.match(text, position)
+        if not match or (match.group(1) and keyword != "function"):
+            return None, position
+        name, after = match.group(2), match.end()
+        follower = text[after:after + 40].lstrip()[:7]
+        if keyword == "type" and not follower.startswith(("=", "<")):
+            return None, position
+        if keyword == "interface" and not follower.startswith(("{", "<", "extends")):
+            return None, position
+        self.declarations.setdefault(name, keyword)
+        if keyword == "interface":
+            return name, self._scan_interface(text, name, after)
+        if keyword == "type":
+            return name, self._scan_type_alias(text, name, after)
+        return name, after
+
+    def _scan_interface(self, text: str, name: str, position: int) -> int:
+        header = _EXTENDS.match(text, position)
+        if not header:
+            return position
+        body_start = header.end() - 1
+        body_end = _matching(text, body_start)
+        fields, optional = parse_members(text[body_start + 1:body_end - 1])
+        extends = split_commas(strip_comments(header.group(1) or ""))
+        self.interfaces[name] = Interface(name, fields, optional, extends)
+        return body_end
+
+    def _scan_type_alias(self, text: str, name: str, position: int) -> int:
+        equals = text.find("=", position)
+        if equals < 0:
+            return position
+        depth, end = 0, len(text)
+        for match in _NESTING.finditer(text, equals + 1):
+            group = match.lastgroup
+            if group == "open":
+                depth += 1
+            elif group == "close":
+                depth -= 1
+            elif group == "separator" and depth == 0 and match.group() != ",":
+                # A newline ends the alias unless the next line continues a union or intersection
+                rest = text[match.end():match.end() + 200].lstrip()
+                if match.group() == ";" or not (rest.startswith(("|", "&"))
+                                                or text[equals + 1:match.start()].rstrip().endswith(("=", "|", "&"))):
+                    end = match.start()
+                    break
+        definition = text[equals + 1:end].strip().lstrip("|").strip()
+        self.type_aliases[name] = TypeAlias(name, definition)
+        return end
+
+    def _scan_import(self, text: str, position: int) -> int:
+        if text[position:position + 20].lstrip().startswith(("(", ".")):
+            return position
+        match = _IMPORT.match(text, position)
+        if not match:
+            return position
+        names: List[str] = []
+        for part in re.split(r"[,{}]", match.group(1) or ""):
+            words = part.split()
+            if words and words[0] == "type":
+                words = words[1:]
+            if words:
+                # `x as y` and `* as y` bind y
+                names.append(words[-1])
+        self.imports.setdefault(match.group(2)[1:-1], []).extend(names)
+        return match.end()
+
+    def _scan_export(self, text: str, position: int) -> int:
+        rest = re.match(r"\s*((?:(?:default|async|declare|abstract)\s+)*)", text[position:position + 100])
+        modifiers = rest.group(1).split()
+        position += rest.end()
+        if text.startswith("type", position) and text[position + 4:position + 20].lstrip().startswith("{"):
+            position = text.index("{", position)
+        if text.startswith("{", position):
+            end = _matching(text, position)
+            for part in text[position + 1:end - 1].split(","):
+                words = part.split()
+                if words and words[0] == "type":
+                    words = words[1:]
+                if words:
+                    self.exports.setdefault(words[-1], "binding")
+            return end
+        keyword = re.match(r"(%s)(?![\w$])" % "|".join(DECLARATION_KINDS), text[position:position + 12])
+        if keyword:
+            name, resume = self._declare(text, keyword.group(1), position + keyword.end())
+            if name:
+                self.exports[name] = keyword.group(1)
+                return resume
+        if "default" in modifiers:
+            self.exports["default"] = "default"
+        return position
+
+
+def scan_tree(root: str) -> Dict[str, SymbolTable]:
+    """Symbol tables of every .ts / .tsx file under `root`"""
+    tables = {}
+    for directory, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.endswith((".ts", ".tsx")):
+                path = os.path.join(directory, name)
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    tables[path] = SymbolTable(f.read())
+    return tables
+
+
+def run_benchmark(root: str, rounds: int = 5) -> Dict[str, float]:
+    """Best-of-`rounds` ms to build symbol tables over `root` by scanning vs full tokenizing"""
+    from source_index import tokenize
+
+    texts = []
+    for directory, _, names in os.walk(root):
+        for name in sorted(names):
+            if name.endswith((".ts", ".tsx")):
+                with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+                    texts.append(f.read())
+
+    def best(function) -> float:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for text in texts:
+                function(text)
+            timings.append((time.perf_counter() - started) * 1000)
+        return min(timings)
+
+    return {"files": len(texts), "bytes": sum(len(text) for text in texts),
+            "scan_ms": best(SymbolTable), "tokenize_ms": best(tokenize)}
+
+
+def main():
+    """Print symbol tables and benchmark the scanner over a source tree"""
+    parser = argparse.ArgumentParser(description="Toiral Estimate TypeScript declaration scanner")
+    parser.add_argument("--root", default="/app/src", help="Source tree to scan")
+    parser.add_argument("--file", help="Print the symbol table of one file")
+    parser.add_argument("--rounds", type=int, default=5, help="Benchmark rounds (best is reported)")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8", errors="replace") as f:
+            table = SymbolTable(f.read())
+        print(f"📄 {args.file}")
+        print(f"   exports: {', '.join(f'{name} ({kind})' for name, kind in table.exports.items())}")
+        for name, interface in table.interfaces.items():
+            extends = f" extends {', '.join(interface.extends)}" if interface.extends else ""
+            print(f"   interface {name}{extends}")
+            for field, type_text in interface.fields.items():
+                print(f"      {field}{'?' if field in interface.optional else ''}: {type_text}")
+        for name, alias in table.type_aliases.items():
+            detail = (f"variants {', '.join(alias.variants)}" if alias.variants
+                      else f"fields {', '.join(alias.fields)}" if alias.fields else alias.definition[:60])
+            print(f"   type {name}: {detail}")
+        for module, names in table.imports.items():
+            print(f"   import {', '.join(names) or '(side effects)'} from '{module}'")
+        return
+
+    tables = scan_tree(args.root)
+    print(f"🔎 {len(tables)} file(s): {sum(len(t.exports) for t in tables.values())} exports, "
+          f"{sum(len(t.interfaces) for t in tables.values())} interfaces, "
+          f"{sum(len(t.type_aliases) for t in tables.values())} type aliases, "
+          f"{sum(len(t.imports) for t in tables.values())} import statements")
+    result = run_benchmark(args.root, args.rounds)
+    print(f"⏱️  {result['files']} files, {result['bytes']:,} bytes: "
+          f"scan {result['scan_ms']:.1f} ms, full tokenize {result['tokenize_ms']:.1f} ms "
+          f"({result['tokenize_ms'] / result['scan_ms']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()